@@ -1,147 +1,277 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import gzip
 import json
-import openai
-import chromadb
-import os
-from chromadb.utils import embedding_functions
 import time
 import traceback
-from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError
-import tiktoken
 
-openai.api_key = 'redacted'
-os.environ["OPENAI_API_KEY"] = openai.api_key
-
-client = OpenAI(api_key=openai.api_key)
-
-DJANGO_SWOT_URL = "http://127.0.0.1:8000/swot_analysis/analyze/"
-DJANGO_MARKET_SIZE_URL = "http://127.0.0.1:8000/market_size/estimate/"
-DJANGO_BUSINESS_MODEL_URL = "http://127.0.0.1:8000/business_model/recommend/"
-DJANGO_COMPETITOR_ANALYSIS_URL = "http://127.0.0.1:8000/competitor_analysis/analyze/"
-DJANGO_NEWS_OVERVIEW_URL = "http://127.0.0.1:8000/news_overview/overview/"
+DJANGO_BASE_URL = "http://127.0.0.1:8000"
+DJANGO_SWOT_URL = f"{DJANGO_BASE_URL}/swot_analysis/analyze/"
+DJANGO_MARKET_SIZE_URL = f"{DJANGO_BASE_URL}/market_size/estimate/"
+DJANGO_BUSINESS_MODEL_URL = f"{DJANGO_BASE_URL}/business_model/recommend/"
+DJANGO_COMPETITOR_ANALYSIS_URL = f"{DJANGO_BASE_URL}/competitor_analysis/analyze/"
+DJANGO_NEWS_OVERVIEW_URL = f"{DJANGO_BASE_URL}/news_overview/overview/"
+DJANGO_FULL_REPORT_URL = f"{DJANGO_BASE_URL}/report/full/"
+DJANGO_RETRIEVE_URL = f"{DJANGO_BASE_URL}/retrieval/retrieve/"
+DJANGO_STORE_URL = f"{DJANGO_BASE_URL}/retrieval/store/"
+DJANGO_HISTORY_URL = f"{DJANGO_BASE_URL}/retrieval/history/{{analysis_type}}/"
+DJANGO_JOBS_URL = f"{DJANGO_BASE_URL}/jobs/{{analysis_type}}/"
+DJANGO_JOB_STATUS_URL = f"{DJANGO_BASE_URL}/jobs/status/{{job_id}}/"
+JOB_POLL_INTERVAL = 1.0
+
+# Connect fails fast when Django is down; the read timeout covers the slowest
+# LLM generation (and the gap between streamed chunks).
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 180
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+GZIP_MIN_BYTES = 2048
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
 
 st.set_page_config(
     page_title="Co-Founder App",
     layout="wide"
 )
 
-openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-                api_key=openai.api_key,
-                model_name="text-embedding-3-small"
-)
-chroma_client = chromadb.Client(settings=chromadb.Settings(anonymized_telemetry=False, is_persistent=True), database="default_database", tenant="default_tenant")
-
-collection_name_swot = "swot_analysis_collection"
-collection_name_market_size = "market_size_collection"
-collection_name_business_model = "business_model_collection"
-collection_name_competitor = "competitor_analysis_collection"
-collection_name_news = "news_analysis_collection"
-
-
-def get_chroma_collection(collection_name):
+@st.cache_resource
+def get_http_session():
+    """Keep-alive session shared by every script run on this Streamlit server."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=IDEMPOTENT_METHODS,
+    )
+    session = requests.Session()
+    session.mount(DJANGO_BASE_URL, HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    # Retrieval is read-only and stores are content-addressed upserts, so their POSTs are safe to repeat.
+    session.mount(f"{DJANGO_BASE_URL}/retrieval/", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=retry.new(allowed_methods=IDEMPOTENT_METHODS | {"POST"}),
+    ))
+    return session
+
+def post_json(url, payload, **kwargs):
+    """POSTs JSON over the pooled session, gzip-compressing large bodies."""
+    body = json.dumps(payload).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body)
+        headers['Content-Encoding'] = 'gzip'
+    return get_http_session().post(url, data=body, headers=headers, timeout=REQUEST_TIMEOUT, **kwargs)
+
+def retrieve_context(data, analysis_type):
+    """Asks the retrieval service for context from past analyses.
+
+    Returns the enriched inputs and, unless a fresh run was forced, a stored
+    analysis of near-identical inputs that can be shown instead.
+    """
     try:
-        collection = chroma_client.get_collection(name=collection_name, embedding_function=openai_ef)
-        print("Collection exists, proceeding")
-    except Exception as e:
-        if isinstance(e, chromadb.errors.InvalidCollectionException):
-            print("Collection doesn't exist, creating it.")
-            collection = chroma_client.create_collection(name=collection_name, embedding_function=openai_ef)
-        else:
-            raise  
-    return collection
-
-swot_collection = get_chroma_collection(collection_name_swot)
-market_size_collection = get_chroma_collection(collection_name_market_size)
-business_model_collection = get_chroma_collection(collection_name_business_model)
-competitor_collection = get_chroma_collection(collection_name_competitor)
-news_collection = get_chroma_collection(collection_name_news)
-
-collection_dict = {
-    "swot_analysis": swot_collection,
-    "market_size_estimation": market_size_collection,
-    "business_model_recommendation": business_model_collection,
-    "competitor_analysis": competitor_collection,
-    "news_overview": news_collection
-}
-
-def make_api_request(url, data, collection, analysis_type, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            headers = {'Content-Type': 'application/json'}
-
-            # RAG implementation
-            query = f"Industry: {data.get('industry', '')}, Business Description: {data.get('business_description', '')}, Target Market: {data.get('target_market', '')}, Sector: {data.get('sector', '')}"
-
-            results = collection.query(
-                query_texts=[query],
-                n_results=2
-            )
-
-            context = "\n".join(results['documents'][0]) if results and results['documents'] else "No prior context found."
-
-            max_context_tokens = 3000
-            encoding = tiktoken.encoding_for_model("gpt-4o-mini-2024-07-18")
-            encoded_context = encoding.encode(context)
-            truncated_context = encoding.decode(encoded_context[:max_context_tokens])
-
-            data['context'] = truncated_context
-
-            response = requests.post(url, json=data, headers=headers)
+        response = post_json(DJANGO_RETRIEVE_URL, {
+            'analysis_type': analysis_type,
+            'data': data,
+            'force_regenerate': force_regenerate_enabled(),
+        })
+        response.raise_for_status()
+        payload = response.json()
+        return payload['data'], payload.get('reuse')
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        st.warning(f"Could not retrieve prior context, continuing without it: {e}")
+        return {**data, 'context': "No prior context found."}, None
+
+def persist_analysis(analysis_type, data, response_data):
+    """Hands the analysis to the retrieval service, which stores it in the background."""
+    try:
+        response = post_json(DJANGO_STORE_URL, {'analysis_type': analysis_type, 'data': data, 'response': response_data})
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        st.warning(f"Could not save this analysis to history: {e}")
+    reset_history(analysis_type)
+
+def stream_analysis(url, data):
+    """Posts with streaming enabled, renders chunks as they arrive and returns the final envelope."""
+    envelope = {}
+
+    def chunks():
+        current_field = None
+        with post_json(url, {**data, 'stream': True}, stream=True) as response:
             response.raise_for_status()
-            response_data = response.json()
-
-   
-            try:
-                collection.add(
-                    documents=[f"User Input: {data}\nAPI Response: {response_data}"],
-                    ids=[f"{analysis_type}-{len(collection.get()['ids'])}"] 
-                )
-            except Exception as e:
-                st.error(f"Error adding data to ChromaDB: {e}. Traceback: {traceback.format_exc()}")
-            return response_data
-
-        except requests.exceptions.RequestException as e:
-            st.error(f"Connection Error: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            st.error(f"JSON Decode Error: {e}.  Response Text: {response.text if 'response' in locals() else 'No response'}")
-            return None
-        except APIConnectionError as e:
-            st.warning(f"Failed to connect to OpenAI API (attempt {attempt + 1}/{max_retries}): {e}")
-            time.sleep(2 ** attempt) 
-        except RateLimitError as e:
-            st.warning(f"OpenAI API Rate Limit exceeded (attempt {attempt + 1}/{max_retries}): {e}")
-            time.sleep(2 ** attempt) 
-        except APIStatusError as e:
-            st.error(f"OpenAI API returned an error: {e}")
-            return None
-        except Exception as e:
-            st.error(f"Unexpected error: {e}. Traceback: {traceback.format_exc()}")
-            return None
-    st.error("Max retries reached. Failed to complete the API request.")
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event['event'] == 'chunk':
+                    if current_field and event['field'] != current_field:
+                        yield "\n\n---\n\n"
+                    current_field = event['field']
+                    yield event['text']
+                elif event['event'] == 'error':
+                    st.warning(f"Generation error in {event['field']}: {event['error']}")
+                elif event['event'] == 'result':
+                    envelope.update(event['data'])
+
+    placeholder = st.empty()
+    with placeholder.container():
+        st.write_stream(chunks())
+    placeholder.empty()
+    return envelope or None
+
+def pending_job(analysis_type):
+    """Returns the status URL of the job this analysis is still waiting on, or None.
+
+    The job ID lives in the page's query parameters rather than session state,
+    so it survives a reload or a dropped connection as well as a rerun.
+    """
+    if st.query_params.get('job_type') == analysis_type and 'job_id' in st.query_params:
+        return DJANGO_JOB_STATUS_URL.format(job_id=st.query_params['job_id'])
     return None
 
-def show_history(collection, analysis_type):
+def forget_job():
+    st.query_params.pop('job_id', None)
+    st.query_params.pop('job_type', None)
+
+def poll_job(status_url):
+    """Polls until the job finishes and returns it."""
     try:
-        results = collection.get() 
-        if results and results['ids']:
+        with st.spinner("Running analysis..."):
+            while True:
+                response = get_http_session().get(status_url, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                job = response.json()
+                if job['status'] in ('succeeded', 'failed'):
+                    break
+                time.sleep(JOB_POLL_INTERVAL)
+    finally:
+        # Forget the job once it is done or unreachable, so the next click submits a fresh one.
+        forget_job()
+    if job['status'] == 'failed':
+        st.error(f"Analysis failed: {job['error']}")
+    return job
+
+def run_job(analysis_type, data):
+    """Runs the analysis as a background job and polls until it finishes.
+
+    A rerun or reload while the job is still going resumes polling instead of
+    starting the analysis again.
+    """
+    status_url = pending_job(analysis_type)
+    if status_url is None:
+        response = post_json(DJANGO_JOBS_URL.format(analysis_type=analysis_type), data)
+        response.raise_for_status()
+        job_id = response.json()['job_id']
+        st.query_params.update(job_type=analysis_type, job_id=job_id)
+        status_url = DJANGO_JOB_STATUS_URL.format(job_id=job_id)
+    return poll_job(status_url)['result']
+
+def resume_job(analysis_type):
+    """Finishes polling the job a reload interrupted and saves it to history like make_api_request does."""
+    try:
+        job = poll_job(pending_job(analysis_type))
+    except requests.exceptions.RequestException as e:
+        st.error(f"Connection Error: {e}")
+        return None
+    if job['result'] is not None and analysis_type != "full_report":
+        persist_analysis(analysis_type, job['payload'], job['result'])
+    return job['result']
+
+def make_api_request(url, data, analysis_type, stream=False):
+    try:
+        # RAG: the retrieval service adds context from similar past analyses
+        data, reuse = retrieve_context(data, analysis_type)
+        if reuse:
+            saved_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(reuse['created_at']))
+            st.info(f"Showing a saved analysis of near-identical inputs from {saved_at}. "
+                    "Turn on \"Force regenerate\" in the sidebar to run a fresh one.")
+            return reuse['response']
+
+        if stream:
+            response_data = stream_analysis(url, data)
+            if response_data is None:
+                st.error("The stream ended without a final result.")
+                return None
+        else:
+            response_data = run_job(analysis_type, data)
+            if response_data is None:
+                return None
+
+        persist_analysis(analysis_type, data, response_data)
+        return response_data
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"Connection Error: {e}")
+        return None
+    except json.JSONDecodeError as e:
+        st.error(f"JSON Decode Error: {e}.  Response Text: {response.text if 'response' in locals() else 'No response'}")
+        return None
+    except Exception as e:
+        st.error(f"Unexpected error: {e}. Traceback: {traceback.format_exc()}")
+        return None
+
+def streaming_enabled():
+    return st.session_state.get('stream_responses', True)
+
+def force_regenerate_enabled():
+    return st.session_state.get('force_regenerate', False)
+
+HISTORY_PAGE_SIZE = 10
+
+def _history_state_key(analysis_type):
+    return f"history_{analysis_type}"
+
+def reset_history(analysis_type):
+    st.session_state.pop(_history_state_key(analysis_type), None)
+
+def fetch_history_page(analysis_type, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """Fetches one page of stored analyses of a type, newest first, from the retrieval service."""
+    params = {'limit': limit}
+    if cursor:
+        params['cursor'] = cursor
+    response = get_http_session().get(
+        DJANGO_HISTORY_URL.format(analysis_type=analysis_type),
+        params=params,
+        timeout=REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+def show_history(analysis_type):
+    state_key = _history_state_key(analysis_type)
+    try:
+        history = st.session_state.get(state_key)
+        if history is None:
+            page = fetch_history_page(analysis_type)
+            history = {'items': page['items'], 'next_cursor': page['next_cursor']}
+            st.session_state[state_key] = history
+
+        if history['items']:
             st.subheader("Analysis History")
 
             if st.button("Clear History", key=f"clear_{analysis_type}"):
-                collection.delete(ids=results['ids'])
+                get_http_session().delete(
+                    DJANGO_HISTORY_URL.format(analysis_type=analysis_type),
+                    timeout=REQUEST_TIMEOUT,
+                ).raise_for_status()
+                reset_history(analysis_type)
                 st.success("History cleared!")
                 st.rerun() 
 
-            for i, id in enumerate(results['ids']):
-                if id.startswith(analysis_type):
-                    st.markdown(f"**Analysis {i + 1}:**")
-                    st.markdown(f"*ID:* {id}")
-                    documents = results['documents'][i].split("\\n")
-
-                    st.markdown(f"*User Input:* {documents[0]}") 
-                    st.markdown(f"*API Response:* {documents[1]}") 
-                    st.markdown("---")
+            for i, item in enumerate(history['items']):
+                st.markdown(f"**Analysis {i + 1}:**")
+                st.markdown(f"*ID:* {item['id']}")
+                if item.get('created_at'):
+                    st.markdown(f"*Date:* {time.strftime('%Y-%m-%d %H:%M', time.localtime(item['created_at']))}")
+
+                st.markdown(f"*User Input:* {item['user_input']}") 
+                st.markdown(f"*API Response:* {item['api_response']}") 
+                st.markdown("---")
+
+            if history['next_cursor'] and st.button("Load more", key=f"more_{analysis_type}"):
+                page = fetch_history_page(analysis_type, history['next_cursor'])
+                history['items'].extend(page['items'])
+                history['next_cursor'] = page['next_cursor']
+                st.rerun()
         else:
             st.info("No history found for this analysis type.")
     except Exception as e:
@@ -163,28 +293,31 @@ def show_swot_analysis():
             placeholder="e.g., e-commerce, fintech, healthcare"
         )
 
+        results = None
         if st.button("Generate SWOT Analysis"):
             if business_description and industry:
                 with st.spinner("Analyzing your business..."):
                     data = {'business_description': business_description, 'industry': industry}
-                    results = make_api_request(DJANGO_SWOT_URL, data, swot_collection, "swot_analysis")
+                    results = make_api_request(DJANGO_SWOT_URL, data, "swot_analysis", stream=streaming_enabled())
+            else:
+                st.warning("Please provide both a business description and industry.")
+        elif pending_job("swot_analysis"):
+            results = resume_job("swot_analysis")
 
-                    if results:
-                        st.markdown("### Analysis Results "+":material/dashboard:")
-                        st.markdown(f"#### Business Overview")
-                        st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
-                        st.markdown(f"*Description:* {results.get('business_description', 'N/A')}")
+        if results:
+            st.markdown("### Analysis Results "+":material/dashboard:")
+            st.markdown(f"#### Business Overview")
+            st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
+            st.markdown(f"*Description:* {results.get('business_description', 'N/A')}")
 
-                        st.markdown("#### Key Market Assumptions")
-                        st.markdown(f"{results.get('generated_assumptions', 'N/A')}")
+            st.markdown("#### Key Market Assumptions")
+            st.markdown(f"{results.get('generated_assumptions', 'N/A')}")
 
-                        st.markdown("#### SWOT Analysis")
-                        st.markdown(f"{results.get('swot_result', 'N/A')}")
-            else:
-                st.warning("Please provide both a business description and industry.")
+            st.markdown("#### SWOT Analysis")
+            st.markdown(f"{results.get('swot_result', 'N/A')}")
 
     with history_tab:
-        show_history(swot_collection, "swot_analysis")
+        show_history("swot_analysis")
 
 def show_market_size_estimation():
     analysis_tab, history_tab = st.tabs(["Analysis", "History"])
@@ -197,6 +330,7 @@ def show_market_size_estimation():
         customer_segment = st.text_input("Customer segment (optional):", help="e.g., 'B2B', 'B2C', 'SaaS'")
         average_selling_price = st.number_input("Average selling price in USD (optional):", value=0.0, format="%.2f")
 
+        results = None
         if st.button("Estimate Market Size"):
             if industry and region and target_market:
                 with st.spinner("Estimating market size..."):
@@ -207,28 +341,30 @@ def show_market_size_estimation():
                         'customer_segment': customer_segment,
                         'average_selling_price': average_selling_price,
                     }
-                    results = make_api_request(DJANGO_MARKET_SIZE_URL, data, market_size_collection, "market_size_estimation")
-
-                    if results:
-                        st.markdown("### Market Size Results "+":material/pie_chart:")
-                        st.markdown(f"#### Business Overview")
-                        st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
-                        st.markdown(f"*Region:* {results.get('region', 'N/A')}")
-                        st.markdown(f"*Target Market:* {results.get('target_market', 'N/A')}")
-
-                        if results.get('customer_segment'):
-                            st.markdown(f"*Customer Segment:* {results['customer_segment']}")
-                        if results.get(
-                            'average_selling_price'):
-                            st.markdown(f"*Average Selling Price:* {results['average_selling_price']} USD")
-
-                        st.markdown("#### 💰 Market Size Estimation")
-                        st.markdown(f"{results.get('market_size_result', 'N/A')}")
+                    results = make_api_request(DJANGO_MARKET_SIZE_URL, data, "market_size_estimation", stream=streaming_enabled())
             else:
                 st.warning("Please enter an industry, a region, and a target market.")
+        elif pending_job("market_size_estimation"):
+            results = resume_job("market_size_estimation")
+
+        if results:
+            st.markdown("### Market Size Results "+":material/pie_chart:")
+            st.markdown(f"#### Business Overview")
+            st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
+            st.markdown(f"*Region:* {results.get('region', 'N/A')}")
+            st.markdown(f"*Target Market:* {results.get('target_market', 'N/A')}")
+
+            if results.get('customer_segment'):
+                st.markdown(f"*Customer Segment:* {results['customer_segment']}")
+            if results.get(
+                'average_selling_price'):
+                st.markdown(f"*Average Selling Price:* {results['average_selling_price']} USD")
+
+            st.markdown("#### 💰 Market Size Estimation")
+            st.markdown(f"{results.get('market_size_result', 'N/A')}")
 
     with history_tab:
-        show_history(market_size_collection, "market_size_estimation")
+        show_history("market_size_estimation")
 
 def show_business_model_recommendation():
     analysis_tab, history_tab = st.tabs(["Analysis", "History"])
@@ -243,6 +379,7 @@ def show_business_model_recommendation():
             placeholder="Provide a detailed description of your business concept"
         )
 
+        results = None
         if st.button("Recommend Business Model"):
             if industry and target_market and business_description:
                 with st.spinner("Recommending business model..."):
@@ -251,22 +388,24 @@ def show_business_model_recommendation():
                         'target_market': target_market,
                         'business_description': business_description
                     }
-                    results = make_api_request(DJANGO_BUSINESS_MODEL_URL, data, business_model_collection, "business_model_recommendation")
-
-                    if results:
-                        st.markdown("### Business Model Recommendation "+":material/receipt_long:")
-                        st.markdown(f"#### Business Overview")
-                        st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
-                        st.markdown(f"*Target Market:* {results.get('target_market', 'N/A')}")
-                        st.markdown(f"*Business Description:* {results.get('business_description', 'N/A')}")
-
-                        st.markdown("#### Recommended Business Model")
-                        st.markdown(f"{results.get('business_model_result', 'N/A')}")
+                    results = make_api_request(DJANGO_BUSINESS_MODEL_URL, data, "business_model_recommendation", stream=streaming_enabled())
             else:
                 st.warning("Please enter an industry, a target market, and a business description.")
+        elif pending_job("business_model_recommendation"):
+            results = resume_job("business_model_recommendation")
+
+        if results:
+            st.markdown("### Business Model Recommendation "+":material/receipt_long:")
+            st.markdown(f"#### Business Overview")
+            st.markdown(f"*Industry:* {results.get('industry', 'N/A')}")
+            st.markdown(f"*Target Market:* {results.get('target_market', 'N/A')}")
+            st.markdown(f"*Business Description:* {results.get('business_description', 'N/A')}")
+
+            st.markdown("#### Recommended Business Model")
+            st.markdown(f"{results.get('business_model_result', 'N/A')}")
 
     with history_tab:
-        show_history(business_model_collection, "business_model_recommendation")
+        show_history("business_model_recommendation")
 
 def show_competitor_analysis():
     analysis_tab, history_tab = st.tabs(["Analysis", "History"])
@@ -276,6 +415,7 @@ def show_competitor_analysis():
         competitor_1 = st.text_input("Competitor 1 (Name or Website):", help="Enter the name or URL of your first competitor")
         competitor_2 = st.text_input("Competitor 2 (Name or Website):", help="Enter the name or URL of your second competitor (optional)")
         competitor_3 = st.text_input("Competitor 3 (Name or Website):", help="Enter the name or URL of your third competitor (optional)")
+        results = None
         if st.button("Analyze Competitors"):
             if competitor_1:
                 with st.spinner("Analyzing competitors..."):
@@ -284,26 +424,28 @@ def show_competitor_analysis():
                         'competitor_2': competitor_2,
                         'competitor_3': competitor_3
                     }
-                    results = make_api_request(DJANGO_COMPETITOR_ANALYSIS_URL, data, competitor_collection, "competitor_analysis")
-
-                    if results:
-                        st.markdown("### Competitor Analysis Results "+":material/compare_arrows:")
-                        st.markdown(f"#### Business Overview")
-                        st.markdown(f"*Competitor 1:* {results.get('competitor_1', 'N/A')}")
-                        if results.get('competitor_2'):
-                            st.markdown(f"*Competitor 2:* {results['competitor_2']}")
-                        if results.get('competitor_3'):
-                            st.markdown(f"*Competitor 3:* {results['competitor_3']}")
-
-                        st.markdown("#### Competitor Analysis Summary")
-                        st.markdown(f"{results.get('competitor_analysis_result', 'N/A')}")
-                    else:
-                        st.error("Failed to generate competitor analysis.")
+                    results = make_api_request(DJANGO_COMPETITOR_ANALYSIS_URL, data, "competitor_analysis", stream=streaming_enabled())
+                if not results:
+                    st.error("Failed to generate competitor analysis.")
+        elif pending_job("competitor_analysis"):
+            results = resume_job("competitor_analysis")
         else:
             st.warning("Please enter at least one competitor.")
 
+        if results:
+            st.markdown("### Competitor Analysis Results "+":material/compare_arrows:")
+            st.markdown(f"#### Business Overview")
+            st.markdown(f"*Competitor 1:* {results.get('competitor_1', 'N/A')}")
+            if results.get('competitor_2'):
+                st.markdown(f"*Competitor 2:* {results['competitor_2']}")
+            if results.get('competitor_3'):
+                st.markdown(f"*Competitor 3:* {results['competitor_3']}")
+
+            st.markdown("#### Competitor Analysis Summary")
+            st.markdown(f"{results.get('competitor_analysis_result', 'N/A')}")
+
     with history_tab:
-        show_history(competitor_collection, "competitor_analysis")
+        show_history("competitor_analysis")
 
 def show_news_overview():
     analysis_tab, history_tab = st.tabs(["Analysis", "History"])
@@ -312,35 +454,123 @@ def show_news_overview():
         st.header("Sector News Overview")
         sector = st.text_input("Enter the sector:", help="e.g., 'e-commerce', 'fintech', 'healthcare'")
 
+        results = None
         if st.button("Get News Overview"):
             if sector:
                 with st.spinner("Gathering news and generating overview..."):
                     data = {'sector': sector}
-                    results = make_api_request(DJANGO_NEWS_OVERVIEW_URL, data, news_collection, "news_overview")
-
-                    if results:
-                        st.markdown("### Sector News Overview "+":material/newspaper:")
-
-                        st.markdown(f"#### Business Overview")
-                        st.markdown(f"*Sector:* {results.get('sector', 'N/A')}")
-                        st.markdown(f"*Number of Articles:* {results.get('num_articles', 'N/A')}")
-                        st.markdown(f"*Sentiment:* {results.get('sentiment_counts', 'N/A')}")
-                        st.markdown(f"#### Overview")
-                        st.markdown(f"{results.get('news_overview_result', 'N/A')}")
-                    else:
-                        st.error("Failed to generate news overview.")
+                    results = make_api_request(DJANGO_NEWS_OVERVIEW_URL, data, "news_overview", stream=streaming_enabled())
+                if not results:
+                    st.error("Failed to generate news overview.")
+        elif pending_job("news_overview"):
+            results = resume_job("news_overview")
         else:
             st.warning("Please enter a sector.")
 
+        if results:
+            st.markdown("### Sector News Overview "+":material/newspaper:")
+
+            st.markdown(f"#### Business Overview")
+            st.markdown(f"*Sector:* {results.get('sector', 'N/A')}")
+            st.markdown(f"*Number of Articles:* {results.get('num_articles', 'N/A')}")
+            st.markdown(f"*Distinct Stories:* {results.get('num_stories', 'N/A')}")
+            st.markdown(f"*Sentiment:* {results.get('sentiment_counts', 'N/A')}")
+            st.markdown(f"#### Overview")
+            st.markdown(f"{results.get('news_overview_result', 'N/A')}")
+
     with history_tab:
-        show_history(news_collection, "news_overview")
+        show_history("news_overview")
+
+REPORT_SECTIONS = {
+    'swot_analysis': ("SWOT Analysis", ['generated_assumptions', 'swot_result']),
+    'market_size_estimation': ("Market Size Estimation", ['market_size_result']),
+    'business_model_recommendation': ("Business Model Recommendation", ['business_model_result']),
+    'competitor_analysis': ("Competitor Analysis", ['competitor_analysis_result']),
+    'news_overview': ("Sector Outlook", ['sentiment_counts', 'news_overview_result']),
+}
+
+def show_report_section(name, data):
+    title, fields = REPORT_SECTIONS.get(name, (name, []))
+    with st.expander(title, expanded=True):
+        for field in fields:
+            st.markdown(f"{data.get(field, 'N/A')}")
+
+def show_report_sections(report):
+    for name, section in report['sections'].items():
+        show_report_section(name, section)
+    for name, error in report['errors'].items():
+        st.warning(f"{REPORT_SECTIONS.get(name, (name,))[0]} failed: {error}")
+
+def stream_full_report(data):
+    """Renders each report section as soon as the backend finishes it."""
+    report = None
+    with post_json(DJANGO_FULL_REPORT_URL, {**data, 'stream': True}, stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            event = json.loads(line)
+            if event['event'] == 'section':
+                show_report_section(event['section'], event['data'])
+            elif event['event'] == 'error':
+                st.warning(f"{REPORT_SECTIONS.get(event['field'], (event['field'],))[0]} failed: {event['error']}")
+            elif event['event'] == 'result':
+                report = event['data']
+    return report
+
+def show_full_report():
+    st.header("Full Report")
+    business_description = st.text_area("Describe your business idea:", height=200)
+    industry = st.text_input("Enter the industry:", help="e.g., 'e-commerce', 'fintech', 'healthcare'")
+    target_market = st.text_area("Describe the target market:", height=100, help="e.g., 'Small businesses in the US'")
+    region = st.text_input("Enter the region:", help="e.g., 'United States', 'Europe', 'Asia'")
+    sector = st.text_input("Sector for the news overview (optional):", help="Defaults to the industry")
+    competitor_1 = st.text_input("Competitor 1 (optional):")
+    competitor_2 = st.text_input("Competitor 2 (optional):")
+    competitor_3 = st.text_input("Competitor 3 (optional):")
+
+    if st.button("Generate Full Report"):
+        if business_description and industry and target_market and region:
+            data = {
+                'business_description': business_description,
+                'industry': industry,
+                'target_market': target_market,
+                'region': region,
+                'sector': sector,
+                'competitor_1': competitor_1,
+                'competitor_2': competitor_2,
+                'competitor_3': competitor_3,
+            }
+            try:
+                with st.spinner("Running all analyses..."):
+                    if streaming_enabled():
+                        report = stream_full_report(data)
+                    else:
+                        report = run_job("full_report", data)
+                        if report:
+                            show_report_sections(report)
+                if report:
+                    st.caption(f"Report generated in {report['elapsed_seconds']} s")
+            except requests.exceptions.RequestException as e:
+                st.error(f"Connection Error: {e}")
+        else:
+            st.warning("Please enter a business description, an industry, a target market, and a region.")
+    elif pending_job("full_report"):
+        report = resume_job("full_report")
+        if report:
+            show_report_sections(report)
+            st.caption(f"Report generated in {report['elapsed_seconds']} s")
 
     # Main page
 def main():
     st.title("Co-Founder App")
     st.write("Welcome to the Co-Founder App! Choose a tool below to get started.")
+    st.sidebar.toggle("Stream responses", value=True, key="stream_responses",
+                      help="Show the analysis as it is generated instead of waiting for the full result.")
+    st.sidebar.toggle("Force regenerate", value=False, key="force_regenerate",
+                      help="Always run a new analysis instead of reusing a saved one for near-identical inputs.")
 
-    col1, col2, col3, col4, col5 = st.columns(5, gap="small")
+    col1, col2, col3, col4, col5, col6 = st.columns(6, gap="small")
     with col1:
         if st.button("SWOT Analysis", icon = ":material/dashboard:"):
             st.session_state['current_page'] = "swot_analysis"
@@ -356,9 +586,13 @@ def main():
     with col5:
         if st.button("Sector Outlook", icon = ":material/insights:"):
             st.session_state['current_page'] = "news_overview"
+    with col6:
+        if st.button("Full Report", icon=":material/summarize:"):
+            st.session_state['current_page'] = "full_report"
 
         if 'current_page' not in st.session_state:
-            st.session_state['current_page'] = "main"
+            # A reload while a job was running reopens its page, which resumes polling.
+            st.session_state['current_page'] = st.query_params.get('job_type', "main")
 
         if st.session_state['current_page'] == "swot_analysis":
             show_swot_analysis()
@@ -370,6 +604,8 @@ def main():
             show_competitor_analysis()
         elif st.session_state['current_page'] == "news_overview":
             show_news_overview()
+        elif st.session_state['current_page'] == "full_report":
+            show_full_report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
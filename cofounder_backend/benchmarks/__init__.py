@@ -0,0 +1,17 @@
+"""Offline benchmarks for the co-founder backend.
+
+Run from the ``cofounder_backend`` directory, e.g.::
+
+    python -m benchmarks.bench_news_sentiment
+
+``python -m benchmarks.run_suite`` runs every endpoint against fake
+providers and writes a JSON report that can be compared between commits.
+"""
+import os
+
+
+def setup_django():
+    """Points Django at the project settings so app modules can be imported."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cofounder_backend.settings")
+    import django
+    django.setup()
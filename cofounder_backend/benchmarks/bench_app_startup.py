@@ -0,0 +1,76 @@
+"""Streamlit cold-start and per-rerun cost, before and after lazy resource setup.
+
+Both sides run a whole app.py through Streamlit's AppTest harness and render
+the landing page, so they are measured the same way. "before" is app.py as
+of the baseline commit, taken with ``git show``: on every script run it
+builds the OpenAI client and embedding function, opens a Chroma client and
+gets or creates all five collections. "after" is the current app.py, where
+resources are created on first use behind st.cache_resource (Chroma now
+lives in the Django retrieval app). No network calls are made by either
+side. The baseline's Chroma store is written to a temporary directory.
+
+    python -m benchmarks.bench_app_startup --reruns 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+BASELINE_COMMIT = "1273dd8"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def baseline_app(directory, commit=BASELINE_COMMIT):
+    """Writes app.py as of ``commit`` into ``directory`` and returns its path."""
+    source = subprocess.run(
+        ["git", "show", f"{commit}:./app.py"], cwd=APP_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    path = os.path.join(directory, "app.py")
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+
+def _timed_ms(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def time_app(app_path, reruns):
+    """Returns the cold-start time and the per-rerun times of the app at ``app_path``, in ms."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(app_path, default_timeout=60)
+    cold = _timed_ms(app.run)
+    if app.exception:
+        raise RuntimeError(f"{app_path} raised: {app.exception[0].message}")
+    return cold, [_timed_ms(app.run) for _ in range(reruns)]
+
+
+def _report(label, cold_ms, rerun_ms):
+    print(f"{label:>7}: cold start {cold_ms:9.1f} ms, per rerun median {statistics.median(rerun_ms):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--baseline", default=BASELINE_COMMIT, help="commit whose app.py is the \"before\" side")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # The baseline opens its persistent Chroma store relative to the working directory.
+        os.chdir(directory)
+        try:
+            _report("before", *time_app(baseline_app(directory, args.baseline), args.reruns))
+        finally:
+            os.chdir(cwd)
+
+    _report("after", *time_app(os.path.join(APP_DIR, "app.py"), args.reruns))
+
+
+if __name__ == "__main__":
+    main()
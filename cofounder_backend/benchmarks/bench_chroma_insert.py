@@ -0,0 +1,89 @@
+"""Insert latency into a Chroma collection as its size grows, old vs new ID scheme.
+
+The old scheme counted every stored ID with ``collection.get()`` before each
+insert; the new one derives the ID from a content hash and upserts. Vectors
+come from a local fake embedding function, so no API key is needed.
+
+    python -m benchmarks.bench_chroma_insert --sizes 10000 100000 1000000
+"""
+import argparse
+import hashlib
+import json
+import random
+import statistics
+import time
+
+DIMENSIONS = 64
+
+
+class FakeEmbeddingFunction:
+    """Deterministic pseudo-random vectors keyed on the document text."""
+
+    def __call__(self, input):
+        return [self._embed(text) for text in input]
+
+    def _embed(self, text):
+        rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+        return [rng.random() for _ in range(DIMENSIONS)]
+
+    def name(self):
+        return "fake"
+
+
+def _fill(collection, count, batch_size=5000):
+    rng = random.Random(0)
+    for start in range(collection.count(), count, batch_size):
+        ids = [f"seed-{i}" for i in range(start, min(start + batch_size, count))]
+        collection.add(
+            ids=ids,
+            documents=[f"User Input: seed {i}\nAPI Response: seed" for i in ids],
+            embeddings=[[rng.random() for _ in range(DIMENSIONS)] for _ in ids],
+        )
+
+
+def _old_insert(collection, analysis_type, document):
+    collection.add(documents=[document], ids=[f"{analysis_type}-{len(collection.get()['ids'])}"])
+
+
+def _new_insert(collection, analysis_type, document):
+    # Mirrors retrieval.store.make_analysis_id.
+    payload = json.dumps({'document': document}, sort_keys=True)
+    analysis_id = f"{analysis_type}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+    collection.upsert(documents=[document], ids=[analysis_id])
+
+
+def _median_ms(insert, collection, samples):
+    timings = []
+    for i in range(samples):
+        document = f"User Input: benchmark {time.time_ns()} {i}\nAPI Response: ok"
+        started = time.perf_counter()
+        insert(collection, "swot_analysis", document)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--old-scheme-max", type=int, default=100_000,
+                        help="skip the old scheme above this size, where one get() takes minutes")
+    args = parser.parse_args()
+
+    import chromadb
+
+    client = chromadb.EphemeralClient(settings=chromadb.Settings(anonymized_telemetry=False))
+    collection = client.create_collection("bench_insert", embedding_function=FakeEmbeddingFunction())
+    print(f"{'documents':>10} {'old get()+add':>15} {'hash upsert':>13}")
+    for size in sorted(args.sizes):
+        _fill(collection, size)
+        new_ms = _median_ms(_new_insert, collection, args.samples)
+        if size <= args.old_scheme_max:
+            old = f"{_median_ms(_old_insert, collection, args.samples):12.2f} ms"
+        else:
+            old = "skipped"
+        print(f"{size:>10} {old:>15} {new_ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
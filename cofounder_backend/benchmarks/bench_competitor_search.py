@@ -0,0 +1,44 @@
+"""Times the competitor search fan-out and cache against the offline stub backend.
+
+    python -m benchmarks.bench_competitor_search --latency 0.8
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per stubbed search")
+    args = parser.parse_args()
+
+    setup_django()
+    from core.cache import LRUBackend
+    from competitor_analysis.search import SearchService, StubSearchBackend
+
+    competitors = ["Acme Corp", "Globex", ""]
+
+    backend = StubSearchBackend(latency=args.latency)
+    baseline = SearchService(backend, max_workers=1)
+    sequential = _timed(lambda: [baseline.backend.search(c, 3) for c in competitors])
+
+    backend = StubSearchBackend(latency=args.latency)
+    service = SearchService(backend, cache=LRUBackend(), ttl=3600, max_workers=3)
+    cold = _timed(lambda: service.search_many(competitors))
+    warm = _timed(lambda: service.search_many(["acme  corp", "GLOBEX", ""]))
+
+    print(f"{args.latency:.2f}s stubbed latency per search, queries: {competitors}")
+    print(f"sequential, empty input searched: {sequential:6.3f}s")
+    print(f"fan-out, cold cache:              {cold:6.3f}s ({backend.calls} backend calls)")
+    print(f"fan-out, warm cache:              {warm:6.3f}s ({backend.calls} backend calls in total)")
+
+
+if __name__ == "__main__":
+    main()
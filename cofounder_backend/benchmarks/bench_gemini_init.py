@@ -0,0 +1,44 @@
+"""Measures per-request Gemini setup overhead before and after the model registry.
+
+No request is sent to Gemini; only client configuration and model
+construction are timed.
+
+    python -m benchmarks.bench_gemini_init --iterations 2000
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def _time_per_call(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    import google.generativeai as genai
+    from django.conf import settings
+    from core import utils
+
+    def per_request_init():
+        genai.configure(api_key=settings.GEMINI_API_KEY or "benchmark")
+        return genai.GenerativeModel(utils.DEFAULT_MODEL_NAME)
+
+    utils.reset_models()
+    before = _time_per_call(per_request_init, args.iterations)
+    after = _time_per_call(utils.initialize_gemini, args.iterations)
+    print(f"configure + GenerativeModel per request: {before:9.2f} us/call")
+    print(f"shared model registry:                   {after:9.2f} us/call")
+    print(f"speed-up: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
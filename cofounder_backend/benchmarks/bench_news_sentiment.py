@@ -0,0 +1,48 @@
+"""Compares the sentiment stage modes against a stubbed generate_text.
+
+    python -m benchmarks.bench_news_sentiment --articles 10 --latency 0.5
+"""
+import argparse
+import json
+import time
+from unittest import mock
+
+from benchmarks import setup_django
+
+
+def _stub_generate_text(latency):
+    def generate_text(model, prompt, cache_namespace=None):
+        time.sleep(latency)
+        if "JSON array" in prompt:
+            count = prompt.count("Article ")
+            return json.dumps(["Positive"] * count)
+        return "Positive"
+    return generate_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per stubbed Gemini call")
+    parser.add_argument("--workers", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from news_overview import sentiment
+
+    settings.NEWS_SENTIMENT_MAX_WORKERS = args.workers
+    texts = [f"Article body {i}" for i in range(args.articles)]
+
+    with mock.patch.object(sentiment, "generate_text", _stub_generate_text(args.latency)), \
+            mock.patch.object(sentiment, "initialize_gemini", lambda: object()):
+        print(f"{args.articles} articles, {args.latency:.2f}s stubbed latency per call")
+        for mode in ("sequential", "concurrent", "batched"):
+            started = time.perf_counter()
+            counts = sentiment.count_sentiments(texts, mode=mode)
+            elapsed = time.perf_counter() - started
+            print(f"{mode:>10}: {elapsed:6.2f}s ({elapsed / args.latency:4.1f}x latency) {counts}")
+
+
+if __name__ == "__main__":
+    main()
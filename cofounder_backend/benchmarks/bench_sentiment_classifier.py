@@ -0,0 +1,61 @@
+"""Accuracy and speed of the local sentiment classifier against the LLM labels, fully offline.
+
+Reads the dataset and model written by ``manage.py train_sentiment`` and
+scores the held-out articles: agreement with the LLM at several confidence
+thresholds, the share of LLM calls each threshold saves, and the local
+time per article next to the LLM time measured while labelling.
+
+    python -m benchmarks.bench_sentiment_classifier --thresholds 0.5 0.7 0.9
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", help="defaults to NEWS_SENTIMENT_CLASSIFIER['DATASET_PATH']")
+    parser.add_argument("--model", help="defaults to NEWS_SENTIMENT_CLASSIFIER['MODEL_PATH']")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--repeat", type=int, default=200, help="timed passes over the held-out articles")
+    parser.add_argument("--all", action="store_true", help="score every article, not only the held-out ones")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from news_overview.classifier import SentimentClassifier, evaluate
+    import numpy as np
+
+    config = settings.NEWS_SENTIMENT_CLASSIFIER
+    model = SentimentClassifier.load(args.model or config['MODEL_PATH'])
+    with np.load(args.dataset or config['DATASET_PATH']) as data:
+        rows = np.ones(len(data['labels']), dtype=bool) if args.all else data['holdout']
+        embeddings = data['embeddings'][rows]
+        labels = data['labels'][rows].astype(str)
+        llm_seconds = float(data['llm_seconds_per_article'])
+
+    print(f"{len(labels)} articles, labels {dict(zip(*np.unique(labels, return_counts=True)))}")
+    print(f"{'threshold':>10} {'coverage':>9} {'agreement':>10} {'overall':>8}")
+    for threshold in sorted(set(args.thresholds) | {model.min_confidence}):
+        report = evaluate(model, embeddings, labels, threshold)
+        marker = "  <- model" if threshold == model.min_confidence else ""
+        agreement = f"{report['confident_accuracy']:.1%}" if report['confident_accuracy'] is not None else "-"
+        # Articles below the threshold go to the LLM, so overall accuracy counts them as agreeing.
+        overall = report['coverage'] * (report['confident_accuracy'] or 0) + (1 - report['coverage'])
+        print(f"{threshold:10.3f} {report['coverage']:9.0%} {agreement:>10} {overall:8.1%}{marker}")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        model.predict(embeddings)
+    batched = (time.perf_counter() - started) / (args.repeat * len(labels))
+    started = time.perf_counter()
+    for embedding in embeddings:
+        model.predict([embedding])
+    single = (time.perf_counter() - started) / len(labels)
+    print(f"\nlocal: {batched * 1e6:.1f} us/article batched, {single * 1e6:.1f} us/article one at a time")
+    print(f"LLM:   {llm_seconds * 1e3:.1f} ms/article when labelled ({llm_seconds / batched:,.0f}x the batched local time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Fake Gemini, OpenAI embeddings and DuckDuckGo providers for offline benchmarks.
+
+Each fake follows a ProviderProfile: a base latency with uniform jitter,
+an optional output token throughput (so long generations take longer than
+short ones) and an error rate that raises the provider's real rate-limit
+exception. Every fake counts its calls, errors and the latency it
+simulated, so a benchmark can separate time spent "upstream" from the
+project's own overhead.
+
+``fake_providers()`` patches all three into the project for the duration of
+a ``with`` block. It also loads the tokenizer up front, so no scenario waits
+on tiktoken's first-use download; offline, token counts use the length
+estimate from core.tokens.
+"""
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from unittest import mock
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+EMBEDDING_DIMENSIONS = 256
+SENTIMENT_REPLIES = ("Positive", "Negative", "Neutral")
+
+WORDS = (
+    "market growth customers revenue pricing churn retention channel margin "
+    "competitor funding regulation demand segment partnership platform "
+    "subscription acquisition expansion risk opportunity"
+).split()
+
+
+class ProviderProfile:
+    """Latency and failure model for one fake provider."""
+
+    def __init__(self, latency=0.0, jitter=0.0, tokens_per_second=None, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def first_token_delay(self):
+        with self._lock:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def generation_delay(self, tokens):
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def to_dict(self):
+        return {
+            'latency': self.latency,
+            'jitter': self.jitter,
+            'tokens_per_second': self.tokens_per_second,
+            'error_rate': self.error_rate,
+        }
+
+
+class FakeProvider:
+    def __init__(self, profile=None):
+        self.profile = profile or ProviderProfile()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.simulated_seconds = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'errors': self.errors, 'simulated_seconds': round(self.simulated_seconds, 4)}
+
+    def _start_call(self):
+        """Counts the call, raises the provider's error if this call should fail, else returns the first-token delay."""
+        failed = self.profile.should_fail()
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+        if failed:
+            raise self.error()
+        return self.profile.first_token_delay()
+
+    def _waited(self, seconds):
+        with self._lock:
+            self.simulated_seconds += seconds
+
+    def _sleep(self, seconds):
+        if seconds:
+            time.sleep(seconds)
+            self._waited(seconds)
+
+    async def _sleep_async(self, seconds):
+        if seconds:
+            await asyncio.sleep(seconds)
+            self._waited(seconds)
+
+    def error(self):
+        raise NotImplementedError
+
+
+def _seeded_words(seed_text, count):
+    rng = random.Random(hashlib.sha256(seed_text.encode('utf-8')).digest())
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+class FakeGeminiModel(FakeProvider):
+    """Stands in for genai.GenerativeModel: generate_content (optionally streamed) and generate_content_async."""
+
+    model_name = 'models/fake-gemini'
+    _generation_config = None
+    _system_instruction = None
+
+    def __init__(self, profile=None, output_tokens=300, chunk_tokens=20):
+        super().__init__(profile)
+        self.output_tokens = output_tokens
+        self.chunk_tokens = chunk_tokens
+
+    def error(self):
+        from google.api_core import exceptions as google_exceptions
+        return google_exceptions.ResourceExhausted("Fake Gemini quota exceeded")
+
+    def reply(self, prompt):
+        """A deterministic reply shaped like what the calling code parses."""
+        if "JSON array" in prompt:
+            count = prompt.count("Article ")
+            return json.dumps([random.Random(f"{prompt}{i}").choice(SENTIMENT_REPLIES) for i in range(count)])
+        if "sentiment" in prompt.lower() and "one word" in prompt.lower():
+            return random.Random(prompt).choice(SENTIMENT_REPLIES)
+        return " ".join(_seeded_words(prompt, self.output_tokens))
+
+    def generate_content(self, prompt, stream=False, generation_config=None):
+        text = self.reply(prompt)
+        first_token = self._start_call()
+        if stream:
+            return self._stream(text, first_token)
+        self._sleep(first_token + self.profile.generation_delay(len(text.split())))
+        return SimpleNamespace(text=text)
+
+    def _stream(self, text, first_token):
+        self._sleep(first_token)
+        words = text.split(" ")
+        for start in range(0, len(words), self.chunk_tokens):
+            chunk = words[start:start + self.chunk_tokens]
+            self._sleep(self.profile.generation_delay(len(chunk)))
+            yield SimpleNamespace(text=" ".join(chunk) + (" " if start + self.chunk_tokens < len(words) else ""))
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        text = self.reply(prompt)
+        first_token = self._start_call()
+        await self._sleep_async(first_token + self.profile.generation_delay(len(text.split())))
+        return SimpleNamespace(text=text)
+
+
+def fake_embedding(text, dimensions=EMBEDDING_DIMENSIONS):
+    """Deterministic unit vector for a text, so near-identical inputs embed identically."""
+    rng = random.Random(hashlib.sha256(text.encode('utf-8')).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class FakeOpenAIClient(FakeProvider):
+    """Stands in for the OpenAI client's embeddings API; latency grows with the batch's token count."""
+
+    def __init__(self, profile=None):
+        super().__init__(profile)
+        self.embeddings = self
+
+    def error(self):
+        import httpx
+        from openai import RateLimitError
+        request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+        return RateLimitError("Fake rate limit", response=httpx.Response(429, request=request), body=None)
+
+    def create(self, input, model):
+        texts = [input] if isinstance(input, str) else list(input)
+        delay = self._start_call()
+        self._sleep(delay + self.profile.generation_delay(sum(len(text.split()) for text in texts)))
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=fake_embedding(text)) for i, text in enumerate(texts)
+        ])
+
+
+class FakeEmbeddingFunction:
+    """Chroma embedding function backed by a FakeOpenAIClient."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __call__(self, input):
+        return [item.embedding for item in self.client.create(input, model="fake").data]
+
+    def name(self):
+        return "fake"
+
+    def stats(self):
+        return self.client.stats()
+
+
+class FakeDDGS(FakeProvider):
+    """Stands in for duckduckgo_search.DDGS: a context manager with text() and news()."""
+
+    def __init__(self, profile=None, duplicate_rate=0.3):
+        super().__init__(profile)
+        self.duplicate_rate = duplicate_rate
+
+    def error(self):
+        from duckduckgo_search.exceptions import RatelimitException
+        return RatelimitException("Fake DuckDuckGo rate limit")
+
+    def __call__(self, *args, **kwargs):
+        # DDGS(...) is constructed per use; every instance shares this provider's stats.
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def text(self, keywords, max_results=10, **kwargs):
+        self._sleep(self._start_call())
+        slug = "-".join(keywords.lower().split()) or "example"
+        return [
+            {
+                'title': f"{keywords} - result {i + 1}",
+                'href': f"https://{slug}.example.com/{i + 1}",
+                'body': " ".join(_seeded_words(f"{keywords} text {i}", 40)),
+            }
+            for i in range(max_results)
+        ]
+
+    def news(self, keywords, max_results=10, **kwargs):
+        self._sleep(self._start_call())
+        rng = random.Random(keywords)
+        articles = []
+        for i in range(max_results):
+            # Syndicated copies repeat an earlier story under another outlet.
+            story = rng.randrange(i) if i and rng.random() < self.duplicate_rate else i
+            articles.append({
+                'date': "2025-01-01T00:00:00+00:00",
+                'title': f"{keywords} story {story + 1}",
+                'body': " ".join(_seeded_words(f"{keywords} news {story}", 60)),
+                'url': f"https://outlet{i + 1}.example.com/{story + 1}",
+                'source': f"Outlet {i + 1}",
+            })
+        return articles
+
+
+class FakeProviders:
+    def __init__(self, gemini=None, openai=None, ddgs=None):
+        self.gemini = FakeGeminiModel(gemini)
+        self.openai = FakeOpenAIClient(openai)
+        self.ddgs = FakeDDGS(ddgs)
+        self.embedding_function = FakeEmbeddingFunction(self.openai)
+
+    def reset_stats(self):
+        for provider in (self.gemini, self.openai, self.ddgs):
+            provider.reset_stats()
+
+    def stats(self):
+        return {'gemini': self.gemini.stats(), 'openai': self.openai.stats(), 'ddgs': self.ddgs.stats()}
+
+
+@contextmanager
+def fake_providers(gemini=None, openai=None, ddgs=None):
+    """Routes every Gemini, OpenAI and DuckDuckGo call in the project to fakes with the given profiles.
+
+    Requires Django to be set up. Yields the FakeProviders, whose stats()
+    report the calls each fake served.
+    """
+    from competitor_analysis import search
+    from core import resilience, tokens, utils
+    from django.conf import settings
+    from retrieval import store
+
+    tokens.get_encoding()
+    fakes = FakeProviders(gemini, openai, ddgs)
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch("core.utils.get_model", lambda *args, **kwargs: fakes.gemini))
+        stack.enter_context(mock.patch("core.embeddings.get_openai_client", lambda: fakes.openai))
+        stack.enter_context(mock.patch("news_overview.views.DDGS", fakes.ddgs))
+        stack.enter_context(mock.patch("duckduckgo_search.DDGS", fakes.ddgs))
+        stack.enter_context(mock.patch.object(store, "_embedding_function", fakes.embedding_function))
+        stack.enter_context(mock.patch.object(store, "_collections", {}))
+        stack.enter_context(mock.patch.object(
+            search, "_service", search.build_search_service({**settings.COMPETITOR_SEARCH, 'BACKEND': 'ddgs'})
+        ))
+        stack.enter_context(mock.patch.object(utils, "_prompt_cache", None))
+        resilience.reset_upstreams()
+        try:
+            yield fakes
+        finally:
+            resilience.reset_upstreams()
@@ -0,0 +1,182 @@
+"""Environment, timing and reporting for the offline benchmark suite."""
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+
+# Headers the Django test client derives itself, or that would make Django gzip the reply.
+_SKIPPED_HEADERS = {'host', 'content-length', 'content-type', 'accept-encoding', 'connection'}
+
+
+def setup_environment(workdir, warm_cache=False):
+    """Sets Django up against a scratch database and Chroma directory with the shared caches off.
+
+    With ``warm_cache`` the prompt, news and search caches stay on, which
+    measures the repeat-request path instead of the cold one.
+    """
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    settings.CHROMA_PATH = os.path.join(workdir, "chroma")
+    settings.EMBEDDING_CACHE_PATH = os.path.join(workdir, "embedding_cache.sqlite3")
+    settings.CACHE_SQLITE_PATH = os.path.join(workdir, "cache.sqlite3")
+    settings.COMPETITOR_SEARCH['CACHE_OPTIONS'] = {**settings.COMPETITOR_SEARCH['CACHE_OPTIONS'], 'path': settings.CACHE_SQLITE_PATH}
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = os.path.join(workdir, "bench.sqlite3")
+    settings.JOBS['RUN_IN_PROCESS'] = True
+    settings.SEMANTIC_REUSE['ENABLED'] = False
+    settings.ALLOWED_HOSTS = ['*']
+    if not warm_cache:
+        settings.LLM_CACHE['ENABLED'] = False
+        settings.NEWS_CACHE['ENABLED'] = False
+        settings.COMPETITOR_SEARCH['CACHE_BACKEND'] = None
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+class InProcessAdapter(BaseAdapter):
+    """requests transport that hands requests to the Django test client instead of a socket.
+
+    Mounted on the Streamlit app's session, it lets make_api_request run
+    against the real views without a server.
+    """
+
+    def __init__(self):
+        super().__init__()
+        from django.test import Client
+        self.client = Client()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        from urllib.parse import urlsplit
+        url = urlsplit(request.url)
+        path = url.path + (f"?{url.query}" if url.query else "")
+        headers = {
+            name: value for name, value in request.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        }
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        django_response = self.client.generic(
+            request.method,
+            path,
+            data=body,
+            content_type=request.headers.get('Content-Type', 'application/octet-stream'),
+            headers=headers,
+        )
+        content = b''.join(django_response.streaming_content) if django_response.streaming else django_response.content
+        return self.build_response(request, django_response, content)
+
+    def build_response(self, request, django_response, content):
+        from requests import Response
+        response = Response()
+        response.status_code = django_response.status_code
+        response.reason = getattr(django_response, 'reason_phrase', '')
+        response.headers = CaseInsensitiveDict(dict(django_response.items()))
+        response.raw = io.BytesIO(content)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def summarize(timings):
+    """pytest-benchmark style statistics, in milliseconds."""
+    ordered = sorted(timings)
+    ms = [t * 1000 for t in ordered]
+    return {
+        'rounds': len(ms),
+        'min_ms': round(ms[0], 3),
+        'max_ms': round(ms[-1], 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'median_ms': round(statistics.median(ms), 3),
+        'stddev_ms': round(statistics.stdev(ms), 3) if len(ms) > 1 else 0.0,
+        'p95_ms': round(ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))], 3),
+    }
+
+
+def measure(run, fakes, rounds, warmup):
+    """Times ``run()`` over the given rounds and attributes the simulated upstream time per round."""
+    for _ in range(warmup):
+        run()
+    fakes.reset_stats()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    result = summarize(timings)
+    providers = fakes.stats()
+    simulated_ms = sum(stats['simulated_seconds'] for stats in providers.values()) * 1000 / rounds
+    result['upstream'] = {
+        name: {
+            'calls_per_round': round(stats['calls'] / rounds, 2),
+            'errors_per_round': round(stats['errors'] / rounds, 2),
+            'simulated_ms_per_round': round(stats['simulated_seconds'] * 1000 / rounds, 3),
+        }
+        for name, stats in providers.items()
+    }
+    # Serial upstream time minus wall time: positive when calls overlap,
+    # negative when the project's own work dominates.
+    result['upstream_ms_per_round'] = round(simulated_ms, 3)
+    result['overlap_ms'] = round(simulated_ms - result['mean_ms'], 3)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results, profiles, options):
+    return {
+        'schema': 1,
+        'commit': git_commit(),
+        'created_at': int(time.time()),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'options': options,
+        'profiles': {name: profile.to_dict() for name, profile in profiles.items()},
+        'scenarios': results,
+    }
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def compare(report, baseline_path, threshold=0.10):
+    """Prints the median change of every scenario against a previous report; returns the regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('commit')}):")
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or 'median_ms' not in before:
+            print(f"{name:>32}: new")
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0.0
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"{name:>32}: {before['median_ms']:10.1f} -> {result['median_ms']:10.1f} ms ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
@@ -0,0 +1,111 @@
+"""Offline benchmark suite: every analysis endpoint against fake Gemini, OpenAI and DuckDuckGo.
+
+No API keys or network access are needed. Provider latency, jitter,
+throughput and error rates are set per provider. The JSON report (stats per
+scenario, plus upstream calls and simulated time per round) can be compared
+with a previous run to catch per-endpoint regressions between commits.
+
+Exits non-zero when any scenario fails or regresses. Scenarios that cannot
+run here (the app.py client ones without Streamlit) are skipped instead.
+
+    python -m benchmarks.run_suite --rounds 10 --output bench.json
+    python -m benchmarks.run_suite --only swot news --compare bench.json
+    python -m benchmarks.run_suite --gemini-error-rate 0.1 --gemini-latency 0.8
+"""
+import argparse
+import fnmatch
+import sys
+import tempfile
+import traceback
+import types
+
+
+def _profile_arguments(parser, name, latency, jitter, tokens_per_second):
+    group = parser.add_argument_group(f"{name} profile")
+    group.add_argument(f"--{name}-latency", type=float, default=latency, help="seconds to first token/byte")
+    group.add_argument(f"--{name}-jitter", type=float, default=jitter, help="uniform +/- seconds added to the latency")
+    group.add_argument(f"--{name}-tps", type=float, default=tokens_per_second, help="tokens per second, 0 for instant")
+    group.add_argument(f"--{name}-error-rate", type=float, default=0.0, help="fraction of calls that are rate limited")
+
+
+def _profile(args, name, seed):
+    from benchmarks.fakes import ProviderProfile
+    return ProviderProfile(
+        latency=getattr(args, f"{name}_latency"),
+        jitter=getattr(args, f"{name}_jitter"),
+        tokens_per_second=getattr(args, f"{name}_tps") or None,
+        error_rate=getattr(args, f"{name}_error_rate"),
+        seed=seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="run the scenarios matching these glob patterns or substrings")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the prompt, news and search caches on")
+    parser.add_argument("--output", default="benchmark-report.json")
+    parser.add_argument("--compare", help="previous report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="median slowdown reported as a regression")
+    _profile_arguments(parser, "gemini", latency=0.4, jitter=0.1, tokens_per_second=600)
+    _profile_arguments(parser, "openai", latency=0.15, jitter=0.05, tokens_per_second=0)
+    _profile_arguments(parser, "ddgs", latency=0.5, jitter=0.2, tokens_per_second=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="cofounder-bench-")
+    from benchmarks import harness
+    harness.setup_environment(workdir, warm_cache=args.warm_cache)
+
+    from benchmarks.fakes import fake_providers
+    from benchmarks.scenarios import SCENARIOS, ScenarioSkipped
+    from django.test import Client
+
+    names = list(SCENARIOS)
+    if args.only:
+        names = [
+            name for name in names
+            if any(fnmatch.fnmatch(name, pattern) or pattern in name for pattern in args.only)
+        ]
+
+    profiles = {name: _profile(args, name, seed) for seed, name in enumerate(("gemini", "openai", "ddgs"))}
+    results = {}
+    with fake_providers(**profiles) as fakes:
+        context = types.SimpleNamespace(client=Client(), fakes=fakes, workdir=workdir)
+        print(f"{'scenario':>32} {'median':>10} {'p95':>10} {'upstream':>10}  (ms per round)")
+        for name in names:
+            try:
+                result = harness.measure(SCENARIOS[name](context), fakes, args.rounds, args.warmup)
+            except ScenarioSkipped as e:
+                results[name] = {'skipped': str(e)}
+                print(f"{name:>32} skipped: {e}")
+                continue
+            except Exception as e:
+                traceback.print_exc()
+                results[name] = {'error': str(e)}
+                print(f"{name:>32} failed: {e}")
+                continue
+            results[name] = result
+            print(f"{name:>32} {result['median_ms']:10.1f} {result['p95_ms']:10.1f} {result['upstream_ms_per_round']:10.1f}")
+
+    report = harness.build_report(results, profiles, {
+        'rounds': args.rounds,
+        'warmup': args.warmup,
+        'warm_cache': args.warm_cache,
+    })
+    harness.write_report(report, args.output)
+    print(f"\nReport written to {args.output}")
+
+    failed = [name for name, result in results.items() if 'error' in result]
+    regressions = []
+    if args.compare:
+        ok = {name: result for name, result in results.items() if 'median_ms' in result}
+        regressions = harness.compare({**report, 'scenarios': ok}, args.compare, args.threshold)
+    if failed:
+        print(f"\n{len(failed)} scenarios failed: {', '.join(failed)}")
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark scenarios: one per analysis endpoint (plain and streamed) and for the Streamlit client path.
+
+A scenario takes the shared context and returns the function timed for
+each round.
+"""
+import json
+
+SCENARIOS = {}
+
+
+class ScenarioSkipped(Exception):
+    """Raised while building a scenario that cannot run in this environment."""
+
+
+SWOT_INPUT = {
+    'business_description': "A subscription service delivering locally roasted coffee to small offices.",
+    'industry': "food and beverage",
+}
+MARKET_SIZE_INPUT = {
+    'industry': "food and beverage",
+    'region': "United States",
+    'target_market': "Offices with 10 to 200 employees",
+    'customer_segment': "B2B",
+    'average_selling_price': 120.0,
+}
+BUSINESS_MODEL_INPUT = {
+    'industry': "food and beverage",
+    'target_market': "Offices with 10 to 200 employees",
+    'business_description': SWOT_INPUT['business_description'],
+}
+COMPETITOR_INPUT = {'competitor_1': "Blue Bottle", 'competitor_2': "Trade Coffee", 'competitor_3': "Starbucks"}
+NEWS_INPUT = {'sector': "specialty coffee"}
+REPORT_INPUT = {
+    **SWOT_INPUT,
+    **MARKET_SIZE_INPUT,
+    **COMPETITOR_INPUT,
+    'sector': NEWS_INPUT['sector'],
+}
+
+
+def scenario(name):
+    def register(build):
+        SCENARIOS[name] = build
+        return build
+    return register
+
+
+def _post(context, path, payload, stream=False):
+    body = {**payload, 'stream': True} if stream else payload
+    response = context.client.post(path, data=json.dumps(body), content_type='application/json')
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}: {content[:200]!r}")
+    return content
+
+
+def _view_scenarios(name, path, payload, streamable=True):
+    scenario(name)(lambda context: lambda: _post(context, path, payload))
+    if streamable:
+        scenario(f"{name}_stream")(lambda context: lambda: _post(context, path, payload, stream=True))
+
+
+_view_scenarios("swot_analysis_view", "/swot_analysis/analyze/", SWOT_INPUT)
+_view_scenarios("market_size_view", "/market_size/estimate/", MARKET_SIZE_INPUT)
+_view_scenarios("business_model_view", "/business_model/recommend/", BUSINESS_MODEL_INPUT)
+_view_scenarios("competitor_analysis_view", "/competitor_analysis/analyze/", COMPETITOR_INPUT)
+_view_scenarios("news_overview_view", "/news_overview/overview/", NEWS_INPUT)
+_view_scenarios("full_report_view", "/report/full/", REPORT_INPUT)
+
+
+def _app_module(context):
+    """Imports app.py in bare mode with its HTTP session routed into Django in-process."""
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        raise ScenarioSkipped("streamlit is not installed; the app.py client scenarios need it")
+    import app
+    from benchmarks.harness import InProcessAdapter
+    app.get_http_session().mount(app.DJANGO_BASE_URL, InProcessAdapter())
+    return app
+
+
+@scenario("make_api_request_stream")
+def make_api_request_stream(context):
+    app = _app_module(context)
+
+    def run():
+        if not app.make_api_request(app.DJANGO_SWOT_URL, dict(SWOT_INPUT), "swot_analysis", stream=True):
+            raise RuntimeError("make_api_request returned no result")
+    return run
+
+
+@scenario("make_api_request_job")
+def make_api_request_job(context):
+    app = _app_module(context)
+    # Poll quickly so the client's wait reflects the job, not the poll interval.
+    app.JOB_POLL_INTERVAL = 0.01
+
+    def run():
+        if not app.make_api_request(app.DJANGO_SWOT_URL, dict(SWOT_INPUT), "swot_analysis", stream=False):
+            raise RuntimeError("make_api_request returned no result")
+    return run
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('recommend/', views.business_model_view, name='business_model'),
+    path('recommend-async/', views.business_model_async_view, name='business_model_async'),
 ]
\ No newline at end of file
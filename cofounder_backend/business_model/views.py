@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from .forms import BusinessModelInputForm
-from core.utils import initialize_gemini, generate_text
+from core.utils import initialize_gemini, generate_text, generate_text_async
+from core.streaming import ndjson_event, stream_field, streaming_response, wants_stream
 from django.http import JsonResponse
 import logging
 import json
@@ -8,6 +9,38 @@ import json
 
 logger = logging.getLogger(__name__)
 
+
+def build_business_model_prompt(industry, target_market, business_description):
+    return f"""
+    Recommend suitable monetization models for a business in the {industry} industry, targeting {target_market}.
+
+    Business Description: {business_description}
+
+    Evaluate the revenue potential, scalability, and acquisition costs of each recommended model.
+    Suggest customer acquisition strategies (organic vs. paid) and optimal growth strategies based on market gaps.
+
+    Provide a detailed explanation of each recommended model and its suitability for this business.
+    """
+
+
+def run_business_model(industry, target_market, business_description):
+    """Runs the business model prompt and returns the JSON response payload."""
+    prompt = build_business_model_prompt(industry, target_market, business_description)
+    business_model_result = generate_text(initialize_gemini(), prompt, cache_namespace='business_model')
+    return {
+        'industry': industry,
+        'target_market': target_market,
+        'business_description': business_description,
+        'business_model_result': business_model_result,
+    }
+
+
+def _stream_business_model(model, prompt, payload):
+    result = {}
+    yield from stream_field(model, prompt, 'business_model_result', result, 'business_model')
+    yield ndjson_event('result', data={**payload, 'business_model_result': result['business_model_result']})
+
+
 def business_model_view(request):
     if request.method == 'POST':
         logger.info("business_model_view: Received POST request")
@@ -23,27 +56,16 @@ def business_model_view(request):
                 business_description = form.cleaned_data['business_description']
 
                 
-                prompt = f"""
-                Recommend suitable monetization models for a business in the {industry} industry, targeting {target_market}.
+                if wants_stream(request, data):
+                    logger.info("business_model_view: Streaming response")
+                    prompt = build_business_model_prompt(industry, target_market, business_description)
+                    return streaming_response(_stream_business_model(initialize_gemini(), prompt, {
+                        'industry': industry,
+                        'target_market': target_market,
+                        'business_description': business_description,
+                    }))
 
-                Business Description: {business_description}
-
-                Evaluate the revenue potential, scalability, and acquisition costs of each recommended model.
-                Suggest customer acquisition strategies (organic vs. paid) and optimal growth strategies based on market gaps.
-
-                Provide a detailed explanation of each recommended model and its suitability for this business.
-                """
-
-                model = initialize_gemini()
-                business_model_result = generate_text(model, prompt)
-
-                
-                data = {
-                    'industry': industry,
-                    'target_market': target_market,
-                    'business_description': business_description,
-                    'business_model_result': business_model_result,
-                }
+                data = run_business_model(industry, target_market, business_description)
                 logger.info("business_model_view: Returning JSON response: %s", data)
                 return JsonResponse(data)
             else:
@@ -58,4 +80,38 @@ def business_model_view(request):
             return JsonResponse({'error': str(e)}, status=500) 
     else:
         form = BusinessModelInputForm()
-        return render(request, 'business_model/business_model_input.html', {'form': form})
\ No newline at end of file
+        return render(request, 'business_model/business_model_input.html', {'form': form})
+
+
+async def business_model_async_view(request):
+    """Async variant of business_model_view for ASGI deployments."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        form = BusinessModelInputForm(data)
+        if not form.is_valid():
+            logger.warning("business_model_async_view: Form is invalid: %s", form.errors)
+            return JsonResponse({'error': form.errors}, status=400)
+
+        industry = form.cleaned_data['industry']
+        target_market = form.cleaned_data['target_market']
+        business_description = form.cleaned_data['business_description']
+
+        prompt = build_business_model_prompt(industry, target_market, business_description)
+        business_model_result = await generate_text_async(initialize_gemini(), prompt, cache_namespace='business_model')
+
+        return JsonResponse({
+            'industry': industry,
+            'target_market': target_market,
+            'business_description': business_description,
+            'business_model_result': business_model_result,
+        })
+    except json.JSONDecodeError as e:
+        logger.error("business_model_async_view: Invalid JSON: %s", e)
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except Exception as e:
+        logger.exception("business_model_async_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
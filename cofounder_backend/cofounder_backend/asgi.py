@@ -3,6 +3,16 @@ ASGI config for cofounder_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server so the ``*-async/`` analysis endpoints can keep
+many Gemini requests in flight on one worker's event loop, e.g.::
+
+    uvicorn cofounder_backend.asgi:application --workers 2
+
+Gemini's async client binds to the event loop it first runs on, so the
+async endpoints use a per-loop copy of the shared model
+(core.utils.model_for_running_loop); warming the model up here creates no
+async client.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -14,3 +24,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cofounder_backend.settings")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.GEMINI_WARM_UP:
+    from core.utils import warm_up  # noqa: E402
+
+    warm_up()
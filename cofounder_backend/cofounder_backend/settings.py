@@ -36,6 +36,9 @@ SESSION_COOKIE_HTTPONLY = True
 # Application definition
 import os
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+# Older deployments configured the ask_gemini view with GOOGLE_API_KEY; it is
+# used when GEMINI_API_KEY is not set.
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -51,6 +54,9 @@ INSTALLED_APPS = [
     'competitor_analysis',
     'rest_framework','corsheaders',
     'news_overview',
+    'retrieval',
+    'jobs',
+    'report',
 ]
 LOGGING = {
     'version': 1,
@@ -69,6 +75,10 @@ LOGGING = {
     },
 }
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.BufferedGZipMiddleware",
+    "core.middleware.GzipRequestMiddleware",
+    "core.middleware.RequestDeadlineMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -97,6 +107,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "cofounder_backend.wsgi.application"
+ASGI_APPLICATION = "cofounder_backend.asgi.application"
 
 
 # Database
@@ -162,3 +173,160 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CSRF_TRUSTED_ORIGINS = [
     'http://localhost:8501',
 ]
+
+# Sector outlook sentiment stage: "concurrent" scores each article on a bounded
+# worker pool, "batched" classifies every article in one prompt, "sequential"
+# is the original one-call-at-a-time loop.
+NEWS_SENTIMENT_MODE = os.environ.get("NEWS_SENTIMENT_MODE", "concurrent")
+NEWS_SENTIMENT_MAX_WORKERS = int(os.environ.get("NEWS_SENTIMENT_MAX_WORKERS", 5))
+NEWS_SENTIMENT_TIMEOUT = float(os.environ.get("NEWS_SENTIMENT_TIMEOUT", 20))
+
+# Maximum number of texts sent in a single OpenAI embeddings request.
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 256))
+
+# Create the shared Gemini model when a WSGI/ASGI worker boots instead of on
+# its first request.
+GEMINI_WARM_UP = os.environ.get("GEMINI_WARM_UP", "1") == "1"
+
+# `/core/health/gemini/?probe=1` makes a billable Gemini call, so it is only honoured
+# with DEBUG on, for staff users, or with this token in the X-Health-Token header.
+HEALTH_PROBE_TOKEN = os.environ.get("HEALTH_PROBE_TOKEN")
+
+# SQLite file behind the "sqlite" cache backend (prompt and search caches).
+CACHE_SQLITE_PATH = os.environ.get("CACHE_SQLITE_PATH", os.path.join(BASE_DIR, "cache.sqlite3"))
+
+# Response cache for deterministic analysis prompts, keyed on a hash of the
+# model, generation parameters and prompt. BACKEND is "lru" (per process),
+# "django" (settings.CACHES, OPTIONS {"alias": ...}) or "sqlite" (shared file,
+# OPTIONS {"path": ...}). TTLS are seconds per endpoint namespace.
+LLM_CACHE = {
+    "ENABLED": os.environ.get("LLM_CACHE_ENABLED", "1") == "1",
+    "BACKEND": os.environ.get("LLM_CACHE_BACKEND", "lru"),
+    "OPTIONS": {},
+    "TTLS": {
+        "default": 60 * 60,
+        "swot_assumptions": 7 * 24 * 60 * 60,
+        "swot_analysis": 24 * 60 * 60,
+        "market_size": 7 * 24 * 60 * 60,
+        "business_model": 24 * 60 * 60,
+        "competitor_analysis": 6 * 60 * 60,
+        "news_overview": 15 * 60,
+        "news_sentiment": 24 * 60 * 60,
+    },
+}
+
+# Competitor web search. BACKEND is "ddgs" (DuckDuckGo) or "stub" (offline
+# fake results, BACKEND_OPTIONS {"latency": seconds}). Results are cached per
+# normalized query in a local SQLite table for CACHE_TTL seconds. Each
+# competitor's hits are compacted to at most PROMPT_TOKEN_BUDGET prompt tokens.
+COMPETITOR_SEARCH = {
+    "BACKEND": os.environ.get("COMPETITOR_SEARCH_BACKEND", "ddgs"),
+    "BACKEND_OPTIONS": {},
+    "CACHE_BACKEND": "sqlite",
+    "CACHE_OPTIONS": {"path": CACHE_SQLITE_PATH, "table": "search_cache"},
+    "CACHE_TTL": 6 * 60 * 60,
+    "MAX_WORKERS": 3,
+    "MAX_RESULTS": 3,
+    "PROMPT_TOKEN_BUDGET": int(os.environ.get("COMPETITOR_PROMPT_TOKEN_BUDGET", 300)),
+}
+
+# Vector store owned by the retrieval app. The Chroma directory is the one the
+# Streamlit app used to create at the repository root.
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+CHROMA_PATH = os.environ.get("CHROMA_PATH", os.path.join(os.path.dirname(BASE_DIR), "chroma"))
+EMBEDDING_CACHE_PATH = os.path.join(BASE_DIR, "embedding_cache.sqlite3")
+# Token budget for the RAG context sent with each analysis, per analysis type.
+CONTEXT_TOKEN_BUDGETS = {
+    "swot_analysis": 3000,
+    "market_size_estimation": 2000,
+    "business_model_recommendation": 3000,
+    "competitor_analysis": 2000,
+    "news_overview": 1500,
+}
+# Reuse a stored analysis instead of generating a new one when its inputs are
+# within MAX_COSINE_DISTANCE of the new inputs and it is younger than
+# MAX_AGE_SECONDS for its analysis type. The UI can force a regeneration.
+SEMANTIC_REUSE = {
+    "ENABLED": os.environ.get("SEMANTIC_REUSE_ENABLED", "1") == "1",
+    "MAX_COSINE_DISTANCE": float(os.environ.get("SEMANTIC_REUSE_MAX_DISTANCE", 0.03)),
+    "MAX_AGE_SECONDS": {
+        "default": 7 * 24 * 60 * 60,
+        "market_size_estimation": 30 * 24 * 60 * 60,
+        "competitor_analysis": 24 * 60 * 60,
+        "news_overview": 60 * 60,
+    },
+}
+
+# Background analysis jobs. With RUN_IN_PROCESS each web worker runs jobs on
+# a pool of WORKERS threads; otherwise run `manage.py run_jobs` separately.
+# A running job refreshes its heartbeat every HEARTBEAT_SECONDS; one whose
+# heartbeat is older than STALE_SECONDS has lost its worker and is requeued,
+# so STALE_SECONDS must stay a few heartbeats above HEARTBEAT_SECONDS.
+JOBS = {
+    "WORKERS": int(os.environ.get("JOB_WORKERS", 4)),
+    "RUN_IN_PROCESS": os.environ.get("JOBS_RUN_IN_PROCESS", "1") == "1",
+    "HEARTBEAT_SECONDS": int(os.environ.get("JOB_HEARTBEAT_SECONDS", 15)),
+    "STALE_SECONDS": int(os.environ.get("JOB_STALE_SECONDS", 120)),
+}
+
+# Sector news is served from core.models.MarketSignal while younger than
+# FRESH_SECONDS; until MAX_STALE_SECONDS it is still served while a background
+# refresh runs. `manage.py prewarm_news` fills the cache for PREWARM_SECTORS.
+NEWS_CACHE = {
+    "ENABLED": os.environ.get("NEWS_CACHE_ENABLED", "1") == "1",
+    "FRESH_SECONDS": int(os.environ.get("NEWS_CACHE_FRESH_SECONDS", 60 * 60)),
+    "MAX_STALE_SECONDS": int(os.environ.get("NEWS_CACHE_MAX_STALE_SECONDS", 24 * 60 * 60)),
+    "REFRESH_WORKERS": int(os.environ.get("NEWS_CACHE_REFRESH_WORKERS", 2)),
+    "PREWARM_SECTORS": [
+        sector.strip()
+        for sector in os.environ.get(
+            "NEWS_PREWARM_SECTORS",
+            "fintech,e-commerce,healthcare,edtech,saas,artificial intelligence,climate tech",
+        ).split(",")
+        if sector.strip()
+    ],
+}
+
+# Retry and circuit-breaker policy for upstream providers (core.resilience).
+# A provider's circuit opens after failure_threshold consecutive failures and
+# fails calls fast for reset_timeout seconds. Retries are capped at
+# retry_budget_ratio of recent calls (plus retry_budget_min) so an outage
+# never multiplies traffic. Upstream calls made while serving a request give
+# up once REQUEST_DEADLINE_SECONDS have passed.
+RESILIENCE = {
+    "REQUEST_DEADLINE_SECONDS": float(os.environ.get("REQUEST_DEADLINE_SECONDS", 120)),
+    "DEFAULTS": {
+        "max_attempts": 3,
+        "base_delay": 0.5,
+        "max_delay": 8.0,
+        "failure_threshold": 5,
+        "reset_timeout": 30.0,
+        "retry_budget_ratio": 0.2,
+        "retry_budget_min": 10,
+        "retry_budget_window": 10.0,
+    },
+    "PROVIDERS": {
+        "gemini": {},
+        "openai": {},
+        # DuckDuckGo rate limits clear slowly; back off longer and stay open longer.
+        "ddgs": {"base_delay": 2.0, "max_delay": 10.0, "reset_timeout": 60.0},
+    },
+}
+
+# News articles whose embeddings have at least this cosine similarity are
+# treated as copies of one story: only the first copy is scored for
+# sentiment and put in the overview prompt. Set above 1 to keep every copy.
+NEWS_DEDUP_THRESHOLD = float(os.environ.get("NEWS_DEDUP_THRESHOLD", 0.92))
+
+# Local embedding sentiment classifier (news_overview.classifier). Articles it
+# labels with at least MIN_CONFIDENCE skip the LLM; None uses the threshold
+# calibrated by `manage.py train_sentiment`. Without a model file every
+# article goes to the LLM as before.
+NEWS_SENTIMENT_CLASSIFIER = {
+    "ENABLED": os.environ.get("NEWS_SENTIMENT_CLASSIFIER_ENABLED", "1") == "1",
+    "MODEL_PATH": os.environ.get("NEWS_SENTIMENT_MODEL_PATH", os.path.join(BASE_DIR, "sentiment_classifier.npz")),
+    "DATASET_PATH": os.environ.get("NEWS_SENTIMENT_DATASET_PATH", os.path.join(BASE_DIR, "sentiment_dataset.npz")),
+    "MIN_CONFIDENCE": (
+        float(os.environ["NEWS_SENTIMENT_MIN_CONFIDENCE"]) if os.environ.get("NEWS_SENTIMENT_MIN_CONFIDENCE") else None
+    ),
+}
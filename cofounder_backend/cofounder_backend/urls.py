@@ -25,5 +25,8 @@ urlpatterns = [
     path('business_model/', include('business_model.urls')),
     path('competitor_analysis/', include('competitor_analysis.urls')),
     path('news_overview/', include('news_overview.urls')),
+    path('retrieval/', include('retrieval.urls')),
+    path('jobs/', include('jobs.urls')),
+    path('report/', include('report.urls')),
 
 ]
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cofounder_backend.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.GEMINI_WARM_UP:
+    from core.utils import warm_up  # noqa: E402
+
+    warm_up()
@@ -0,0 +1,85 @@
+"""Turns raw search hits into compact, token-budgeted prompt text.
+
+The prompt used to interpolate the Python repr of each result list: dict
+punctuation, repeated URLs and full snippets. Hits are now normalized to
+one "title (domain): snippet" line each, with at most one hit per domain,
+and cut to a per-competitor token budget.
+"""
+from urllib.parse import urlsplit
+from core import metrics
+from core.tokens import count_tokens, truncate_to_tokens
+import re
+
+NO_RESULTS = "No search results."
+
+tokens_saved = metrics.register(metrics.Counter(
+    "cofounder_competitor_prompt_tokens_saved_total",
+    "Search-result tokens removed from competitor prompts by compaction.",
+))
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def domain_of(url):
+    host = urlsplit(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_hits(results):
+    """Reduces search hits to title/domain/snippet dicts, keeping only the first hit per domain."""
+    hits, seen = [], set()
+    for result in results or []:
+        domain = domain_of(result.get('href') or result.get('url'))
+        title = _clean(result.get('title'))
+        snippet = _clean(result.get('body'))
+        if not (title or snippet):
+            continue
+        if domain:
+            if domain in seen:
+                continue
+            seen.add(domain)
+        hits.append({'title': title, 'domain': domain, 'snippet': snippet})
+    return hits
+
+
+def format_hit(hit):
+    source = f" ({hit['domain']})" if hit['domain'] else ""
+    return f"- {hit['title']}{source}: {hit['snippet']}"
+
+
+def compact_results(results, budget):
+    """Returns the hits as prompt lines within ``budget`` tokens; the last line that fits is cut short."""
+    lines, used = [], 0
+    for hit in normalize_hits(results):
+        line = format_hit(hit)
+        tokens = count_tokens(line)
+        if used + tokens > budget:
+            remaining = budget - used
+            # A cut line is only worth keeping if some of the snippet survives.
+            if remaining > count_tokens(format_hit({**hit, 'snippet': ''})) + 8:
+                lines.append(truncate_to_tokens(line, remaining).rstrip() + "...")
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines) if lines else NO_RESULTS
+
+
+def compact_competitor_results(competitors, budget):
+    """Compacts every (competitor, results) pair and reports the token counts before and after.
+
+    "raw" counts what the repr-based prompt used to contain for the same results.
+    """
+    compacted, raw_tokens, compact_tokens = [], 0, 0
+    for competitor, results in competitors:
+        if not results:
+            compacted.append((competitor, None))
+            continue
+        text = compact_results(results, budget)
+        raw_tokens += count_tokens(str(results))
+        compact_tokens += count_tokens(text)
+        compacted.append((competitor, text))
+    saved = max(raw_tokens - compact_tokens, 0)
+    tokens_saved.inc(saved)
+    return compacted, {'raw': raw_tokens, 'compact': compact_tokens, 'saved': saved}
@@ -0,0 +1,170 @@
+"""Competitor web search: concurrent fan-out over a pluggable backend with a TTL cache.
+
+The backend and cache are configured through settings.COMPETITOR_SEARCH.
+The "stub" backend returns deterministic fake hits after a configurable
+delay so the fan-out and cache can be exercised without network access.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from core import metrics, resilience
+from core.cache import create_backend
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query):
+    """Case-folds and collapses whitespace so trivially different queries share a cache entry."""
+    return re.sub(r"\s+", " ", query or "").strip().casefold()
+
+
+class DDGSBackend:
+    """DuckDuckGo text search that keeps one DDGS session per worker thread."""
+
+    name = "ddgs"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def retryable_errors(self):
+        from duckduckgo_search.exceptions import RatelimitException, TimeoutException
+        return (RatelimitException, TimeoutException)
+
+    def _session(self):
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            from duckduckgo_search import DDGS
+            ddgs = DDGS()
+            self._local.ddgs = ddgs
+        return ddgs
+
+    def search(self, query, max_results):
+        try:
+            return list(self._session().text(query, max_results=max_results))
+        except Exception:
+            # Start the next search on a fresh session in case this one is broken.
+            self._local.ddgs = None
+            raise
+
+
+class StubSearchBackend:
+    """Offline backend returning deterministic results after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        slug = re.sub(r"[^a-z0-9]+", "-", normalize_query(query)).strip("-")
+        return [
+            {
+                "title": f"{query} result {i + 1}",
+                "href": f"https://{slug or 'example'}.example.com/{i + 1}",
+                "body": f"Stub search snippet {i + 1} about {query}.",
+            }
+            for i in range(max_results)
+        ]
+
+
+SEARCH_BACKENDS = {
+    "ddgs": DDGSBackend,
+    "stub": StubSearchBackend,
+}
+
+
+class SearchService:
+    """Runs several searches concurrently, skipping empty queries and caching hits per normalized query."""
+
+    def __init__(self, backend, cache=None, ttl=None, max_workers=3, max_results=3):
+        self.backend = backend
+        self.cache = cache
+        self.ttl = ttl
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+
+    def _cache_key(self, normalized):
+        return f"search:{self.backend.name}:{self.max_results}:{normalized}"
+
+    def search(self, query):
+        """Returns the hits for one query, or None if it is empty or the search failed."""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        key = self._cache_key(normalized)
+        if self.cache is not None:
+            try:
+                cached = self.cache.get(key)
+            except Exception as e:
+                logger.warning(f"Search cache read failed: {e}")
+                cached = None
+            metrics.record_cache('search', hit=cached is not None)
+            if cached is not None:
+                return cached
+        try:
+            with metrics.stage('search'):
+                results = resilience.call(
+                    self.backend.name,
+                    lambda: self.backend.search(query.strip(), self.max_results),
+                    retry_on=getattr(self.backend, 'retryable_errors', ()),
+                )
+        except Exception as e:
+            logger.error(f"Error getting search results for {query}: {e}")
+            return None
+        if self.cache is not None:
+            try:
+                self.cache.set(key, results, self.ttl)
+            except Exception as e:
+                logger.warning(f"Search cache write failed: {e}")
+        return results
+
+    def search_many(self, queries):
+        """Searches every distinct non-empty query concurrently; results line up with ``queries``."""
+        distinct = {}
+        for query in queries:
+            normalized = normalize_query(query)
+            if normalized and normalized not in distinct:
+                distinct[normalized] = self._executor.submit(resilience.propagate(self.search), query)
+        return [
+            distinct[normalize_query(query)].result() if normalize_query(query) else None
+            for query in queries
+        ]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def build_search_service(config):
+    backend_options = config.get("BACKEND_OPTIONS", {})
+    backend = SEARCH_BACKENDS[config.get("BACKEND", "ddgs")](**backend_options)
+    cache = None
+    if config.get("CACHE_BACKEND"):
+        cache = create_backend(config["CACHE_BACKEND"], config.get("CACHE_OPTIONS"))
+    return SearchService(
+        backend,
+        cache=cache,
+        ttl=config.get("CACHE_TTL"),
+        max_workers=config.get("MAX_WORKERS", 3),
+        max_results=config.get("MAX_RESULTS", 3),
+    )
+
+
+def get_search_service():
+    """Returns the process-wide SearchService built from settings.COMPETITOR_SEARCH."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = build_search_service(settings.COMPETITOR_SEARCH)
+    return _service
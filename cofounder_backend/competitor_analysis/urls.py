@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.competitor_analysis_view, name='competitor_analysis'),
+    path('analyze-async/', views.competitor_analysis_async_view, name='competitor_analysis_async'),
 ]
\ No newline at end of file
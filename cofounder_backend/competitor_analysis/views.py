@@ -1,22 +1,79 @@
 from django.shortcuts import render
+from django.conf import settings
+from .compaction import compact_competitor_results
 from .forms import CompetitorAnalysisInputForm
-from core.utils import initialize_gemini, generate_text
+from core.utils import initialize_gemini, generate_text, generate_text_async
+from core.streaming import ndjson_event, stream_field, streaming_response, wants_stream
 from django.http import JsonResponse
+from asgiref.sync import sync_to_async
 import logging
-from duckduckgo_search import DDGS
+from .search import get_search_service
 import json
 
 logger = logging.getLogger(__name__)
 
 def get_search_results(query):
     """Gets search results from DuckDuckGo for a given query."""
-    try:
-        with DDGS() as ddgs:
-            results = [r for r in ddgs.text(query, max_results=3)]  
-            return results
-    except Exception as e:
-        logger.error(f"Error getting search results for {query}: {e}")
-        return None
+    return get_search_service().search(query)
+
+
+def build_competitor_prompt(competitors):
+    """Builds the comparison prompt from (competitor, compacted search results) pairs."""
+    (competitor_1, competitor_1_results), *others = competitors
+    prompt = f"""
+    Analyze the following competitors and provide a comparative analysis, focusing on their strengths, weaknesses, and potential opportunities for differentiation:
+
+    Competitor 1: {competitor_1}
+    Search Results: {competitor_1_results}
+
+    """
+    for number, (competitor, competitor_results) in enumerate(others, start=2):
+        if competitor and competitor_results:
+            prompt += f"""
+    Competitor {number}: {competitor}
+    Search Results: {competitor_results}
+    """
+
+    prompt += """
+    Provide a summary of each competitor's key strengths and weaknesses. Identify opportunities for differentiation based on market gaps and competitor weaknesses. Suggest niche marketing strategies for a new entrant.
+
+    The response should be well-structured and highly suitable for presentation.
+    """
+    return prompt
+
+
+def prepare_competitor_prompt(competitors, results):
+    """Compacts the search results into the prompt; returns the prompt and the search-result token counts."""
+    compacted, search_tokens = compact_competitor_results(
+        list(zip(competitors, results)),
+        settings.COMPETITOR_SEARCH['PROMPT_TOKEN_BUDGET'],
+    )
+    logger.info("competitor_analysis: search results compacted from %d to %d tokens",
+                search_tokens['raw'], search_tokens['compact'])
+    return build_competitor_prompt(compacted), search_tokens
+
+
+def run_competitor_analysis(competitor_1, competitor_2='', competitor_3='', results=None):
+    """Searches every competitor (unless ``results`` already holds the searches), runs the comparison prompt and returns the JSON response payload."""
+    competitors = [competitor_1, competitor_2, competitor_3]
+    if results is None:
+        results = get_search_service().search_many(competitors)
+    prompt, search_tokens = prepare_competitor_prompt(competitors, results)
+    competitor_analysis_result = generate_text(initialize_gemini(), prompt, cache_namespace='competitor_analysis')
+    return {
+        'competitor_1': competitor_1,
+        'competitor_2': competitor_2,
+        'competitor_3': competitor_3,
+        'competitor_analysis_result': competitor_analysis_result,
+        'search_tokens': search_tokens,
+    }
+
+
+def _stream_competitor_analysis(model, prompt, payload):
+    result = {}
+    yield from stream_field(model, prompt, 'competitor_analysis_result', result, 'competitor_analysis')
+    yield ndjson_event('result', data={**payload, 'competitor_analysis_result': result['competitor_analysis_result']})
+
 
 def competitor_analysis_view(request):
     if request.method == 'POST':
@@ -28,50 +85,59 @@ def competitor_analysis_view(request):
                 competitor_1 = form.cleaned_data['competitor_1']
                 competitor_2 = form.cleaned_data['competitor_2']
                 competitor_3 = form.cleaned_data['competitor_3']
-                
-                competitor_1_results = get_search_results(competitor_1)
-                competitor_2_results = get_search_results(competitor_2)
-                competitor_3_results = get_search_results(competitor_3)
-
-                
-                prompt = f"""
-                Analyze the following competitors and provide a comparative analysis, focusing on their strengths, weaknesses, and potential opportunities for differentiation:
-
-                Competitor 1: {competitor_1}
-                Search Results: {competitor_1_results}
-
-                """
-                if competitor_2 and competitor_2_results:
-                    prompt += f"""
-                    Competitor 2: {competitor_2}
-                    Search Results: {competitor_2_results}
-                    """
-                if competitor_3 and competitor_3_results:
-                    prompt += f"""
-                    Competitor 3: {competitor_3}
-                    Search Results: {competitor_3_results}
-                    """
-
-                prompt += """
-                Provide a summary of each competitor's key strengths and weaknesses. Identify opportunities for differentiation based on market gaps and competitor weaknesses. Suggest niche marketing strategies for a new entrant.
-
-                The response should be well-structured and highly suitable for presentation.
-                """
-
-                model = initialize_gemini()
-                competitor_analysis_result = generate_text(model, prompt)
-                
-                data = {
-                    'competitor_1': competitor_1,
-                    'competitor_2': competitor_2,
-                    'competitor_3': competitor_3,
-                    'competitor_analysis_result': competitor_analysis_result,
-                }
+
+                if wants_stream(request, data):
+                    competitors = [competitor_1, competitor_2, competitor_3]
+                    results = get_search_service().search_many(competitors)
+                    prompt, search_tokens = prepare_competitor_prompt(competitors, results)
+                    return streaming_response(_stream_competitor_analysis(initialize_gemini(), prompt, {
+                        'competitor_1': competitor_1,
+                        'competitor_2': competitor_2,
+                        'competitor_3': competitor_3,
+                        'search_tokens': search_tokens,
+                    }))
+
+                data = run_competitor_analysis(competitor_1, competitor_2, competitor_3)
                 return JsonResponse(data)
             else:
                 return JsonResponse({'error': form.errors}, status=400)
-        except Exception as e:
+        except json.JSONDecodeError as e:
             return JsonResponse({'error': f"JSONDecode Error: {e}"}, status=400)
+        except Exception as e:
+            logger.exception("competitor_analysis: An exception occurred: %s", e)
+            return JsonResponse({'error': str(e)}, status=500)
     else:
         form = CompetitorAnalysisInputForm()
-        return render(request, 'competitor_analysis/competitor_analysis_input.html', {'form': form})
\ No newline at end of file
+        return render(request, 'competitor_analysis/competitor_analysis_input.html', {'form': form})
+
+
+async def competitor_analysis_async_view(request):
+    """Async variant of competitor_analysis_view for ASGI deployments."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        form = CompetitorAnalysisInputForm(data)
+        if not form.is_valid():
+            return JsonResponse({'error': form.errors}, status=400)
+
+        competitors = [form.cleaned_data[f'competitor_{i}'] for i in (1, 2, 3)]
+        results = await sync_to_async(get_search_service().search_many, thread_sensitive=False)(competitors)
+
+        prompt, search_tokens = prepare_competitor_prompt(competitors, results)
+        competitor_analysis_result = await generate_text_async(initialize_gemini(), prompt, cache_namespace='competitor_analysis')
+
+        return JsonResponse({
+            'competitor_1': competitors[0],
+            'competitor_2': competitors[1],
+            'competitor_3': competitors[2],
+            'competitor_analysis_result': competitor_analysis_result,
+            'search_tokens': search_tokens,
+        })
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f"JSONDecode Error: {e}"}, status=400)
+    except Exception as e:
+        logger.exception("competitor_analysis: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Competitor, MarketSignal, ScrapedReview, Startup
+from .models import Analysis, Competitor, MarketSignal, ScrapedReview, Startup
 
+admin.site.register(Analysis)
 admin.site.register(Competitor)
 admin.site.register(MarketSignal)
 admin.site.register(ScrapedReview)
-admin.site.register(Startup)
\ No newline at end of file
+admin.site.register(Startup)
@@ -0,0 +1,151 @@
+"""Small key/value caches with per-entry TTLs.
+
+All backends share the same ``get(key)`` / ``set(key, value, ttl)`` interface
+and store JSON-serializable values, so callers can swap them through
+settings without changing code.
+"""
+from collections import OrderedDict
+from django.conf import settings
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LRUBackend:
+    """In-process cache that evicts the least recently used entry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Delegates to one of the caches configured in settings.CACHES."""
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, timeout=ttl)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class SQLiteBackend:
+    """Cache persisted in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path=None, table="cache"):
+        self.path = path or getattr(settings, "CACHE_SQLITE_PATH", os.path.join(settings.BASE_DIR, "cache.sqlite3"))
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            with self._connection() as conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+
+BACKENDS = {
+    "lru": LRUBackend,
+    "django": DjangoCacheBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_backend(name, options=None):
+    """Builds a backend from its short name ('lru', 'django' or 'sqlite')."""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return backend_class(**(options or {}))
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters grouped by namespace."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, namespace, hit):
+        with self._lock:
+            counts = self._counts.setdefault(namespace, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {namespace: dict(counts) for namespace, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
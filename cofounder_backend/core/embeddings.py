@@ -0,0 +1,105 @@
+from django.conf import settings
+from dotenv import load_dotenv
+from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError
+from . import metrics, resilience
+import logging
+import os
+import threading
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# OpenAI accepts up to 2048 inputs per embeddings request; the character cap
+# keeps a chunk comfortably under the per-request token limit as well.
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_CHARS = 400_000
+
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Returns the process-wide OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def _with_retries(call, max_retries):
+    return resilience.call('openai', call, retry_on=RETRYABLE_ERRORS, max_attempts=max_retries)
+
+
+def _chunk(indexed_texts, batch_size, max_chars):
+    """Splits (index, text) pairs into chunks under both the count and size limits."""
+    chunk, chunk_chars = [], 0
+    for index, text in indexed_texts:
+        if chunk and (len(chunk) >= batch_size or chunk_chars + len(text) > max_chars):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append((index, text))
+        chunk_chars += len(text)
+    if chunk:
+        yield chunk
+
+
+def _embed_batch(texts, model):
+    with metrics.stage('embeddings'):
+        response = get_openai_client().embeddings.create(input=texts, model=model)
+    embeddings = [None] * len(texts)
+    for item in response.data:
+        embeddings[item.index] = item.embedding
+    return embeddings
+
+
+def embed_text(text, model=EMBEDDING_MODEL, max_retries=None):
+    """Embeds a single text, returning None if it cannot be embedded."""
+    if not text or not text.strip():
+        return None
+    try:
+        return _with_retries(lambda: _embed_batch([text], model)[0], max_retries)
+    except Exception as e:
+        logger.error(f"Embedding error: {e}")
+        return None
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL, batch_size=None, max_retries=None):
+    """Embeds many texts with as few requests as possible.
+
+    Returns a list aligned with ``texts``. Each chunk is sent as one request;
+    if a chunk keeps failing, or the reply is missing some items, only those
+    items are retried with individual requests. Items that still fail (and
+    blank texts, which the API rejects) come back as None.
+    """
+    batch_size = min(batch_size or getattr(settings, "EMBEDDING_BATCH_SIZE", MAX_BATCH_SIZE), MAX_BATCH_SIZE)
+    embeddings = [None] * len(texts)
+    pending = [(i, text) for i, text in enumerate(texts) if text and text.strip()]
+
+    failed = []
+    for chunk in _chunk(pending, batch_size, MAX_BATCH_CHARS):
+        chunk_texts = [text for _, text in chunk]
+        try:
+            results = _with_retries(lambda: _embed_batch(chunk_texts, model), max_retries)
+        except resilience.ResilienceError as e:
+            # Per-item calls would be refused too.
+            logger.warning(f"Skipping embeddings: {e}")
+            return embeddings
+        except Exception as e:
+            logger.warning(f"Batch embedding of {len(chunk)} texts failed, falling back to per-item calls: {e}")
+            failed.extend(chunk)
+            continue
+        for (index, text), embedding in zip(chunk, results):
+            if embedding is None:
+                failed.append((index, text))
+            else:
+                embeddings[index] = embedding
+
+    for index, text in failed:
+        embeddings[index] = embed_text(text, model, max_retries)
+    return embeddings
@@ -0,0 +1,194 @@
+"""Per-stage timing, token and cache metrics.
+
+``with stage("gemini"):`` times a block. The duration goes into the
+``cofounder_stage_duration_seconds`` histogram, and into the current
+request's timings, which ServerTimingMiddleware returns in a
+``Server-Timing`` header. ``/core/metrics/`` serves every metric in the
+Prometheus text format.
+
+Metrics are kept per process. With several workers, scrape each one or
+aggregate them upstream.
+"""
+from contextlib import contextmanager
+import bisect
+import contextvars
+import threading
+import time
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [
+                f"{self.name}{_label_text(self.labelnames, key)} {value}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series['counts']):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {series['count']}")
+        return lines
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+stage_duration = register(Histogram(
+    "cofounder_stage_duration_seconds", "Time spent in each pipeline stage.", ["stage"],
+))
+request_duration = register(Histogram(
+    "cofounder_request_duration_seconds", "Time to produce a response, by view.", ["view", "method"],
+))
+llm_tokens = register(Histogram(
+    "cofounder_llm_tokens", "Prompt and response sizes per LLM call, in tiktoken tokens.",
+    ["namespace", "kind"], buckets=TOKEN_BUCKETS,
+))
+cache_lookups = register(Counter(
+    "cofounder_cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"],
+))
+stage_errors = register(Counter(
+    "cofounder_stage_errors_total", "Stages that ended in an exception.", ["stage"],
+))
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """Stage durations recorded while serving one request, possibly from several threads."""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self._totals.get(name, (0.0, 0))
+            self._totals[name] = (total + seconds, count + 1)
+
+    def server_timing(self, total=None):
+        """Formats the timings as a Server-Timing header value, slowest stage first."""
+        with self._lock:
+            items = sorted(self._totals.items(), key=lambda item: -item[1][0])
+        entries = [f'{name};dur={seconds * 1000:.1f};desc="{count}x"' for name, (seconds, count) in items]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def request_timings(timings=None):
+    """Collects stage timings for the block, into ``timings`` when resuming a request's existing ones."""
+    timings = timings if timings is not None else RequestTimings()
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Times the block as pipeline stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_duration.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+
+
+def record_cache(cache, hit):
+    cache_lookups.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_tokens(namespace, prompt=None, response=None):
+    """Counts prompt and response tokens for one LLM call; counting never breaks the call."""
+    from .tokens import count_tokens
+    try:
+        if prompt:
+            llm_tokens.observe(count_tokens(prompt), namespace=namespace or "none", kind="prompt")
+        if response:
+            llm_tokens.observe(count_tokens(response), namespace=namespace or "none", kind="response")
+    except Exception:
+        pass
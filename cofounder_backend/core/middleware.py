@@ -0,0 +1,209 @@
+from abc import ABC, abstractmethod
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.decorators import sync_and_async_middleware
+from . import metrics
+from .resilience import deadline, within
+import time
+import zlib
+
+# Output is inflated this many bytes at a time so an oversized body is caught early.
+GUNZIP_CHUNK_SIZE = 64 * 1024
+
+
+def _resume_while_streaming(response, enter, on_close=None):
+    """Runs every step of a streamed body inside ``enter()``, then calls ``on_close()`` once the body ends.
+
+    The view returns before a StreamingHttpResponse body is produced, so
+    context set around get_response() is gone by then. Re-entering it per
+    step (rather than once around the whole body) keeps each set/reset pair
+    in one context even when the server pulls chunks from different threads.
+    """
+    content = response.streaming_content
+    if response.is_async:
+        async def resumed():
+            iterator = aiter(content)
+            try:
+                while True:
+                    with enter():
+                        try:
+                            chunk = await anext(iterator)
+                        except StopAsyncIteration:
+                            break
+                    yield chunk
+            finally:
+                if on_close is not None:
+                    on_close()
+    else:
+        def resumed():
+            iterator = iter(content)
+            try:
+                while True:
+                    with enter():
+                        try:
+                            chunk = next(iterator)
+                        except StopIteration:
+                            break
+                    yield chunk
+            finally:
+                if on_close is not None:
+                    on_close()
+    response.streaming_content = resumed()
+    return response
+
+
+class _SyncAndAsyncMiddleware(ABC):
+    """Runs natively in both WSGI and ASGI stacks, so async views are not pushed onto a thread.
+
+    Subclasses implement the request handling twice: ``handle`` for the sync
+    stack and ``__acall__`` for the async one.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    @abstractmethod
+    async def __acall__(self, request):
+        """Handles ``request`` when the middleware chain is async."""
+
+    @abstractmethod
+    def handle(self, request):
+        """Handles ``request`` when the middleware chain is sync."""
+
+
+def _gunzip(data, limit):
+    """Inflates a gzip body, or returns None as soon as it grows past ``limit`` bytes (None for no limit)."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks, size = [], 0
+    while True:
+        chunk = decompressor.decompress(data, GUNZIP_CHUNK_SIZE)
+        size += len(chunk)
+        if limit is not None and size > limit:
+            return None
+        chunks.append(chunk)
+        data = decompressor.unconsumed_tail
+        if not data and not chunk:
+            break
+    if not decompressor.eof:
+        raise EOFError("Compressed body ended before the end-of-stream marker was reached")
+    return b''.join(chunks)
+
+
+@sync_and_async_middleware
+class GzipRequestMiddleware(_SyncAndAsyncMiddleware):
+    """Decompresses request bodies sent with ``Content-Encoding: gzip``.
+
+    The decompressed body is held to settings.DATA_UPLOAD_MAX_MEMORY_SIZE,
+    the same cap Django puts on an uncompressed one, so a small gzip bomb
+    cannot inflate into gigabytes of memory.
+    """
+
+    def decompress(self, request):
+        """Returns an error response for a bad or oversized gzip body, else None."""
+        if request.META.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+            try:
+                body = _gunzip(request.body, settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+            except (zlib.error, EOFError) as e:
+                return JsonResponse({'error': f"Invalid gzip body: {e}"}, status=400)
+            if body is None:
+                return JsonResponse({'error': "Decompressed request body is too large"}, status=413)
+            request._body = body
+            del request.META['HTTP_CONTENT_ENCODING']
+        return None
+
+    def handle(self, request):
+        error = self.decompress(request)
+        if error is not None:
+            return error
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        error = self.decompress(request)
+        if error is not None:
+            return error
+        return await self.get_response(request)
+
+
+class BufferedGZipMiddleware(GZipMiddleware):
+    """Django's GZipMiddleware, minus streaming responses.
+
+    Gzip holds back output until its buffer fills, which would delay every
+    NDJSON chunk and defeat streaming.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        return super().process_response(request, response)
+
+
+@sync_and_async_middleware
+class RequestDeadlineMiddleware(_SyncAndAsyncMiddleware):
+    """Bounds the upstream calls a request makes to settings.RESILIENCE['REQUEST_DEADLINE_SECONDS'].
+
+    The deadline also covers the upstream calls a streamed body makes.
+    """
+
+    def handle(self, request):
+        with deadline(settings.RESILIENCE['REQUEST_DEADLINE_SECONDS']) as current:
+            response = self.get_response(request)
+        return self.finish(response, current)
+
+    async def __acall__(self, request):
+        with deadline(settings.RESILIENCE['REQUEST_DEADLINE_SECONDS']) as current:
+            response = await self.get_response(request)
+        return self.finish(response, current)
+
+    def finish(self, response, current):
+        if response.streaming:
+            return _resume_while_streaming(response, lambda: within(current))
+        return response
+
+
+@sync_and_async_middleware
+class ServerTimingMiddleware(_SyncAndAsyncMiddleware):
+    """Adds a Server-Timing header with the request's stage durations and records its latency.
+
+    Streamed responses only report the stages that ran before the first byte
+    in the header; their recorded latency runs until the body is finished.
+    """
+
+    def handle(self, request):
+        started = time.perf_counter()
+        with metrics.request_timings() as timings:
+            response = self.get_response(request)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with metrics.request_timings() as timings:
+            response = await self.get_response(request)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        response['Server-Timing'] = timings.server_timing(total=time.perf_counter() - started)
+        if response.streaming:
+            return _resume_while_streaming(
+                response,
+                lambda: metrics.request_timings(timings),
+                lambda: self.record(request, started),
+            )
+        self.record(request, started)
+        return response
+
+    def record(self, request, started):
+        match = getattr(request, 'resolver_match', None)
+        metrics.request_duration.observe(
+            time.perf_counter() - started,
+            view=match.view_name if match else 'unresolved',
+            method=request.method,
+        )
@@ -0,0 +1,35 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_prompt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Analysis",
+            fields=[
+                ("id", models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ("analysis_type", models.CharField(max_length=64)),
+                ("input_hash", models.CharField(max_length=64)),
+                ("inputs", models.JSONField()),
+                ("response", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["analysis_type", "-created_at", "-id"],
+                        name="core_analysis_history_idx",
+                    ),
+                    models.Index(
+                        fields=["analysis_type", "input_hash", "-created_at"],
+                        name="core_analysis_input_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
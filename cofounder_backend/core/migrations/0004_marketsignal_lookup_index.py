@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_analysis"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="marketsignal",
+            index=models.Index(
+                fields=["source", "query", "-timestamp"],
+                name="core_signal_lookup_idx",
+            ),
+        ),
+    ]
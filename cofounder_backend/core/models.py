@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Startup(models.Model):
     name = models.CharField(max_length=255)
@@ -24,6 +25,9 @@ class MarketSignal(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     data = models.JSONField()  
 
+    class Meta:
+        indexes = [models.Index(fields=['source', 'query', '-timestamp'], name='core_signal_lookup_idx')]
+
     def __str__(self):
         return f"{self.source} - {self.query} - {self.timestamp}"
 
@@ -42,4 +46,35 @@ class UserPrompt(models.Model):
     text = models.TextField()
 
     def __str__(self):
-        return self.text
\ No newline at end of file
+        return self.text
+
+
+class Analysis(models.Model):
+    """A completed analysis. Its vector store entry holds only this ID and the input embedding."""
+    id = models.CharField(primary_key=True, max_length=100)
+    analysis_type = models.CharField(max_length=64)
+    input_hash = models.CharField(max_length=64)
+    inputs = models.JSONField()
+    response = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['analysis_type', '-created_at', '-id'], name='core_analysis_history_idx'),
+            models.Index(fields=['analysis_type', 'input_hash', '-created_at'], name='core_analysis_input_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.analysis_type} {self.id}"
+
+    def as_context(self):
+        """The text handed to later prompts as prior context."""
+        return f"User Input: {self.inputs}\nAPI Response: {self.response}"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': int(self.created_at.timestamp()),
+            'user_input': self.inputs,
+            'api_response': self.response,
+        }
@@ -0,0 +1,324 @@
+"""Retries, backoff, circuit breakers and deadlines for calls to upstream providers.
+
+Every call to Gemini, the OpenAI embeddings API or DuckDuckGo goes through
+``call(provider, fn, retry_on=...)``:
+
+* Each provider has a circuit breaker. After ``failure_threshold``
+  consecutive retryable failures it opens, and calls fail at once with
+  CircuitOpenError until ``reset_timeout`` has passed and a single probe
+  call succeeds. A worker never waits on an upstream already known to be down.
+* Retries use full-jitter exponential backoff and draw from a per-provider
+  retry budget (a fraction of recent calls), so an outage does not turn
+  into a retry storm.
+* ``deadline(seconds)`` bounds every call made inside it. No retry is
+  attempted, and no backoff slept, past the deadline. Pool threads inherit
+  the caller's deadline when their work is wrapped with ``propagate()``.
+
+Per-provider settings live in settings.RESILIENCE.
+"""
+from collections import deque
+from contextlib import contextmanager
+from django.conf import settings
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    'max_attempts': 3,
+    'base_delay': 0.5,
+    'max_delay': 8.0,
+    'failure_threshold': 5,
+    'reset_timeout': 30.0,
+    'retry_budget_ratio': 0.2,
+    'retry_budget_min': 10,
+    'retry_budget_window': 10.0,
+}
+
+
+class ResilienceError(Exception):
+    """A call was refused without reaching the upstream."""
+
+
+class CircuitOpenError(ResilienceError):
+    pass
+
+
+class DeadlineExceededError(ResilienceError):
+    pass
+
+
+def backoff_delay(attempt, base_delay, max_delay, rng=random):
+    """Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]."""
+    return rng.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class Deadline:
+    def __init__(self, seconds, clock=time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+_current_deadline = contextvars.ContextVar('resilience_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Bounds the calls made in the block to ``seconds``; a nested deadline can only shorten it."""
+    new = Deadline(seconds)
+    current = _current_deadline.get()
+    if current is not None and current.expires_at < new.expires_at:
+        new = current
+    with within(new):
+        yield new
+
+
+@contextmanager
+def within(current):
+    """Makes an existing Deadline (or None) current for the block, e.g. while a streamed body is produced."""
+    token = _current_deadline.set(current)
+    try:
+        yield current
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+def propagate(fn):
+    """Wraps fn to run in a copy of the caller's context, carrying its deadline into pool threads."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def allow(self):
+        """Returns whether a call may go ahead; while half-open only one probe is let through."""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        """Ends a call whose outcome says nothing about the upstream's health, freeing the half-open probe slot."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def snapshot(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures}
+
+
+class RetryBudget:
+    """Allows ``min_retries`` plus ``ratio`` retries per call made within the last ``window`` seconds."""
+
+    def __init__(self, ratio=0.2, min_retries=10, window=10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = deque()
+        self._retries = deque()
+
+    def _prune(self, now):
+        for events in (self._calls, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_call(self):
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._calls.append(now)
+
+    def try_acquire(self):
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class Upstream:
+    """The breaker, retry budget and backoff policy for one provider."""
+
+    def __init__(self, name, clock=time.monotonic, **options):
+        options = {**DEFAULT_OPTIONS, **options}
+        self.name = name
+        self.max_attempts = options['max_attempts']
+        self.base_delay = options['base_delay']
+        self.max_delay = options['max_delay']
+        self.breaker = CircuitBreaker(name, options['failure_threshold'], options['reset_timeout'], clock)
+        self.budget = RetryBudget(
+            options['retry_budget_ratio'],
+            options['retry_budget_min'],
+            options['retry_budget_window'],
+            clock,
+        )
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(provider):
+    upstream = _upstreams.get(provider)
+    if upstream is None:
+        with _upstreams_lock:
+            upstream = _upstreams.get(provider)
+            if upstream is None:
+                config = getattr(settings, 'RESILIENCE', {})
+                options = {**config.get('DEFAULTS', {}), **config.get('PROVIDERS', {}).get(provider, {})}
+                upstream = Upstream(provider, **options)
+                _upstreams[provider] = upstream
+    return upstream
+
+
+def configure_upstream(provider, clock=time.monotonic, **options):
+    """Replaces a provider's breaker, budget and policy, e.g. with tighter limits in tests."""
+    with _upstreams_lock:
+        _upstreams[provider] = Upstream(provider, clock=clock, **options)
+    return _upstreams[provider]
+
+
+def reset_upstreams():
+    with _upstreams_lock:
+        _upstreams.clear()
+
+
+def upstream_states():
+    return {name: upstream.breaker.snapshot() for name, upstream in list(_upstreams.items())}
+
+
+def _before_attempt(upstream, attempt):
+    current = current_deadline()
+    if current is not None and current.expired():
+        raise DeadlineExceededError(f"Deadline passed before calling {upstream.name}")
+    if not upstream.breaker.allow():
+        raise CircuitOpenError(f"{upstream.name} is unavailable (circuit open)")
+    if attempt == 0:
+        upstream.budget.record_call()
+
+
+def _retry_delay(upstream, attempt, max_attempts, error):
+    """Returns how long to wait before the next attempt, or None if the error should propagate."""
+    upstream.breaker.record_failure()
+    if attempt + 1 >= max_attempts:
+        return None
+    delay = backoff_delay(attempt, upstream.base_delay, upstream.max_delay)
+    current = current_deadline()
+    if current is not None and current.remaining() <= delay:
+        return None
+    if not upstream.budget.try_acquire():
+        logger.warning(f"Retry budget for {upstream.name} exhausted, not retrying: {error}")
+        return None
+    logger.warning(f"{upstream.name} call failed (attempt {attempt + 1}/{max_attempts}), retrying in {delay:.2f}s: {error}")
+    return delay
+
+
+def call(provider, fn, retry_on=(), max_attempts=None, sleep=time.sleep):
+    """Calls ``fn()`` through the provider's circuit breaker, retry budget and the current deadline.
+
+    Only exceptions in ``retry_on`` are retried and count against the
+    breaker; anything else propagates at once. Raises CircuitOpenError or
+    DeadlineExceededError without calling ``fn`` when the call cannot succeed.
+    """
+    upstream = get_upstream(provider)
+    max_attempts = max_attempts or upstream.max_attempts
+    attempt = 0
+    while True:
+        _before_attempt(upstream, attempt)
+        try:
+            result = fn()
+        except retry_on as e:
+            delay = _retry_delay(upstream, attempt, max_attempts, e)
+            if delay is None:
+                raise
+            sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # A bad request (or a cancelled call) says nothing about the upstream's
+            # health: neither close a half-open circuit nor count a failure.
+            upstream.breaker.release()
+            raise
+        upstream.breaker.record_success()
+        return result
+
+
+async def call_async(provider, fn, retry_on=(), max_attempts=None):
+    """Async counterpart of call(); ``fn`` returns an awaitable and backoff uses asyncio.sleep."""
+    upstream = get_upstream(provider)
+    max_attempts = max_attempts or upstream.max_attempts
+    attempt = 0
+    while True:
+        _before_attempt(upstream, attempt)
+        try:
+            result = await fn()
+        except retry_on as e:
+            delay = _retry_delay(upstream, attempt, max_attempts, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            upstream.breaker.release()
+            raise
+        upstream.breaker.record_success()
+        return result
@@ -0,0 +1,47 @@
+"""NDJSON streaming helpers for the analysis endpoints.
+
+A streamed response is a sequence of JSON lines:
+
+    {"event": "chunk", "field": "swot_result", "text": "..."}
+    {"event": "error", "field": "swot_result", "error": "..."}
+    {"event": "result", "data": {...same keys as the JSON response...}}
+
+Clients opt in with ``"stream": true`` in the request body or ``?stream=1``.
+"""
+from django.http import StreamingHttpResponse
+from .utils import stream_text
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def wants_stream(request, data):
+    return bool(data.get('stream')) or request.GET.get('stream') in ('1', 'true')
+
+
+def ndjson_event(event, **fields):
+    return json.dumps({'event': event, **fields}) + '\n'
+
+
+def stream_field(model, prompt, field, result, cache_namespace=None):
+    """Yields chunk events for one generated field and stores the full text in result[field]."""
+    parts = []
+    try:
+        for text in stream_text(model, prompt, cache_namespace):
+            parts.append(text)
+            yield ndjson_event('chunk', field=field, text=text)
+        result[field] = ''.join(parts)
+    except Exception as e:
+        logger.error(f"Streaming error for {field}: {e}")
+        result[field] = None
+        yield ndjson_event('error', field=field, error=str(e))
+
+
+def streaming_response(events):
+    response = StreamingHttpResponse(events, content_type=NDJSON_CONTENT_TYPE)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,257 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from unittest import mock
+from . import resilience, tokens, views
+from .middleware import GzipRequestMiddleware
+import asyncio
+import gzip
+import time
 
-# Create your tests here.
+
+class RateLimited(Exception):
+    """Stands in for a provider's 429 error."""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeUpstream:
+    """Replays a script of outcomes: 'ok', '429', 'error', each after ``latency`` seconds."""
+
+    def __init__(self, script, latency=0.0):
+        self.script = list(script)
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        outcome = self.script.pop(0) if self.script else 'ok'
+        if outcome == '429':
+            raise RateLimited("429 Too Many Requests")
+        if outcome == 'error':
+            raise ValueError("400 Bad Request")
+        return 'ok'
+
+
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        resilience.reset_upstreams()
+        self.clock = FakeClock()
+        self.sleeps = []
+
+    def tearDown(self):
+        resilience.reset_upstreams()
+
+    def configure(self, **options):
+        return resilience.configure_upstream('fake', clock=self.clock, **options)
+
+    def call(self, upstream, **kwargs):
+        return resilience.call('fake', upstream, retry_on=(RateLimited,), sleep=self.sleeps.append, **kwargs)
+
+    def test_retries_rate_limits_with_jittered_backoff(self):
+        self.configure(max_attempts=3, base_delay=1.0, max_delay=1.5)
+        upstream = FakeUpstream(['429', '429', 'ok'])
+
+        self.assertEqual(self.call(upstream), 'ok')
+        self.assertEqual(upstream.calls, 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(0 <= self.sleeps[0] <= 1.0)
+        self.assertTrue(0 <= self.sleeps[1] <= 1.5)
+
+    def test_gives_up_after_max_attempts(self):
+        self.configure(max_attempts=2)
+        upstream = FakeUpstream(['429', '429', '429'])
+
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 2)
+
+    def test_non_retryable_errors_propagate_without_tripping_the_breaker(self):
+        upstream_state = self.configure(failure_threshold=1)
+        upstream = FakeUpstream(['error'])
+
+        with self.assertRaises(ValueError):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 1)
+        self.assertEqual(upstream_state.breaker.state, resilience.CircuitBreaker.CLOSED)
+
+    def test_open_circuit_fails_fast_then_probes_after_reset_timeout(self):
+        self.configure(max_attempts=1, failure_threshold=2, reset_timeout=30.0)
+        upstream = FakeUpstream(['429', '429'])
+        for _ in range(2):
+            with self.assertRaises(RateLimited):
+                self.call(upstream)
+
+        with self.assertRaises(resilience.CircuitOpenError):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 2)
+
+        self.clock.advance(30.0)
+        self.assertEqual(self.call(upstream), 'ok')
+        self.assertEqual(upstream.calls, 3)
+        self.assertEqual(self.call(upstream), 'ok')
+
+    def test_failed_probe_reopens_the_circuit(self):
+        self.configure(max_attempts=1, failure_threshold=1, reset_timeout=10.0)
+        upstream = FakeUpstream(['429', '429'])
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+
+        self.clock.advance(10.0)
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+        with self.assertRaises(resilience.CircuitOpenError):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 2)
+
+    def test_non_retryable_error_during_a_probe_keeps_the_circuit_half_open(self):
+        upstream_state = self.configure(max_attempts=1, failure_threshold=1, reset_timeout=10.0)
+        upstream = FakeUpstream(['429', 'error', 'ok'])
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+
+        self.clock.advance(10.0)
+        with self.assertRaises(ValueError):
+            self.call(upstream)
+        self.assertEqual(upstream_state.breaker.state, resilience.CircuitBreaker.HALF_OPEN)
+
+        # The probe slot was released, so the next call probes again.
+        self.assertEqual(self.call(upstream), 'ok')
+        self.assertEqual(upstream_state.breaker.state, resilience.CircuitBreaker.CLOSED)
+
+    def test_retry_budget_limits_retries_during_an_outage(self):
+        self.configure(max_attempts=5, failure_threshold=100, retry_budget_ratio=0.0, retry_budget_min=2)
+        upstream = FakeUpstream(['429'] * 10)
+
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 3)
+
+        with self.assertRaises(RateLimited):
+            self.call(upstream)
+        self.assertEqual(upstream.calls, 4)
+
+    def test_no_retry_when_backoff_would_pass_the_deadline(self):
+        self.configure(max_attempts=5, base_delay=10.0, max_delay=10.0)
+        upstream = FakeUpstream(['429', 'ok'], latency=0.01)
+
+        with resilience.deadline(0.5):
+            with self.assertRaises(RateLimited):
+                resilience.call('fake', upstream, retry_on=(RateLimited,),
+                                sleep=lambda seconds: self.sleeps.append(seconds))
+        self.assertEqual(upstream.calls, 1)
+
+    def test_expired_deadline_skips_the_call(self):
+        self.configure()
+        upstream = FakeUpstream(['ok'])
+
+        with resilience.deadline(0.01):
+            time.sleep(0.02)
+            with self.assertRaises(resilience.DeadlineExceededError):
+                self.call(upstream)
+        self.assertEqual(upstream.calls, 0)
+
+    def test_nested_deadline_cannot_extend_the_outer_one(self):
+        with resilience.deadline(1.0) as outer:
+            with resilience.deadline(60.0) as inner:
+                self.assertIs(inner, outer)
+        self.assertIsNone(resilience.current_deadline())
+
+    def test_propagate_carries_the_deadline_into_pool_threads(self):
+        with resilience.deadline(5.0) as current:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                seen = list(executor.map(
+                    resilience.propagate(lambda _: resilience.current_deadline()), range(4)
+                ))
+        self.assertTrue(all(deadline is current for deadline in seen))
+
+    def test_async_call_retries_rate_limits(self):
+        self.configure(max_attempts=3, base_delay=0.001, max_delay=0.001)
+        upstream = FakeUpstream(['429', 'ok'], latency=0.01)
+
+        async def fetch():
+            return upstream()
+
+        result = asyncio.run(resilience.call_async('fake', fetch, retry_on=(RateLimited,)))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(upstream.calls, 2)
+
+
+@override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=64 * 1024)
+class GzipRequestMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.middleware = GzipRequestMiddleware(lambda request: HttpResponse(request.body))
+
+    def post(self, body):
+        return self.middleware(RequestFactory().post(
+            '/', data=body, content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+        ))
+
+    def test_decompresses_the_body(self):
+        response = self.post(gzip.compress(b'{"industry": "fintech"}'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"industry": "fintech"}')
+
+    def test_rejects_a_body_that_inflates_past_the_upload_limit(self):
+        bomb = gzip.compress(b'0' * 10 * 1024 * 1024)
+        self.assertLess(len(bomb), 64 * 1024)
+        self.assertEqual(self.post(bomb).status_code, 413)
+
+    def test_rejects_corrupt_and_truncated_bodies(self):
+        self.assertEqual(self.post(b'not gzip').status_code, 400)
+        self.assertEqual(self.post(gzip.compress(b'{"industry": "fintech"}')[:-8]).status_code, 400)
+
+
+@override_settings(DEBUG=False, HEALTH_PROBE_TOKEN="s3cret")
+class GeminiHealthViewTests(SimpleTestCase):
+    def probe(self, **headers):
+        request = RequestFactory().get('/core/health/gemini/', {'probe': '1'}, headers=headers)
+        request.user = AnonymousUser()
+        with mock.patch.object(views, 'health_check', return_value={'ok': True}) as health_check:
+            views.gemini_health_view(request)
+        return health_check.call_args.kwargs['probe']
+
+    def test_anonymous_probe_does_not_call_gemini(self):
+        self.assertFalse(self.probe())
+        self.assertFalse(self.probe(X_Health_Token="wrong"))
+
+    def test_probe_with_the_shared_token_calls_gemini(self):
+        self.assertTrue(self.probe(X_Health_Token="s3cret"))
+
+
+class GetEncodingTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for patcher in (
+            mock.patch.dict(tokens._encodings, clear=True),
+            mock.patch.dict(tokens._failures, clear=True),
+            mock.patch.object(tokens, 'monotonic', self.clock),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_a_failed_load_is_retried_after_a_doubling_backoff(self):
+        encoding = object()
+        with mock.patch.object(tokens.tiktoken, 'encoding_for_model', side_effect=[OSError("offline"), OSError("offline"), encoding]) as load:
+            self.assertIsNone(tokens.get_encoding())
+            self.clock.advance(tokens.RETRY_BASE_SECONDS - 1)
+            self.assertIsNone(tokens.get_encoding())
+            self.assertEqual(load.call_count, 1)
+            self.clock.advance(1)
+            self.assertIsNone(tokens.get_encoding())
+            self.clock.advance(2 * tokens.RETRY_BASE_SECONDS)
+            self.assertIs(tokens.get_encoding(), encoding)
+            self.assertIs(tokens.get_encoding(), encoding)
+        self.assertEqual(load.call_count, 3)
@@ -0,0 +1,70 @@
+"""Shared tiktoken helpers.
+
+The encoder is built once per process, so hot paths that budget prompt or
+context size do not rebuild it on every request.
+
+tiktoken downloads its encoding on first use. When that fails (offline or
+sandboxed servers) counts fall back to a characters-per-token estimate
+instead of failing the request, and the download is retried after a
+backoff that doubles with each failure.
+"""
+from time import monotonic
+import logging
+import threading
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_MODEL = "gpt-4o-mini-2024-07-18"
+# Rough average for English text with OpenAI's tokenizers.
+CHARS_PER_TOKEN = 4
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 30 * 60
+
+_encodings = {}
+# model_name -> (consecutive failures, monotonic time of the next attempt)
+_failures = {}
+_lock = threading.Lock()
+
+
+def get_encoding(model_name=TOKENIZER_MODEL):
+    """Returns the tiktoken encoding, or None while it cannot be loaded in this process."""
+    encoding = _encodings.get(model_name)
+    if encoding is not None:
+        return encoding
+    with _lock:
+        if model_name in _encodings:
+            return _encodings[model_name]
+        failures, retry_at = _failures.get(model_name, (0, 0.0))
+        if monotonic() < retry_at:
+            return None
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except Exception as e:
+            delay = min(RETRY_BASE_SECONDS * 2 ** failures, RETRY_MAX_SECONDS)
+            _failures[model_name] = (failures + 1, monotonic() + delay)
+            logger.warning(f"tiktoken encoding for {model_name} unavailable, estimating tokens from length for {delay} s: {e}")
+            return None
+        _failures.pop(model_name, None)
+        _encodings[model_name] = encoding
+        return encoding
+
+
+def count_tokens(text):
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts text to at most ``max_tokens`` tokens, on a token boundary."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
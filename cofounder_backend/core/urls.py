@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
     path('ask-gemini/', views.ask_gemini, name='ask_gemini'),
     path('get-csrf-token/', views.get_csrf_token_view, name='get_csrf_token'),
+    path('health/gemini/', views.gemini_health_view, name='gemini_health'),
+    path('cache/stats/', views.prompt_cache_stats_view, name='prompt_cache_stats'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
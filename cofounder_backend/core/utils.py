@@ -1,22 +1,282 @@
-
 import google.generativeai as genai
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from google.api_core import exceptions as google_exceptions
+from . import metrics, resilience
+from .cache import CacheStats, create_backend
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = 'gemini-2.0-flash-lite-preview-02-05'
+
+# Rate limits, overload and timeouts are worth retrying; bad requests are not.
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+_configured = False
+_models = {}
+# registry key -> (model_name, generation_config) the shared model was built with
+_model_args = {}
+_registry_lock = threading.Lock()
+# event loop -> {registry key: GenerativeModel used for async calls on that loop}
+_loop_models = weakref.WeakKeyDictionary()
+
+
+def _registry_key(model_name, generation_config):
+    config = json.dumps(generation_config or {}, sort_keys=True, default=str)
+    return model_name, config
+
+
+def _configure():
+    """Configures the Gemini SDK once per process, from GEMINI_API_KEY or else the older GOOGLE_API_KEY."""
+    global _configured
+    if not _configured:
+        api_key = settings.GEMINI_API_KEY
+        if not api_key:
+            api_key = getattr(settings, 'GOOGLE_API_KEY', None)
+            if api_key:
+                logger.warning("GEMINI_API_KEY is not set; using GOOGLE_API_KEY for Gemini")
+        genai.configure(api_key=api_key)
+        _configured = True
+
+
+def get_model(model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """Returns the shared GenerativeModel for this name and generation config.
+
+    Models are created lazily on first use and then reused by every request
+    and thread in the process, so the SDK client and its HTTP connections
+    are set up once per worker instead of once per call.
+    """
+    key = _registry_key(model_name, generation_config)
+    model = _models.get(key)
+    if model is None:
+        with _registry_lock:
+            model = _models.get(key)
+            if model is None:
+                _configure()
+                model = genai.GenerativeModel(model_name, generation_config=generation_config)
+                _models[key] = model
+                _model_args[key] = (model_name, generation_config)
+    return model
+
+
+def model_for_running_loop(model):
+    """Returns the running event loop's own GenerativeModel for a shared registry model.
+
+    GenerativeModel creates its async gRPC client on the first
+    generate_content_async() call and binds it to the loop it runs on;
+    awaiting it from another loop (another worker, async_to_sync, a test
+    client) fails or hangs. Each loop therefore gets its own model, built
+    from the same name and generation config and kept for the loop's
+    lifetime. Models that did not come from get_model() are returned as is.
+    """
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        key = next((key for key, shared in _models.items() if shared is model), None)
+        if key is None:
+            return model
+        models = _loop_models.get(loop)
+        if models is None:
+            models = _loop_models[loop] = {}
+        loop_model = models.get(key)
+        if loop_model is None:
+            model_name, generation_config = _model_args[key]
+            loop_model = models[key] = genai.GenerativeModel(model_name, generation_config=generation_config)
+    return loop_model
+
+
+def reset_models():
+    """Drops every cached model, e.g. after rotating the API key."""
+    global _configured
+    with _registry_lock:
+        _models.clear()
+        _model_args.clear()
+        _loop_models.clear()
+        _configured = False
+
+
+def warm_up(model_names=None):
+    """Creates the given models ahead of the first request."""
+    for model_name in model_names or [DEFAULT_MODEL_NAME]:
+        try:
+            get_model(model_name)
+        except Exception as e:
+            logger.error(f"Gemini warm-up failed for {model_name}: {e}")
+
+
+def health_check(model_name=DEFAULT_MODEL_NAME, probe=False):
+    """Reports whether the model can be created and, with probe=True, answer a prompt."""
+    status = {'model': model_name, 'configured': _configured, 'cached_models': len(_models)}
+    started = time.perf_counter()
+    try:
+        model = get_model(model_name)
+        if probe:
+            model.generate_content("ping", generation_config={'max_output_tokens': 1})
+        status['ok'] = True
+    except Exception as e:
+        status['ok'] = False
+        status['error'] = str(e)
+    status['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return status
+
 
 def initialize_gemini():
-    """Initializes the Gemini API with your API key."""
+    """Returns the shared Gemini model used by the analysis views."""
     try:
-        genai.configure(api_key=settings.GEMINI_API_KEY)  
-        return genai.GenerativeModel('gemini-2.0-flash-lite-preview-02-05') 
+        return get_model()
     except Exception as e:
         print(f"Gemini API Initialization Error: {e}")
-        return None  
+        return None
+
+
+_prompt_cache = None
+_prompt_cache_lock = threading.Lock()
+prompt_cache_stats = CacheStats()
+
+
+def get_prompt_cache():
+    """Returns the response cache backend configured in settings.LLM_CACHE."""
+    global _prompt_cache
+    if _prompt_cache is None:
+        with _prompt_cache_lock:
+            if _prompt_cache is None:
+                config = settings.LLM_CACHE
+                _prompt_cache = create_backend(config['BACKEND'], config.get('OPTIONS'))
+    return _prompt_cache
+
+
+def prompt_cache_key(model, prompt):
+    """Hashes the model name, generation parameters and prompt into a cache key."""
+    payload = json.dumps({
+        'model': getattr(model, 'model_name', None),
+        'generation_config': getattr(model, '_generation_config', None),
+        'system_instruction': str(getattr(model, '_system_instruction', None)),
+        'prompt': prompt,
+    }, sort_keys=True, default=str)
+    return 'llm:' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
-def generate_text(model, prompt):
-    """Sends a prompt to Gemini and returns the generated text."""
+def prompt_cache_ttl(cache_namespace):
+    ttls = settings.LLM_CACHE.get('TTLS', {})
+    return ttls.get(cache_namespace, ttls.get('default'))
+
+
+def _generate_uncached(model, prompt, cache_namespace=None):
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        with metrics.stage('gemini'):
+            response = resilience.call('gemini', lambda: model.generate_content(prompt), retry_on=RETRYABLE_ERRORS)
+            text = response.text
+        metrics.record_tokens(cache_namespace, prompt, text)
+        return text
     except Exception as e:
         print(f"Gemini API Error: {e}")
-        return None  
\ No newline at end of file
+        return None
+
+
+def _use_prompt_cache(cache_namespace):
+    return cache_namespace is not None and settings.LLM_CACHE.get('ENABLED', True)
+
+
+def _cache_get(key, cache_namespace):
+    try:
+        cached = get_prompt_cache().get(key)
+    except Exception as e:
+        logger.warning(f"Prompt cache read failed: {e}")
+        cached = None
+    prompt_cache_stats.record(cache_namespace, hit=cached is not None)
+    metrics.record_cache('prompt', hit=cached is not None)
+    return cached
+
+
+def _cache_set(key, text, cache_namespace):
+    try:
+        get_prompt_cache().set(key, text, prompt_cache_ttl(cache_namespace))
+    except Exception as e:
+        logger.warning(f"Prompt cache write failed: {e}")
+
+
+def generate_text(model, prompt, cache_namespace=None):
+    """Sends a prompt to Gemini and returns the generated text.
+
+    When ``cache_namespace`` is given (usually the endpoint name) identical
+    prompts are answered from the prompt cache for that namespace's TTL.
+    Failed generations are never cached.
+    """
+    if not _use_prompt_cache(cache_namespace):
+        return _generate_uncached(model, prompt, cache_namespace)
+
+    key = prompt_cache_key(model, prompt)
+    cached = _cache_get(key, cache_namespace)
+    if cached is not None:
+        return cached
+
+    text = _generate_uncached(model, prompt, cache_namespace)
+    if text is not None:
+        _cache_set(key, text, cache_namespace)
+    return text
+
+
+async def generate_text_async(model, prompt, cache_namespace=None):
+    """Async counterpart of generate_text() built on generate_content_async()."""
+    use_cache = _use_prompt_cache(cache_namespace)
+    if use_cache:
+        key = prompt_cache_key(model, prompt)
+        cached = await sync_to_async(_cache_get, thread_sensitive=False)(key, cache_namespace)
+        if cached is not None:
+            return cached
+
+    try:
+        loop_model = model_for_running_loop(model)
+        with metrics.stage('gemini'):
+            response = await resilience.call_async(
+                'gemini', lambda: loop_model.generate_content_async(prompt), retry_on=RETRYABLE_ERRORS
+            )
+            text = response.text
+    except Exception as e:
+        print(f"Gemini API Error: {e}")
+        return None
+    metrics.record_tokens(cache_namespace, prompt, text)
+
+    if use_cache and text is not None:
+        await sync_to_async(_cache_set, thread_sensitive=False)(key, text, cache_namespace)
+    return text
+
+
+def stream_text(model, prompt, cache_namespace=None):
+    """Yields the generated text in chunks as Gemini produces it.
+
+    A prompt cache hit is yielded as a single chunk. The complete text is
+    cached once the stream finishes; errors propagate to the caller.
+    """
+    use_cache = _use_prompt_cache(cache_namespace)
+    if use_cache:
+        key = prompt_cache_key(model, prompt)
+        cached = _cache_get(key, cache_namespace)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    with metrics.stage('gemini_stream'):
+        # Only opening the stream is retried; a stream that breaks midway is not replayed.
+        stream = resilience.call('gemini', lambda: model.generate_content(prompt, stream=True), retry_on=RETRYABLE_ERRORS)
+        for chunk in stream:
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    metrics.record_tokens(cache_namespace, prompt, ''.join(parts))
+
+    if use_cache and parts:
+        _cache_set(key, ''.join(parts), cache_namespace)
@@ -1,7 +1,7 @@
 from django.shortcuts import render
-from django.conf import settings
-import google.generativeai as genai
 from .forms import PromptForm
+from .utils import get_model, health_check, prompt_cache_stats
+from . import metrics
 
 def ask_gemini(request):
     gemini_response = None
@@ -12,8 +12,7 @@ def ask_gemini(request):
             user_prompt = form.cleaned_data['text']
             
             try:
-                genai.configure(api_key=settings.GOOGLE_API_KEY)
-                model = genai.GenerativeModel('gemini-2.0-flash')
+                model = get_model('gemini-2.0-flash')
                 response = model.generate_content(user_prompt)
                 gemini_response = response.text  
             except Exception as e:
@@ -23,9 +22,31 @@ def ask_gemini(request):
         form = PromptForm() 
 
     return render(request, 'core/ask_gemini.html', {'form': form, 'gemini_response': gemini_response})
+from django.conf import settings
 from django.middleware.csrf import get_token
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+import hmac
 
 def get_csrf_token_view(request):
     csrf_token = get_token(request)
-    return JsonResponse({'csrfToken': csrf_token})
\ No newline at end of file
+    return JsonResponse({'csrfToken': csrf_token})
+
+def probe_allowed(request):
+    if settings.DEBUG or request.user.is_staff:
+        return True
+    token = request.headers.get('X-Health-Token', '')
+    return bool(settings.HEALTH_PROBE_TOKEN) and hmac.compare_digest(token, settings.HEALTH_PROBE_TOKEN)
+
+def gemini_health_view(request):
+    """Reports whether Gemini is configured; ``?probe=1`` also calls it, for callers probe_allowed() lets through."""
+    probe = request.GET.get('probe') == '1' and probe_allowed(request)
+    status = health_check(probe=probe)
+    return JsonResponse(status, status=200 if status['ok'] else 503)
+
+
+def prompt_cache_stats_view(request):
+    return JsonResponse(prompt_cache_stats.snapshot())
+
+
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
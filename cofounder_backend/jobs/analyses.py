@@ -0,0 +1,44 @@
+"""The analyses a job can run: the input form that validates the payload and the function that runs it."""
+from business_model.forms import BusinessModelInputForm
+from business_model.views import run_business_model
+from competitor_analysis.forms import CompetitorAnalysisInputForm
+from competitor_analysis.views import run_competitor_analysis
+from market_size.forms import MarketSizeInputForm
+from market_size.views import run_market_size
+from news_overview.forms import NewsOverviewInputForm
+from news_overview.views import run_news_overview
+from report.forms import ReportInputForm
+from report.views import run_full_report
+from swot_analysis.forms import SWOTInputForm
+from swot_analysis.views import run_swot_analysis
+
+
+def _market_size(industry, region, target_market, customer_segment, average_selling_price):
+    return run_market_size(industry, region, target_market, customer_segment or '', average_selling_price or 0.0)
+
+
+ANALYSES = {
+    'swot_analysis': (SWOTInputForm, run_swot_analysis),
+    'market_size_estimation': (MarketSizeInputForm, _market_size),
+    'business_model_recommendation': (BusinessModelInputForm, run_business_model),
+    'competitor_analysis': (CompetitorAnalysisInputForm, run_competitor_analysis),
+    'news_overview': (NewsOverviewInputForm, run_news_overview),
+    'full_report': (ReportInputForm, run_full_report),
+}
+
+
+def validate(analysis_type, payload):
+    """Returns the cleaned inputs for the analysis, or raises ValueError with the form errors."""
+    try:
+        form_class, _ = ANALYSES[analysis_type]
+    except KeyError:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+    form = form_class(payload)
+    if not form.is_valid():
+        raise ValueError(form.errors.get_json_data())
+    return form.cleaned_data
+
+
+def run(analysis_type, payload):
+    _, run_analysis = ANALYSES[analysis_type]
+    return run_analysis(**validate(analysis_type, payload))
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs import queue
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = "Runs queued analysis jobs from the database until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        requeued = queue.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} jobs left running by a stopped worker")
+        stop = threading.Event()
+
+        def worker():
+            try:
+                while not stop.is_set():
+                    claimed = queue.claim_next()
+                    if claimed is None:
+                        if options['once']:
+                            return
+                        stop.wait(options['poll_interval'])
+                        continue
+                    job_id, lease = claimed
+                    self.stdout.write(f"Running job {job_id}")
+                    queue.execute(job_id, lease)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(worker) for _ in range(options['workers'])]
+            try:
+                while not all(future.done() for future in futures):
+                    time.sleep(0.5)
+            except KeyboardInterrupt:
+                stop.set()
+        for future in futures:
+            future.result()
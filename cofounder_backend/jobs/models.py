@@ -0,0 +1,47 @@
+from django.db import models
+import uuid
+
+
+class AnalysisJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    analysis_type = models.CharField(max_length=64)
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Set when a worker claims the job; only the holder of the lease may record its outcome.
+    lease = models.UUIDField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'], name='jobs_status_created_idx')]
+
+    def __str__(self):
+        return f"{self.analysis_type} job {self.id} ({self.status})"
+
+    def to_dict(self):
+        return {
+            'job_id': str(self.id),
+            'analysis_type': self.analysis_type,
+            'payload': self.payload,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error or None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,166 @@
+"""SQLite-backed job queue.
+
+Jobs are rows in the default database. Any number of workers, whether the
+in-process pool or ``manage.py run_jobs`` processes, claim them with an
+atomic conditional UPDATE, so each job runs exactly once without Redis.
+
+A claim gives the worker a lease. While the job runs, the worker refreshes
+its heartbeat every JOBS['HEARTBEAT_SECONDS']. A running job whose heartbeat
+is older than JOBS['STALE_SECONDS'] has lost its worker (the process died
+mid-job) and goes back in the queue with the lease revoked, so a worker that
+was only slow can no longer record an outcome.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from .models import AnalysisJob
+from . import analyses
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+# Jobs this process has handed to its pool from recover() and not yet finished.
+_recovering = set()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.JOBS['WORKERS'],
+                    thread_name_prefix="analysis-job",
+                )
+    return _executor
+
+
+def submit(analysis_type, payload):
+    """Validates the payload, queues a job and, if configured, hands it to the in-process pool."""
+    analyses.validate(analysis_type, payload)
+    job = AnalysisJob.objects.create(analysis_type=analysis_type, payload=payload)
+    if settings.JOBS['RUN_IN_PROCESS']:
+        get_executor().submit(run_job, job.pk)
+    return job
+
+
+def claim(job_id):
+    """Marks a queued job as running and returns the worker's lease, or None if another worker got there first."""
+    lease = uuid.uuid4()
+    now = timezone.now()
+    claimed = AnalysisJob.objects.filter(pk=job_id, status=AnalysisJob.QUEUED).update(
+        status=AnalysisJob.RUNNING,
+        lease=lease,
+        started_at=now,
+        heartbeat_at=now,
+    )
+    return lease if claimed == 1 else None
+
+
+def stale_cutoff():
+    return timezone.now() - timedelta(seconds=settings.JOBS['STALE_SECONDS'])
+
+
+def requeue_stale():
+    """Puts running jobs whose heartbeat stopped STALE_SECONDS ago back in the queue; returns how many."""
+    requeued = AnalysisJob.objects.filter(status=AnalysisJob.RUNNING, heartbeat_at__lt=stale_cutoff()).update(
+        status=AnalysisJob.QUEUED,
+        lease=None,
+        started_at=None,
+        heartbeat_at=None,
+    )
+    if requeued:
+        logger.warning(f"Requeued {requeued} jobs whose worker stopped responding")
+    return requeued
+
+
+def claim_next():
+    """Claims the oldest queued job; returns (job_id, lease), or None when the queue is empty."""
+    requeue_stale()
+    for job_id in AnalysisJob.objects.filter(status=AnalysisJob.QUEUED).order_by('created_at').values_list('pk', flat=True)[:10]:
+        lease = claim(job_id)
+        if lease is not None:
+            return job_id, lease
+    return None
+
+
+def _heartbeat(job_id, lease, stop):
+    try:
+        while not stop.wait(settings.JOBS['HEARTBEAT_SECONDS']):
+            if not AnalysisJob.objects.filter(pk=job_id, lease=lease).update(heartbeat_at=timezone.now()):
+                return
+    except Exception as e:
+        logger.error(f"Heartbeat for job {job_id} failed: {e}")
+    finally:
+        connections.close_all()
+
+
+def _finish(job_id, lease, **fields):
+    """Records the outcome if this worker still holds the lease."""
+    recorded = AnalysisJob.objects.filter(pk=job_id, lease=lease, status=AnalysisJob.RUNNING).update(
+        finished_at=timezone.now(),
+        **fields,
+    )
+    if not recorded:
+        logger.warning(f"Job {job_id} was requeued while this worker ran it; discarding its outcome")
+
+
+def execute(job_id, lease):
+    """Runs a job claimed with ``lease``, keeping its heartbeat fresh, and records its result or error."""
+    job = AnalysisJob.objects.get(pk=job_id)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job_id, lease, stop), daemon=True, name=f"job-heartbeat-{job_id}")
+    heartbeat.start()
+    try:
+        result = analyses.run(job.analysis_type, job.payload)
+    except Exception as e:
+        logger.exception(f"Job {job_id} ({job.analysis_type}) failed: {e}")
+        _finish(job_id, lease, status=AnalysisJob.FAILED, error=str(e))
+    else:
+        _finish(job_id, lease, status=AnalysisJob.SUCCEEDED, result=result)
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def run_job(job_id):
+    try:
+        lease = claim(job_id)
+        if lease is not None:
+            execute(job_id, lease)
+    finally:
+        with _executor_lock:
+            _recovering.discard(job_id)
+        connections.close_all()
+
+
+def recover(job):
+    """Requeues a job whose worker died and, with RUN_IN_PROCESS, runs it in this process; returns the current row.
+
+    Jobs only reach the in-process pool when they are submitted, so a job
+    queued or running in a process that has since died would otherwise be
+    polled forever. A recovered job is handed to the pool once; later polls
+    leave it alone until that run ends.
+    """
+    cutoff = stale_cutoff()
+    if job.status == AnalysisJob.RUNNING:
+        abandoned = job.heartbeat_at is not None and job.heartbeat_at < cutoff
+    else:
+        abandoned = job.status == AnalysisJob.QUEUED and job.created_at < cutoff
+    if not abandoned:
+        return job
+    requeue_stale()
+    if settings.JOBS['RUN_IN_PROCESS']:
+        with _executor_lock:
+            submit = job.pk not in _recovering
+            _recovering.add(job.pk)
+        if submit:
+            get_executor().submit(run_job, job.pk)
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from unittest import mock
+from .models import AnalysisJob
+from . import queue
+import json
+import uuid
+
+SWOT_PAYLOAD = {'business_description': "Coffee subscriptions for small offices", 'industry': "food and beverage"}
+JOBS = {'WORKERS': 1, 'RUN_IN_PROCESS': False, 'HEARTBEAT_SECONDS': 15, 'STALE_SECONDS': 60}
+
+
+def make_job(**fields):
+    return AnalysisJob.objects.create(analysis_type='swot_analysis', payload=SWOT_PAYLOAD, **fields)
+
+
+@override_settings(JOBS=JOBS)
+class ClaimTests(TestCase):
+    def test_a_job_is_claimed_only_once(self):
+        job = make_job()
+        lease = queue.claim(job.pk)
+        self.assertIsNotNone(lease)
+        self.assertIsNone(queue.claim(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.RUNNING)
+        self.assertEqual(job.lease, lease)
+        self.assertIsNotNone(job.heartbeat_at)
+
+    def test_claim_next_takes_the_oldest_queued_job(self):
+        newer = make_job()
+        older = make_job()
+        AnalysisJob.objects.filter(pk=older.pk).update(created_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(queue.claim_next()[0], older.pk)
+        self.assertEqual(queue.claim_next()[0], newer.pk)
+        self.assertIsNone(queue.claim_next())
+
+    def test_jobs_with_a_stale_heartbeat_are_requeued_before_claiming(self):
+        long_ago = timezone.now() - timedelta(minutes=5)
+        stale = make_job(status=AnalysisJob.RUNNING, started_at=long_ago, heartbeat_at=long_ago, lease=uuid.uuid4())
+        # Started long ago but still heartbeating: a slow job, not a lost one.
+        active = make_job(status=AnalysisJob.RUNNING, started_at=long_ago, heartbeat_at=timezone.now(), lease=uuid.uuid4())
+        self.assertEqual(queue.claim_next()[0], stale.pk)
+        active.refresh_from_db()
+        self.assertEqual(active.status, AnalysisJob.RUNNING)
+
+
+@override_settings(JOBS=JOBS)
+class ExecuteTests(TestCase):
+    def test_success_records_the_result(self):
+        job = make_job()
+        lease = queue.claim(job.pk)
+        with mock.patch.object(queue.analyses, 'run', return_value={'swot_result': "ok"}):
+            queue.execute(job.pk, lease)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.SUCCEEDED)
+        self.assertEqual(job.result, {'swot_result': "ok"})
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_records_the_error(self):
+        job = make_job()
+        lease = queue.claim(job.pk)
+        with mock.patch.object(queue.analyses, 'run', side_effect=RuntimeError("Gemini unavailable")):
+            queue.execute(job.pk, lease)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.FAILED)
+        self.assertEqual(job.error, "Gemini unavailable")
+        self.assertIsNone(job.result)
+
+    def test_a_worker_that_lost_its_lease_does_not_record_an_outcome(self):
+        job = make_job()
+        lease = queue.claim(job.pk)
+
+        def taken_over(analysis_type, payload):
+            AnalysisJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+            queue.requeue_stale()
+            return {'swot_result': "late"}
+
+        with mock.patch.object(queue.analyses, 'run', side_effect=taken_over):
+            queue.execute(job.pk, lease)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.QUEUED)
+        self.assertIsNone(job.result)
+
+
+@override_settings(JOBS=JOBS)
+class JobViewTests(TestCase):
+    def post(self, analysis_type, payload):
+        return self.client.post(
+            reverse('submit_job', args=[analysis_type]), data=json.dumps(payload), content_type='application/json',
+        )
+
+    def test_submit_returns_a_status_url_to_poll(self):
+        response = self.post('swot_analysis', SWOT_PAYLOAD)
+        self.assertEqual(response.status_code, 202)
+        status = self.client.get(response.json()['status_url'])
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.json()['status'], AnalysisJob.QUEUED)
+        self.assertEqual(status.json()['job_id'], response.json()['job_id'])
+
+    def test_submit_rejects_unknown_types_and_invalid_payloads(self):
+        self.assertEqual(self.post('horoscope', SWOT_PAYLOAD).status_code, 400)
+        self.assertEqual(self.post('swot_analysis', {'industry': "fintech"}).status_code, 400)
+        self.assertEqual(AnalysisJob.objects.count(), 0)
+
+    def test_polling_reports_the_finished_result(self):
+        job = make_job()
+        lease = queue.claim(job.pk)
+        with mock.patch.object(queue.analyses, 'run', return_value={'swot_result': "ok"}):
+            queue.execute(job.pk, lease)
+        data = self.client.get(reverse('job_status', args=[job.pk])).json()
+        self.assertEqual(data['status'], AnalysisJob.SUCCEEDED)
+        self.assertEqual(data['result'], {'swot_result': "ok"})
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get(reverse('job_status', args=[uuid.uuid4()])).status_code, 404)
+
+    @override_settings(JOBS={**JOBS, 'RUN_IN_PROCESS': True})
+    def test_polling_an_abandoned_job_requeues_and_reruns_it_once(self):
+        long_ago = timezone.now() - timedelta(minutes=5)
+        job = make_job(status=AnalysisJob.RUNNING, started_at=long_ago, heartbeat_at=long_ago, lease=uuid.uuid4())
+        self.addCleanup(queue._recovering.discard, job.pk)
+        executor = mock.Mock()
+        with mock.patch.object(queue, 'get_executor', return_value=executor):
+            data = self.client.get(reverse('job_status', args=[job.pk])).json()
+            AnalysisJob.objects.filter(pk=job.pk).update(created_at=long_ago)
+            self.client.get(reverse('job_status', args=[job.pk]))
+        self.assertEqual(data['status'], AnalysisJob.QUEUED)
+        executor.submit.assert_called_once_with(queue.run_job, job.pk)
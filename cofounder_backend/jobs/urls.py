@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('status/<uuid:job_id>/', views.job_status_view, name='job_status'),
+    path('<str:analysis_type>/', views.submit_job_view, name='submit_job'),
+]
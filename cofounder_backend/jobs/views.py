@@ -0,0 +1,37 @@
+from django.http import JsonResponse
+from django.urls import reverse
+from .models import AnalysisJob
+from . import queue
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def submit_job_view(request, analysis_type):
+    """Queues an analysis and returns its job ID immediately."""
+    if request.method != 'POST':
+        return JsonResponse({'message': 'This endpoint accepts POST requests only'}, status=405)
+    try:
+        payload = json.loads(request.body)
+        job = queue.submit(analysis_type, payload)
+        return JsonResponse({
+            'job_id': str(job.pk),
+            'status': job.status,
+            'status_url': reverse('job_status', args=[job.pk]),
+        }, status=202)
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': e.args[0]}, status=400)
+    except Exception as e:
+        logger.exception("submit_job_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def job_status_view(request, job_id):
+    try:
+        job = AnalysisJob.objects.get(pk=job_id)
+    except AnalysisJob.DoesNotExist:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return JsonResponse(queue.recover(job).to_dict())
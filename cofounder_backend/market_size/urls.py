@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('estimate/', views.market_size_view, name='market_size'),
+    path('estimate-async/', views.market_size_async_view, name='market_size_async'),
 ]
\ No newline at end of file
@@ -1,8 +1,59 @@
 from django.shortcuts import render
 from .forms import MarketSizeInputForm
-from core.utils import initialize_gemini, generate_text  
+from core.utils import initialize_gemini, generate_text, generate_text_async
 from django.http import JsonResponse
+from core.streaming import ndjson_event, stream_field, streaming_response, wants_stream
 import json
+
+
+def build_market_size_prompt(industry, region, target_market, customer_segment='', average_selling_price=0.0):
+    prompt = f"""
+    Estimate the Total Addressable Market (TAM), Serviceable Available Market (SAM), and Serviceable Obtainable Market (SOM)
+    for the {industry} industry in {region}.
+
+    Target Market: {target_market}
+    """
+
+    if customer_segment:
+        prompt += f"\nCustomer Segment: {customer_segment}"
+    if average_selling_price:
+        prompt += f"\nAverage Selling Price: {average_selling_price} USD"
+
+    prompt += """
+
+    Provide estimates in USD.
+    Explain the methodology and assumptions used to derive the estimates.
+
+    Also, provide a growth rate forecast for this market over the next 5 years.
+
+    Format the response with clear sections for:
+    1. Market Size Estimates (TAM, SAM, SOM)
+    2. Methodology and Assumptions
+    3. Growth Forecast
+    """
+    return prompt
+
+
+def run_market_size(industry, region, target_market, customer_segment='', average_selling_price=0.0):
+    """Runs the market size prompt and returns the JSON response payload."""
+    prompt = build_market_size_prompt(industry, region, target_market, customer_segment, average_selling_price)
+    market_size_result = generate_text(initialize_gemini(), prompt, cache_namespace='market_size')
+    return {
+        'industry': industry,
+        'region': region,
+        'target_market': target_market,
+        'customer_segment': customer_segment,
+        'average_selling_price': average_selling_price,
+        'market_size_result': market_size_result,
+    }
+
+
+def _stream_market_size(model, prompt, payload):
+    result = {}
+    yield from stream_field(model, prompt, 'market_size_result', result, 'market_size')
+    yield ndjson_event('result', data={**payload, 'market_size_result': result['market_size_result']})
+
+
 def market_size_view(request):
     if request.method == 'POST':
         try:
@@ -21,44 +72,17 @@ def market_size_view(request):
                 }, status=400)
 
             
-            prompt = f"""
-            Estimate the Total Addressable Market (TAM), Serviceable Available Market (SAM), and Serviceable Obtainable Market (SOM)
-            for the {industry} industry in {region}.
-
-            Target Market: {target_market}
-            """
-
-            if customer_segment:
-                prompt += f"\nCustomer Segment: {customer_segment}"
-            if average_selling_price:
-                prompt += f"\nAverage Selling Price: {average_selling_price} USD"
-
-            prompt += """
-
-            Provide estimates in USD.
-            Explain the methodology and assumptions used to derive the estimates.
-
-            Also, provide a growth rate forecast for this market over the next 5 years.
-
-            Format the response with clear sections for:
-            1. Market Size Estimates (TAM, SAM, SOM)
-            2. Methodology and Assumptions
-            3. Growth Forecast
-            """
-
-            
-            model = initialize_gemini()
-            market_size_result = generate_text(model, prompt)
+            if wants_stream(request, data):
+                prompt = build_market_size_prompt(industry, region, target_market, customer_segment, average_selling_price)
+                return streaming_response(_stream_market_size(initialize_gemini(), prompt, {
+                    'industry': industry,
+                    'region': region,
+                    'target_market': target_market,
+                    'customer_segment': customer_segment,
+                    'average_selling_price': average_selling_price,
+                }))
 
-            
-            return JsonResponse({
-                'industry': industry,
-                'region': region,
-                'target_market': target_market,
-                'customer_segment': customer_segment,
-                'average_selling_price': average_selling_price,
-                'market_size_result': market_size_result,
-            })
+            return JsonResponse(run_market_size(industry, region, target_market, customer_segment, average_selling_price))
 
         except json.JSONDecodeError:
             return JsonResponse({
@@ -72,4 +96,45 @@ def market_size_view(request):
     
     return JsonResponse({
         'message': 'This endpoint accepts POST requests only'
-    }, status=405)
\ No newline at end of file
+    }, status=405)
+
+
+async def market_size_async_view(request):
+    """Async variant of market_size_view for ASGI deployments."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        industry = data.get('industry')
+        region = data.get('region')
+        target_market = data.get('target_market')
+        customer_segment = data.get('customer_segment', '')
+        average_selling_price = data.get('average_selling_price', 0.0)
+
+        if not all([industry, region, target_market]):
+            return JsonResponse({
+                'error': 'Missing required fields: industry, region, and target_market are required'
+            }, status=400)
+
+        prompt = build_market_size_prompt(industry, region, target_market, customer_segment, average_selling_price)
+        market_size_result = await generate_text_async(initialize_gemini(), prompt, cache_namespace='market_size')
+
+        return JsonResponse({
+            'industry': industry,
+            'region': region,
+            'target_market': target_market,
+            'customer_segment': customer_segment,
+            'average_selling_price': average_selling_price,
+            'market_size_result': market_size_result,
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'error': 'Invalid JSON data'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=500)
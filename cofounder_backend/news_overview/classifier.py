@@ -0,0 +1,199 @@
+"""Local sentiment classifier over the article embeddings fetch_news_articles already computes.
+
+Each label has a centroid: the normalized mean embedding of the articles the
+LLM gave that label (``manage.py train_sentiment``), or of a few seed
+phrases when no labelled data exists yet. An article is scored by its
+cosine similarity to every centroid. A softmax with a calibrated scale
+turns those scores into probabilities. Predictions below the model's
+min_confidence come back as None so the caller can ask the LLM instead.
+
+The model is one small .npz file at NEWS_SENTIMENT_CLASSIFIER['MODEL_PATH'].
+"""
+from django.conf import settings
+import logging
+import numpy as np
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCALE_GRID = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200)
+
+SEED_TEXTS = {
+    "Positive": [
+        "Company reports record revenue growth and raises its outlook",
+        "Startup closes an oversubscribed funding round to expand into new markets",
+        "Demand surges as customers adopt the new product faster than expected",
+        "Shares rally after strong quarterly earnings beat analyst estimates",
+    ],
+    "Negative": [
+        "Company announces layoffs after revenue falls short of expectations",
+        "Regulators open an investigation and fines threaten the business",
+        "Shares plunge as losses widen and the firm cuts its guidance",
+        "Startup shuts down after failing to raise new funding",
+    ],
+    "Neutral": [
+        "Company schedules its annual shareholder meeting for next month",
+        "Industry group publishes its quarterly market statistics report",
+        "Firm appoints a new chief financial officer effective next quarter",
+        "Conference on sector trends will be held in the city this week",
+    ],
+}
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    weights = np.exp(logits)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+class SentimentClassifier:
+    def __init__(self, labels, centroids, scale=20.0, min_confidence=0.6):
+        self.labels = list(labels)
+        self.centroids = _normalize(centroids)
+        self.scale = float(scale)
+        self.min_confidence = float(min_confidence)
+
+    @classmethod
+    def fit(cls, embeddings, labels, min_confidence=0.6):
+        """Builds one centroid per label and fits the softmax scale by log loss on the same data."""
+        vectors = _normalize(embeddings)
+        labels = np.asarray(labels)
+        present = sorted(set(labels.tolist()))
+        centroids = np.stack([vectors[labels == label].mean(axis=0) for label in present])
+        model = cls(present, centroids, min_confidence=min_confidence)
+        model.scale = model.fit_scale(vectors, labels)
+        return model
+
+    @classmethod
+    def from_seeds(cls, embed, seeds=SEED_TEXTS, min_confidence=0.6):
+        """Builds centroids from the seed phrases; ``embed`` maps a list of texts to their embeddings."""
+        labels, centroids = [], []
+        for label, texts in seeds.items():
+            vectors = [vector for vector in embed(texts) if vector]
+            if not vectors:
+                raise ValueError(f"Could not embed the seed phrases for {label}")
+            labels.append(label)
+            centroids.append(_normalize(vectors).mean(axis=0))
+        return cls(labels, np.stack(centroids), min_confidence=min_confidence)
+
+    def fit_scale(self, embeddings, labels, grid=SCALE_GRID):
+        """Picks the softmax scale with the lowest log loss on the given labelled embeddings."""
+        similarities = _normalize(embeddings) @ self.centroids.T
+        targets = np.array([self.labels.index(label) for label in labels])
+        best, best_loss = self.scale, np.inf
+        for scale in grid:
+            probabilities = _softmax(similarities * scale)
+            loss = -np.mean(np.log(probabilities[np.arange(len(targets)), targets] + 1e-9))
+            if loss < best_loss:
+                best, best_loss = float(scale), loss
+        return best
+
+    def predict_proba(self, embeddings):
+        return _softmax((_normalize(embeddings) @ self.centroids.T) * self.scale)
+
+    def predict(self, embeddings):
+        """Returns (label, confidence) per embedding."""
+        probabilities = self.predict_proba(embeddings)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def classify(self, embeddings, min_confidence=None):
+        """Returns a label per embedding, or None where the embedding is missing or confidence is too low."""
+        threshold = self.min_confidence if min_confidence is None else min_confidence
+        results = [None] * len(embeddings)
+        present = [i for i, embedding in enumerate(embeddings) if embedding]
+        if not present:
+            return results
+        for i, (label, confidence) in zip(present, self.predict([embeddings[i] for i in present])):
+            if confidence >= threshold:
+                results[i] = label
+        return results
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                labels=np.array(self.labels),
+                centroids=self.centroids,
+                scale=np.float32(self.scale),
+                min_confidence=np.float32(self.min_confidence),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                [str(label) for label in data['labels']],
+                data['centroids'],
+                scale=float(data['scale']),
+                min_confidence=float(data['min_confidence']),
+            )
+
+
+def calibrate_threshold(probabilities, targets, target_accuracy):
+    """Lowest confidence threshold at which the predictions it keeps agree with ``targets`` at least ``target_accuracy`` of the time.
+
+    Returns None when no threshold reaches it.
+    """
+    confidence = probabilities.max(axis=1)
+    correct = probabilities.argmax(axis=1) == np.asarray(targets)
+    order = np.argsort(-confidence)
+    # Accuracy of the k most confident predictions, for every k.
+    running = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    reaching = np.flatnonzero(running >= target_accuracy)
+    if not len(reaching):
+        return None
+    return float(confidence[order][reaching[-1]])
+
+
+def evaluate(model, embeddings, labels, min_confidence=None):
+    """Agreement of the model with reference labels, overall and on the predictions confident enough to keep."""
+    threshold = model.min_confidence if min_confidence is None else min_confidence
+    probabilities = model.predict_proba(embeddings)
+    predicted = np.array(model.labels)[probabilities.argmax(axis=1)]
+    correct = predicted == np.asarray(labels)
+    confident = probabilities.max(axis=1) >= threshold
+    return {
+        'count': int(len(correct)),
+        'accuracy': float(correct.mean()) if len(correct) else 0.0,
+        'min_confidence': float(threshold),
+        'coverage': float(confident.mean()) if len(correct) else 0.0,
+        'confident_accuracy': float(correct[confident].mean()) if confident.any() else None,
+    }
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_classifier():
+    """Returns the trained classifier, reloading it when the file changes; None when disabled or not trained."""
+    global _model, _model_mtime
+    config = settings.NEWS_SENTIMENT_CLASSIFIER
+    if not config['ENABLED']:
+        return None
+    try:
+        mtime = os.path.getmtime(config['MODEL_PATH'])
+    except OSError:
+        return None
+    with _model_lock:
+        if _model is None or mtime != _model_mtime:
+            try:
+                _model = SentimentClassifier.load(config['MODEL_PATH'])
+            except Exception as e:
+                logger.error(f"Could not load the sentiment classifier from {config['MODEL_PATH']}: {e}")
+                return None
+            _model_mtime = mtime
+            if config['MIN_CONFIDENCE'] is not None:
+                _model.min_confidence = config['MIN_CONFIDENCE']
+        return _model
@@ -0,0 +1,59 @@
+"""Near-duplicate clustering of news articles by embedding similarity.
+
+Syndicated stories come back from the news search once per outlet. Their
+embeddings are stacked into one float32 matrix, normalized, and compared
+all at once with a single matrix product. Walking the articles in search
+order, each one not yet claimed starts a cluster and claims every later
+article whose cosine similarity to it reaches the threshold. Only the
+first article of each cluster is passed on, with a ``duplicates`` count.
+"""
+from django.conf import settings
+import numpy as np
+
+
+def similarity_matrix(embeddings):
+    """Pairwise cosine similarities of the given vectors, as an (n, n) float32 array."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+    return matrix @ matrix.T
+
+
+def cluster_indices(embeddings, threshold):
+    """Groups vector indices into clusters; each cluster lists its representative first."""
+    if not embeddings:
+        return []
+    similar = similarity_matrix(embeddings) >= threshold
+    unclaimed = np.ones(len(embeddings), dtype=bool)
+    clusters = []
+    for i in range(len(embeddings)):
+        if not unclaimed[i]:
+            continue
+        members = np.flatnonzero(similar[i] & unclaimed)
+        unclaimed[members] = False
+        # i is always a member of its own row, so it comes first.
+        clusters.append([i] + [int(j) for j in members if j != i])
+    return clusters
+
+
+def dedupe_articles(articles, threshold=None):
+    """Returns one copy of each distinct article, with ``duplicates`` set to how many copies were dropped.
+
+    Articles without an embedding are never merged. The input list and its
+    dicts (which may come from the news cache) are left untouched.
+    """
+    if not articles:
+        return articles
+    threshold = settings.NEWS_DEDUP_THRESHOLD if threshold is None else threshold
+    embedded = [i for i, article in enumerate(articles) if article.get('embedding')]
+    dropped = {}
+    if len(embedded) > 1:
+        clusters = cluster_indices([articles[i]['embedding'] for i in embedded], threshold)
+        for cluster in clusters:
+            dropped[embedded[cluster[0]]] = [embedded[j] for j in cluster[1:]]
+    skipped = {i for copies in dropped.values() for i in copies}
+    return [
+        {**article, 'duplicates': len(dropped.get(i, ()))}
+        for i, article in enumerate(articles)
+        if i not in skipped
+    ]
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from news_overview import news_cache
+from news_overview.views import fetch_news_articles
+
+
+class Command(BaseCommand):
+    help = "Fetches news for popular sectors into the MarketSignal cache. Run it from cron to keep them fresh."
+
+    def add_arguments(self, parser):
+        parser.add_argument('sectors', nargs='*', help="sectors to warm; defaults to NEWS_CACHE['PREWARM_SECTORS']")
+        parser.add_argument('--force', action='store_true', help="refetch even if the cached entry is still fresh")
+
+    def handle(self, *args, **options):
+        sectors = options['sectors'] or settings.NEWS_CACHE['PREWARM_SECTORS']
+        # Refresh a little before expiry so requests never see a stale entry.
+        refresh_after = timedelta(seconds=settings.NEWS_CACHE['FRESH_SECONDS'] * 0.8)
+        for sector in sectors:
+            signal = news_cache.latest_signal(news_cache.sector_key(sector))
+            if not options['force'] and signal is not None and timezone.now() - signal.timestamp < refresh_after:
+                self.stdout.write(f"{sector}: fresh, skipped")
+                continue
+            articles = news_cache.refresh(sector, fetch_news_articles)
+            if articles is None:
+                self.stderr.write(f"{sector}: fetch failed")
+            else:
+                self.stdout.write(f"{sector}: cached {len(articles)} articles")
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.embeddings import embed_texts
+from news_overview.classifier import SentimentClassifier, calibrate_threshold, evaluate
+from news_overview.sentiment import label_sentiments
+from news_overview.views import get_distinct_news_articles
+import numpy as np
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Trains the local sentiment classifier on LLM-labelled news and calibrates its confidence threshold. "
+        "The labelled dataset is saved for benchmarks/bench_sentiment_classifier.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sectors', nargs='*', help="sectors to label; defaults to NEWS_CACHE['PREWARM_SECTORS']")
+        parser.add_argument('--reuse-dataset', action='store_true', help="train on the saved dataset instead of labelling news again")
+        parser.add_argument('--seed-only', action='store_true', help="build the centroids from the built-in seed phrases, without LLM labels")
+        parser.add_argument('--holdout', type=float, default=0.25, help="fraction of articles kept out of training for calibration")
+        parser.add_argument('--target-accuracy', type=float, default=0.9,
+                            help="agreement with the LLM required of the predictions the classifier keeps")
+        parser.add_argument('--min-confidence', type=float, default=0.6, help="threshold for --seed-only models")
+        parser.add_argument('--label-mode', choices=['batched', 'sequential'], default='batched',
+                            help="how the LLM labels the articles; failed labels are dropped, never defaulted")
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        config = settings.NEWS_SENTIMENT_CLASSIFIER
+        if options['seed_only']:
+            model = SentimentClassifier.from_seeds(embed_texts, min_confidence=options['min_confidence'])
+            model.save(config['MODEL_PATH'])
+            self.stdout.write(f"Saved a seeded classifier to {config['MODEL_PATH']}")
+            return
+
+        if options['reuse_dataset']:
+            with np.load(config['DATASET_PATH']) as data:
+                embeddings, labels = data['embeddings'], data['labels'].astype(str)
+                texts, llm_seconds = data['texts'], float(data['llm_seconds_per_article'])
+        else:
+            texts, embeddings, labels, llm_seconds = self.label(
+                options['sectors'] or settings.NEWS_CACHE['PREWARM_SECTORS'], options['label_mode'],
+            )
+
+        rng = np.random.default_rng(options['random_seed'])
+        holdout = rng.random(len(labels)) < options['holdout']
+        if holdout.all() or not holdout.any():
+            raise CommandError(f"Need articles on both sides of the split, got {len(labels)} articles")
+        np.savez(
+            config['DATASET_PATH'],
+            texts=np.asarray(texts),
+            embeddings=np.asarray(embeddings, dtype=np.float32),
+            labels=np.asarray(labels),
+            holdout=holdout,
+            llm_seconds_per_article=np.float32(llm_seconds),
+        )
+
+        model = SentimentClassifier.fit(embeddings[~holdout], labels[~holdout])
+        known = holdout & np.isin(labels, model.labels)
+        probabilities = model.predict_proba(embeddings[known])
+        targets = [model.labels.index(label) for label in labels[known]]
+        threshold = calibrate_threshold(probabilities, targets, options['target_accuracy'])
+        if threshold is None:
+            self.stderr.write(f"No threshold reaches {options['target_accuracy']:.0%} agreement; every article will go to the LLM")
+            threshold = 1.0
+        model.min_confidence = threshold
+        model.save(config['MODEL_PATH'])
+
+        report = evaluate(model, embeddings[known], labels[known])
+        self.stdout.write(
+            f"Trained on {int((~holdout).sum())} articles, calibrated on {report['count']}: "
+            f"accuracy {report['accuracy']:.1%}, min_confidence {threshold:.3f} keeps {report['coverage']:.0%} "
+            f"of articles at {report['confident_accuracy'] or 0:.1%} agreement with the LLM"
+        )
+        self.stdout.write(f"Saved the classifier to {config['MODEL_PATH']} and the dataset to {config['DATASET_PATH']}")
+
+    def label(self, sectors, mode):
+        """Fetches each sector's distinct stories and labels them with the LLM, dropping those it failed to label."""
+        texts, embeddings, seen = [], [], set()
+        for sector in sectors:
+            articles, _ = get_distinct_news_articles(sector)
+            for article in articles or []:
+                body = article.get('body')
+                if body and article.get('embedding') and body not in seen:
+                    seen.add(body)
+                    texts.append(body)
+                    embeddings.append(article['embedding'])
+            self.stdout.write(f"{sector}: {len(texts)} articles so far")
+        if not texts:
+            raise CommandError("No articles with embeddings to label")
+
+        started = time.perf_counter()
+        labels = label_sentiments(texts, mode)
+        llm_seconds = (time.perf_counter() - started) / len(texts)
+        if mode == "batched":
+            self.stdout.write("Batched labelling: the LLM time per article saved with the dataset understates single calls")
+
+        kept = [i for i, label in enumerate(labels) if label is not None]
+        dropped = len(texts) - len(kept)
+        if dropped:
+            self.stderr.write(f"Dropped {dropped} of {len(texts)} articles the LLM failed to label")
+        if not kept:
+            raise CommandError("The LLM labelled none of the articles")
+        texts = [texts[i] for i in kept]
+        embeddings = [embeddings[i] for i in kept]
+        labels = [labels[i] for i in kept]
+        return texts, np.asarray(embeddings, dtype=np.float32), np.asarray(labels), llm_seconds
@@ -0,0 +1,110 @@
+"""Stale-while-revalidate cache of fetched news, stored as core.models.MarketSignal rows.
+
+A sector's articles (with their embeddings) are served from the database
+while younger than FRESH_SECONDS. Up to MAX_STALE_SECONDS they are still
+served, but a background refresh is started so the next request gets new
+articles. Older or missing entries are fetched in the request.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from core import metrics
+from core.models import MarketSignal
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "ddgs_news"
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_refresher = None
+
+
+def normalize_sector(sector):
+    return re.sub(r"\s+", " ", sector or "").strip().casefold()
+
+
+def sector_key(sector):
+    """The MarketSignal query a sector is cached under: normalized and cut to the column's length."""
+    return normalize_sector(sector)[:MarketSignal._meta.get_field('query').max_length]
+
+
+def _get_refresher():
+    global _refresher
+    if _refresher is None:
+        with _refreshing_lock:
+            if _refresher is None:
+                _refresher = ThreadPoolExecutor(
+                    max_workers=settings.NEWS_CACHE['REFRESH_WORKERS'],
+                    thread_name_prefix="news-refresh",
+                )
+    return _refresher
+
+
+def latest_signal(query):
+    return MarketSignal.objects.filter(source=SOURCE, query=query).order_by('-timestamp').first()
+
+
+def save_articles(query, articles):
+    """Stores a fetch as the newest entry for the query and drops the older ones."""
+    signal = MarketSignal.objects.create(source=SOURCE, query=query, data={'articles': articles})
+    MarketSignal.objects.filter(source=SOURCE, query=query, timestamp__lt=signal.timestamp).delete()
+    return signal
+
+
+def refresh(sector, fetch):
+    """Fetches the sector now and caches the result; returns the articles or None on failure."""
+    articles = fetch(sector)
+    if articles is not None:
+        save_articles(sector_key(sector), articles)
+    return articles
+
+
+def _refresh_in_background(sector, fetch):
+    query = sector_key(sector)
+    with _refreshing_lock:
+        if query in _refreshing:
+            return
+        _refreshing.add(query)
+
+    def run():
+        try:
+            refresh(sector, fetch)
+        except Exception as e:
+            logger.error(f"Background news refresh failed for {sector}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(query)
+            close_old_connections()
+
+    _get_refresher().submit(run)
+
+
+def get_articles(sector, fetch):
+    """Returns the sector's articles from the cache, calling ``fetch(sector)`` only when needed."""
+    config = settings.NEWS_CACHE
+    if not config['ENABLED']:
+        return fetch(sector)
+
+    signal = latest_signal(sector_key(sector))
+    if signal is not None:
+        age = timezone.now() - signal.timestamp
+        if age < timedelta(seconds=config['FRESH_SECONDS']):
+            metrics.record_cache('news', hit=True)
+            return signal.data['articles']
+        if age < timedelta(seconds=config['MAX_STALE_SECONDS']):
+            metrics.cache_lookups.inc(cache='news', result='stale')
+            _refresh_in_background(sector, fetch)
+            return signal.data['articles']
+
+    metrics.record_cache('news', hit=False)
+    articles = refresh(sector, fetch)
+    if articles is None and signal is not None:
+        logger.warning(f"News fetch failed for {sector}, serving the expired cache entry")
+        return signal.data['articles']
+    return articles
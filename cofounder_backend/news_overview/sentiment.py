@@ -0,0 +1,267 @@
+from django.conf import settings
+from core import metrics
+from core.resilience import propagate
+from core.utils import initialize_gemini, generate_text, generate_text_async
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from .classifier import get_classifier
+import asyncio
+import json
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_LABELS = ("Positive", "Negative", "Neutral")
+DEFAULT_SENTIMENT = "Neutral"
+
+classifications = metrics.register(metrics.Counter(
+    "cofounder_sentiment_classifications_total",
+    "Article sentiments by who decided them: the local classifier or the LLM.",
+    ["source"],
+))
+
+
+def normalize_sentiment(label):
+    """Maps a raw LLM reply such as 'positive.' onto one of SENTIMENT_LABELS."""
+    if not label:
+        return DEFAULT_SENTIMENT
+    cleaned = label.strip().strip(".*\"'").capitalize()
+    return cleaned if cleaned in SENTIMENT_LABELS else DEFAULT_SENTIMENT
+
+
+def parse_sentiment(label):
+    """Like normalize_sentiment(), but None for anything that is not one of SENTIMENT_LABELS."""
+    if not isinstance(label, str):
+        return None
+    cleaned = label.strip().strip(".*\"'").capitalize()
+    return cleaned if cleaned in SENTIMENT_LABELS else None
+
+
+def build_sentiment_prompt(text):
+    return f"""
+    Analyze the sentiment of the following text:
+
+    {text}
+
+    Is the sentiment positive, negative, or neutral?  Respond with only one word: Positive, Negative, or Neutral.
+    """
+
+
+def build_batched_sentiment_prompt(texts):
+    articles = "\n\n".join(f"Article {i + 1}:\n{text}" for i, text in enumerate(texts))
+    return f"""
+    Analyze the sentiment of each of the following {len(texts)} news articles.
+
+    {articles}
+
+    Respond with only a JSON array of {len(texts)} strings, one per article and in the same order,
+    each being exactly one of "Positive", "Negative" or "Neutral". Do not add any other text.
+    """
+
+
+def analyze_sentiment_with_llm(text, model=None):
+    """Analyzes the sentiment of a given text using the LLM."""
+    try:
+        if model is None:
+            model = initialize_gemini()
+        sentiment = generate_text(model, build_sentiment_prompt(text), cache_namespace='news_sentiment')
+        return normalize_sentiment(sentiment)
+    except Exception as e:
+        logger.error(f"Sentiment analysis error: {e}")
+        return DEFAULT_SENTIMENT
+
+
+def _score_sequential(texts, model):
+    return [analyze_sentiment_with_llm(text, model) for text in texts]
+
+
+def _score_concurrent(texts, model, max_workers, timeout):
+    """Scores every text on a bounded pool; calls that overrun their timeout count as Neutral."""
+    if not texts:
+        return []
+    workers = max(1, min(max_workers, len(texts)))
+    # Queued calls only start once a worker frees up, so the i-th call gets
+    # `timeout` seconds for each wave of work scheduled ahead of it.
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentiment")
+    try:
+        futures = [executor.submit(propagate(analyze_sentiment_with_llm), text, model) for text in texts]
+        sentiments = []
+        for i, future in enumerate(futures):
+            deadline = started + timeout * (i // workers + 1)
+            try:
+                sentiments.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                logger.warning(f"Sentiment call {i + 1}/{len(texts)} timed out after {timeout}s")
+                future.cancel()
+                sentiments.append(DEFAULT_SENTIMENT)
+        return sentiments
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_batched_reply(reply, count):
+    """Parses a JSON array of labels out of the batched prompt reply."""
+    if not reply:
+        return [DEFAULT_SENTIMENT] * count
+    match = re.search(r"\[.*\]", reply, re.DOTALL)
+    try:
+        labels = json.loads(match.group(0)) if match else []
+    except json.JSONDecodeError:
+        logger.warning("Batched sentiment reply was not valid JSON: %s", reply)
+        labels = []
+    sentiments = []
+    for i in range(count):
+        label = labels[i] if i < len(labels) else None
+        if isinstance(label, dict):
+            label = label.get("sentiment")
+        sentiments.append(normalize_sentiment(label if isinstance(label, str) else None))
+    return sentiments
+
+
+def _score_batched(texts, model):
+    """Classifies every text with a single structured-output prompt."""
+    if not texts:
+        return []
+    try:
+        reply = generate_text(model, build_batched_sentiment_prompt(texts), cache_namespace='news_sentiment')
+    except Exception as e:
+        logger.error(f"Batched sentiment analysis error: {e}")
+        reply = None
+    return _parse_batched_reply(reply, len(texts))
+
+
+def classify_locally(texts, embeddings=None):
+    """Labels the texts the local classifier is confident about; the rest (and everything without a model) are None."""
+    classifier = get_classifier()
+    if classifier is None or not embeddings:
+        return [None] * len(texts)
+    try:
+        return classifier.classify(embeddings)
+    except Exception as e:
+        logger.error(f"Local sentiment classifier error: {e}")
+        return [None] * len(texts)
+
+
+def _merge(local, scored):
+    """Fills the unlabelled slots of ``local`` with the LLM labels, in order."""
+    scored = iter(scored)
+    sentiments = [label if label is not None else next(scored) for label in local]
+    classifications.inc(len(local) - sum(label is None for label in local), source="local")
+    classifications.inc(sum(label is None for label in local), source="llm")
+    return sentiments
+
+
+def _label_batch(texts, model):
+    reply = generate_text(model, build_batched_sentiment_prompt(texts), cache_namespace='news_sentiment')
+    match = re.search(r"\[.*\]", reply or "", re.DOTALL)
+    try:
+        labels = json.loads(match.group(0)) if match else None
+    except json.JSONDecodeError:
+        labels = None
+    if not isinstance(labels, list) or len(labels) != len(texts):
+        return [None] * len(texts)
+    return [parse_sentiment(label.get("sentiment") if isinstance(label, dict) else label) for label in labels]
+
+
+def label_sentiments(texts, mode="batched", batch_size=20):
+    """Labels texts with the LLM for training; unlike score_sentiments(), failures come back as None.
+
+    Errors, open circuits and unparseable replies are never turned into
+    "Neutral", so they cannot end up as training labels. "batched" sends
+    ``batch_size`` texts per prompt, "sequential" one text per prompt.
+    """
+    model = initialize_gemini()
+    if mode == "sequential":
+        return [
+            parse_sentiment(generate_text(model, build_sentiment_prompt(text), cache_namespace='news_sentiment'))
+            for text in texts
+        ]
+    if mode != "batched":
+        raise ValueError(f"Unknown labelling mode {mode!r}")
+    labels = []
+    for start in range(0, len(texts), batch_size):
+        labels.extend(_label_batch(texts[start:start + batch_size], model))
+    return labels
+
+
+def score_sentiments(texts, mode=None, embeddings=None):
+    """Returns one sentiment label per text.
+
+    With ``embeddings`` (aligned with ``texts``) and a trained classifier,
+    confident articles are labelled locally and only the rest go to the LLM
+    using the configured NEWS_SENTIMENT_MODE.
+    """
+    local = classify_locally(texts, embeddings)
+    pending = [text for text, label in zip(texts, local) if label is None]
+    return _merge(local, _score_with_llm(pending, mode) if pending else [])
+
+
+def _score_with_llm(texts, mode=None):
+    mode = mode or getattr(settings, "NEWS_SENTIMENT_MODE", "concurrent")
+    model = initialize_gemini()
+    if mode == "batched":
+        return _score_batched(texts, model)
+    if mode == "concurrent":
+        return _score_concurrent(
+            texts,
+            model,
+            max_workers=getattr(settings, "NEWS_SENTIMENT_MAX_WORKERS", 5),
+            timeout=getattr(settings, "NEWS_SENTIMENT_TIMEOUT", 20),
+        )
+    if mode != "sequential":
+        logger.warning(f"Unknown NEWS_SENTIMENT_MODE {mode!r}, falling back to sequential")
+    return _score_sequential(texts, model)
+
+
+def count_sentiments(texts, mode=None, embeddings=None):
+    """Scores the texts and tallies them into a sentiment_counts dict."""
+    sentiment_counts = {label: 0 for label in SENTIMENT_LABELS}
+    for sentiment in score_sentiments(texts, mode, embeddings):
+        sentiment_counts[sentiment] += 1
+    return sentiment_counts
+
+
+async def _analyze_sentiment_async(text, model, semaphore, timeout):
+    async with semaphore:
+        try:
+            reply = await asyncio.wait_for(
+                generate_text_async(model, build_sentiment_prompt(text), cache_namespace='news_sentiment'),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Sentiment call timed out after {timeout}s")
+            return DEFAULT_SENTIMENT
+        except Exception as e:
+            logger.error(f"Sentiment analysis error: {e}")
+            return DEFAULT_SENTIMENT
+    return normalize_sentiment(reply)
+
+
+async def score_sentiments_async(texts, mode=None, embeddings=None):
+    """Async counterpart of score_sentiments(); "concurrent" runs the LLM calls with asyncio.gather."""
+    local = classify_locally(texts, embeddings)
+    pending = [text for text, label in zip(texts, local) if label is None]
+    return _merge(local, await _score_with_llm_async(pending, mode) if pending else [])
+
+
+async def _score_with_llm_async(texts, mode=None):
+    mode = mode or getattr(settings, "NEWS_SENTIMENT_MODE", "concurrent")
+    model = initialize_gemini()
+    if not texts:
+        return []
+    if mode == "batched":
+        reply = await generate_text_async(model, build_batched_sentiment_prompt(texts), cache_namespace='news_sentiment')
+        return _parse_batched_reply(reply, len(texts))
+    max_workers = getattr(settings, "NEWS_SENTIMENT_MAX_WORKERS", 5) if mode == "concurrent" else 1
+    semaphore = asyncio.Semaphore(max_workers)
+    timeout = getattr(settings, "NEWS_SENTIMENT_TIMEOUT", 20)
+    return await asyncio.gather(*(_analyze_sentiment_async(text, model, semaphore, timeout) for text in texts))
+
+
+async def count_sentiments_async(texts, mode=None, embeddings=None):
+    sentiment_counts = {label: 0 for label in SENTIMENT_LABELS}
+    for sentiment in await score_sentiments_async(texts, mode, embeddings):
+        sentiment_counts[sentiment] += 1
+    return sentiment_counts
@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, override_settings
+from .dedup import cluster_indices, dedupe_articles
+import copy
 
-# Create your tests here.
+
+def article(title, embedding):
+    return {'title': title, 'body': f"{title} body", 'embedding': embedding}
+
+
+@override_settings(NEWS_DEDUP_THRESHOLD=0.92)
+class DedupeArticlesTests(SimpleTestCase):
+    def test_a_syndicated_pair_collapses_into_its_first_copy(self):
+        articles = [
+            article("Fintech raises $50M", [1.0, 0.0, 0.0]),
+            article("Regulator fines lender", [0.0, 1.0, 0.0]),
+            article("Fintech raises $50M (Reuters)", [0.99, 0.05, 0.0]),
+        ]
+        distinct = dedupe_articles(articles)
+        self.assertEqual([a['title'] for a in distinct], ["Fintech raises $50M", "Regulator fines lender"])
+        self.assertEqual([a['duplicates'] for a in distinct], [1, 0])
+
+    def test_articles_without_an_embedding_are_never_merged(self):
+        articles = [
+            article("Fintech raises $50M", None),
+            article("Fintech raises $50M", []),
+            article("Fintech raises $50M", [1.0, 0.0]),
+        ]
+        distinct = dedupe_articles(articles)
+        self.assertEqual(len(distinct), 3)
+        self.assertEqual([a['duplicates'] for a in distinct], [0, 0, 0])
+
+    def test_the_input_articles_are_left_unchanged(self):
+        articles = [article("Fintech raises $50M", [1.0, 0.0]), article("Fintech raises $50M (AP)", [1.0, 0.01])]
+        before = copy.deepcopy(articles)
+        distinct = dedupe_articles(articles)
+        self.assertEqual(articles, before)
+        self.assertNotIn('duplicates', articles[0])
+        self.assertIsNot(distinct[0], articles[0])
+
+    def test_an_explicit_threshold_overrides_the_setting(self):
+        articles = [article("A", [1.0, 0.0]), article("B", [0.8, 0.6])]
+        self.assertEqual(len(dedupe_articles(articles)), 2)
+        self.assertEqual(len(dedupe_articles(articles, threshold=0.75)), 1)
+
+
+class ClusterIndicesTests(SimpleTestCase):
+    def test_each_cluster_lists_its_representative_first(self):
+        clusters = cluster_indices([[0.0, 1.0], [1.0, 0.0], [0.0, 0.98], [0.99, 0.0]], 0.92)
+        self.assertEqual(clusters, [[0, 2], [1, 3]])
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('overview/', views.news_overview_view, name='news_overview'),
+    path('overview-async/', views.news_overview_async_view, name='news_overview_async'),
 ]
\ No newline at end of file
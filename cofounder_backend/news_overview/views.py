@@ -1,7 +1,14 @@
 from django.shortcuts import render
 from .forms import NewsOverviewInputForm
-from core.utils import initialize_gemini, generate_text  
+from .sentiment import count_sentiments, count_sentiments_async
+from . import news_cache
+from .dedup import dedupe_articles
+from core.utils import initialize_gemini, generate_text, generate_text_async
+from core import metrics, resilience
+from core.embeddings import embed_texts
+from core.streaming import ndjson_event, stream_field, streaming_response, wants_stream
 from django.http import JsonResponse
+from asgiref.sync import sync_to_async
 import logging
 from duckduckgo_search import DDGS
 from duckduckgo_search.exceptions import (
@@ -12,96 +19,134 @@ from duckduckgo_search.exceptions import (
 )
 from datetime import datetime, timedelta
 import json
-import numpy as np
-import time 
 import random 
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-from openai import OpenAI
-client = OpenAI()
-
-client.api_key = os.getenv("OPENAI_API_KEY")
-
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Safari/605.1.15',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
 ]
 
-def embed_text(text):
-    """Embeds a given text using OpenAI's embeddings API."""
+def fetch_news_articles(sector, max_results=10):
+    """Gets recent news articles about the sector from DuckDuckGo and embeds them.
+
+    Rate limits and timeouts are retried with backoff through the shared
+    "ddgs" circuit breaker; while it is open this returns None at once.
+    """
+    def search():
+        user_agent = random.choice(USER_AGENTS)
+        with DDGS(headers={"User-Agent": user_agent}) as ddgs:
+            return [r for r in ddgs.news(
+                sector,
+                max_results=max_results,
+                safesearch='Off',
+                timelimit='m1'  
+            )]
+
     try:
-        response = client.embeddings.create(
-            input=[text],
-            model="text-embedding-3-small"  
-        )
-        return response.data[0].embedding
+        with metrics.stage('ddgs_news'):
+            results = resilience.call('ddgs', search, retry_on=(RatelimitException, TimeoutException))
+    except RatelimitException as e:
+        logger.error(f"Giving up on news for {sector}, still rate limited: {e}")
+        return None
+    except TimeoutException as e:
+        logger.error(f"Giving up on news for {sector}, still timing out: {e}")
+        return None
+    except resilience.ResilienceError as e:
+        logger.warning(f"Skipping news search for {sector}: {e}")
+        return None
+    except DuckDuckGoSearchException as e:
+        logger.error(f"DuckDuckGo Search Exception for {sector}: {e}")
+        return None
+    except ConversationLimitException as e:
+        logger.error(f"Conversation Limit Exception for {sector}: {e}")
+        return None
     except Exception as e:
-        logger.error(f"Embedding error: {e}")
+        logger.error(f"General Exception for {sector}: {e}")
         return None
 
+    embeddings = embed_texts([r.get('body', '') for r in results])
+    for r, embedding in zip(results, embeddings):
+        r['embedding'] = embedding
+    return results
+
+
+def get_news_articles(sector):
+    """Gets the sector's news from the MarketSignal cache, fetching it only when missing or expired."""
+    with metrics.stage('news'):
+        return news_cache.get_articles(sector, fetch_news_articles)
+
+
+def get_distinct_news_articles(sector):
+    """Gets the sector's news with syndicated copies of a story collapsed; returns (articles, fetched count)."""
+    news_articles = get_news_articles(sector)
+    if not news_articles:
+        return news_articles, 0
+    with metrics.stage('news_dedup'):
+        distinct = dedupe_articles(news_articles)
+    if len(distinct) < len(news_articles):
+        logger.info(f"news_overview: {len(news_articles)} articles for {sector} collapsed to {len(distinct)} stories")
+    return distinct, len(news_articles)
+
+
+def build_news_overview_prompt(sector, news_articles, sentiment_counts):
+    num_articles = len(news_articles) if news_articles else 0
+    prompt = f"""
+    Provide a general overview of the {sector} sector based on the following recent news articles. Focus on identifying the most common themes, opportunities and trends.
+
+    Number of Articles: {num_articles}
+    Overall Sentiment: {sentiment_counts}
+    Market size : 
+    """
+    if news_articles:
+        prompt += "Include the following search results:\n"
+        for article in news_articles:
+            copies = article.get('duplicates', 0)
+            reported = f" (reported by {copies + 1} outlets)" if copies else ""
+            prompt += f"-{article.get('title', 'N/A')}{reported}: {article.get('body', 'N/A')}\n" 
+    return prompt
+
+
+def gather_news_inputs(sector):
+    """Fetches the sector's distinct stories and scores their sentiment; returns (articles, fetched count, counts)."""
+    news_articles, num_articles = get_distinct_news_articles(sector)
+    with metrics.stage('sentiment'):
+        sentiment_counts = count_sentiments(
+            [article['body'] for article in news_articles] if news_articles else [],
+            embeddings=[article.get('embedding') for article in news_articles] if news_articles else None,
+        )
+    return news_articles, num_articles, sentiment_counts
+
+
+def run_news_overview(sector, news_inputs=None):
+    """Fetches and scores recent news (unless ``news_inputs`` already holds gather_news_inputs()), runs the overview prompt and returns the JSON response payload."""
+    if news_inputs is None:
+        news_inputs = gather_news_inputs(sector)
+    news_articles, num_articles, sentiment_counts = news_inputs
+    prompt = build_news_overview_prompt(sector, news_articles, sentiment_counts)
+    news_overview_result = generate_text(initialize_gemini(), prompt, cache_namespace='news_overview')
+    return {
+        'sector': sector,
+        'news_overview_result': news_overview_result,
+        'num_articles': num_articles,
+        'num_stories': len(news_articles) if news_articles else 0,
+        'sentiment_counts': sentiment_counts,
+    }
+
+
+def _stream_news_overview(model, prompt, payload):
+    result = {}
+    yield from stream_field(model, prompt, 'news_overview_result', result, 'news_overview')
+    yield ndjson_event('result', data={
+        'sector': payload['sector'],
+        'news_overview_result': result['news_overview_result'],
+        'num_articles': payload['num_articles'],
+        'num_stories': payload['num_stories'],
+        'sentiment_counts': payload['sentiment_counts'],
+    })
 
-def get_news_articles(sector, max_results=10, max_retries=3, delay=5):
-    """Gets recent news articles about the sector from DuckDuckGo and embeds them."""
-    for attempt in range(max_retries):
-        try:
-            user_agent = random.choice(USER_AGENTS)
-            with DDGS(headers={"User-Agent": user_agent}) as ddgs:
-                results = [r for r in ddgs.news(
-                    sector,
-                    max_results=max_results,
-                    safesearch='Off',
-                    timelimit='m1'  
-                )]
-                
-                for r in results:
-                    r['embedding'] = embed_text(r['body']) 
-                return results
-        except RatelimitException as e:
-            logger.warning(f"Rate limit exceeded for {sector}. Attempt {attempt + 1}/{max_retries}. Retrying in {delay} seconds.")
-            if attempt < max_retries - 1:
-                time.sleep(delay)  
-            else:
-                logger.error(f"Max retries exceeded due to rate limit for {sector}.")
-                return None
-        except TimeoutException as e:
-            logger.warning(f"Timeout occurred for {sector}. Attempt {attempt + 1}/{max_retries}. Retrying in {delay} seconds.")
-            if attempt < max_retries - 1:
-                time.sleep(delay)  
-            else:
-                logger.error(f"Max retries exceeded due to timeout for {sector}.")
-                return None
-        except DuckDuckGoSearchException as e:
-            logger.error(f"DuckDuckGo Search Exception for {sector}: {e}")
-            return None
-        except ConversationLimitException as e:
-            logger.error(f"Conversation Limit Exception for {sector}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"General Exception for {sector}: {e}")
-            return None
-    return None  
-
-def analyze_sentiment_with_llm(text):
-    """Analyzes the sentiment of a given text using the LLM."""
-    try:
-        model = initialize_gemini()
-        prompt = f"""
-        Analyze the sentiment of the following text:
-
-        {text}
-
-        Is the sentiment positive, negative, or neutral?  Respond with only one word: Positive, Negative, or Neutral.
-        """
-        sentiment = generate_text(model, prompt)
-        return sentiment.strip()  
-    except Exception as e:
-        logger.error(f"Sentiment analysis error: {e}")
-        return "Neutral" 
 
 def news_overview_view(request):
     if request.method == 'POST':
@@ -114,40 +159,18 @@ def news_overview_view(request):
                 logger.info("news_overview: Form is valid")
                 sector = form.cleaned_data['sector']
 
-                
-                news_articles = get_news_articles(sector)
-
-                
-                num_articles = len(news_articles) if news_articles else 0
-                sentiment_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
-                if news_articles:
-                    for article in news_articles:
-                        sentiment = analyze_sentiment_with_llm(article['body'])
-                        sentiment_counts[sentiment] += 1
-
-                
-                prompt = f"""
-                Provide a general overview of the {sector} sector based on the following recent news articles. Focus on identifying the most common themes, opportunities and trends.
-
-                Number of Articles: {num_articles}
-                Overall Sentiment: {sentiment_counts}
-                Market size : 
-                """
-                if news_articles:
-                    prompt += "Include the following search results:\n"
-                    for article in news_articles:
-                        prompt += f"-{article.get('title', 'N/A')}: {article.get('body', 'N/A')}\n" 
 
-                model = initialize_gemini()
-                news_overview_result = generate_text(model, prompt)
+                if wants_stream(request, data):
+                    news_articles, num_articles, sentiment_counts = gather_news_inputs(sector)
+                    prompt = build_news_overview_prompt(sector, news_articles, sentiment_counts)
+                    return streaming_response(_stream_news_overview(initialize_gemini(), prompt, {
+                        'sector': sector,
+                        'num_articles': num_articles,
+                        'num_stories': len(news_articles) if news_articles else 0,
+                        'sentiment_counts': sentiment_counts,
+                    }))
 
-                
-                data = {
-                    'sector': sector,
-                    'news_overview_result': news_overview_result,
-                    'num_articles': num_articles,
-                    'sentiment_counts': sentiment_counts,
-                }
+                data = run_news_overview(sector)
                 return JsonResponse(data)
             else:
                 logger.warning("news_overview: Form is invalid: %s", form.errors)
@@ -158,4 +181,41 @@ def news_overview_view(request):
             return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
     else:
         form = NewsOverviewInputForm()
-        return render(request, 'news_overview/news_overview_input.html', {'form': form})
\ No newline at end of file
+        return render(request, 'news_overview/news_overview_input.html', {'form': form})
+
+
+async def news_overview_async_view(request):
+    """Async variant of news_overview_view; the per-article sentiment calls run concurrently."""
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        form = NewsOverviewInputForm(data)
+        if not form.is_valid():
+            logger.warning("news_overview: Form is invalid: %s", form.errors)
+            return JsonResponse({'error': form.errors}, status=400)
+
+        sector = form.cleaned_data['sector']
+        news_articles, num_articles = await sync_to_async(get_distinct_news_articles, thread_sensitive=False)(sector)
+
+        with metrics.stage('sentiment'):
+            sentiment_counts = await count_sentiments_async(
+                [article['body'] for article in news_articles] if news_articles else [],
+                embeddings=[article.get('embedding') for article in news_articles] if news_articles else None,
+            )
+
+        prompt = build_news_overview_prompt(sector, news_articles, sentiment_counts)
+        news_overview_result = await generate_text_async(initialize_gemini(), prompt, cache_namespace='news_overview')
+
+        return JsonResponse({
+            'sector': sector,
+            'news_overview_result': news_overview_result,
+            'num_articles': num_articles,
+            'num_stories': len(news_articles) if news_articles else 0,
+            'sentiment_counts': sentiment_counts,
+        })
+    except json.JSONDecodeError as e:
+        logger.error("news_overview: Invalid JSON: %s", e)
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
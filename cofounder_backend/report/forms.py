@@ -0,0 +1,55 @@
+from django import forms
+
+class ReportInputForm(forms.Form):
+    business_description = forms.CharField(
+        label="Describe your business idea:",
+        widget=forms.Textarea(attrs={'rows': 5, 'cols': 60})
+    )
+    industry = forms.CharField(
+        label="Enter the industry:",
+        max_length=255,
+        help_text="e.g., 'e-commerce', 'fintech', 'healthcare'"
+    )
+    target_market = forms.CharField(
+        label="Describe the target market:",
+        widget=forms.Textarea(attrs={'rows': 3, 'cols': 60}),
+        help_text="e.g., 'Small businesses in the US', 'Millennials in Europe'"
+    )
+    region = forms.CharField(
+        label="Enter the region:",
+        max_length=255,
+        help_text="e.g., 'United States', 'Europe', 'Asia'"
+    )
+    sector = forms.CharField(
+        label="Enter the sector for the news overview (optional):",
+        max_length=255,
+        required=False,
+        help_text="Defaults to the industry"
+    )
+    customer_segment = forms.CharField(
+        label="Customer segment (optional):",
+        max_length=255,
+        required=False,
+        help_text="e.g., 'B2B', 'B2C', 'SaaS'"
+    )
+    average_selling_price = forms.FloatField(
+        label="Average selling price (optional):",
+        required=False,
+        help_text="Enter the average price of your product/service in USD"
+    )
+    competitor_1 = forms.CharField(
+        label="Competitor 1 (Name or Website, optional):",
+        max_length=255,
+        required=False,
+        help_text="Leave all competitors empty to skip the competitor analysis"
+    )
+    competitor_2 = forms.CharField(
+        label="Competitor 2 (Name or Website, optional):",
+        max_length=255,
+        required=False
+    )
+    competitor_3 = forms.CharField(
+        label="Competitor 3 (Name or Website, optional):",
+        max_length=255,
+        required=False
+    )
@@ -0,0 +1,131 @@
+from django.test import SimpleTestCase
+from unittest import mock
+from . import views
+import json
+import threading
+
+REPORT_INPUTS = {
+    'business_description': "Coffee subscriptions for small offices",
+    'industry': "food and beverage",
+    'target_market': "Offices with 10-50 staff",
+    'region': "United States",
+    'sector': '',
+    'customer_segment': '',
+    'average_selling_price': None,
+    'competitor_1': '',
+    'competitor_2': "Blue Bottle",
+    'competitor_3': '',
+}
+
+
+def fail(message):
+    def run(*args):
+        raise RuntimeError(message)
+    return run
+
+
+class FakeProviders:
+    """Patches every section's pipeline and shared input fetch in report.views, recording the calls."""
+
+    def __init__(self, test):
+        self.search_calls = []
+        self.news_calls = []
+        self.search_service = mock.Mock()
+        self.search_service.search_many.side_effect = self.search_many
+        patches = {
+            'run_swot_analysis': lambda description, industry: {'swot_result': f"SWOT for {industry}"},
+            'run_market_size': lambda industry, *args: {'market_size_result': f"Market for {industry}"},
+            'run_business_model': lambda *args: {'business_model_result': "Subscriptions"},
+            'run_competitor_analysis': lambda *named, results: {'competitor_analysis_result': results},
+            'run_news_overview': lambda sector, news_inputs: {'news_overview_result': news_inputs},
+            'gather_news_inputs': self.gather_news_inputs,
+            'get_search_service': lambda: self.search_service,
+        }
+        for name, fake in patches.items():
+            patcher = mock.patch.object(views, name, fake)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+    def search_many(self, queries):
+        self.search_calls.append(queries)
+        return [f"results for {query}" if query else None for query in queries]
+
+    def gather_news_inputs(self, sector):
+        self.news_calls.append(sector)
+        return [], 0, {'Positive': 0, 'Negative': 0, 'Neutral': 0}
+
+
+class RunSectionsTests(SimpleTestCase):
+    def test_a_failing_section_does_not_sink_the_others(self):
+        results = {name: (data, error) for name, data, error in views._run_sections({
+            'swot_analysis': lambda: {'swot_result': "ok"},
+            'news_overview': fail("DDGS rate limited"),
+            'market_size_estimation': lambda: {'market_size_result': "ok"},
+        })}
+        self.assertEqual(results['swot_analysis'], ({'swot_result': "ok"}, None))
+        self.assertEqual(results['market_size_estimation'], ({'market_size_result': "ok"}, None))
+        self.assertEqual(results['news_overview'], (None, "DDGS rate limited"))
+
+    def test_shared_fetch_runs_once_for_every_caller(self):
+        calls = []
+        fetch = views.shared(lambda: calls.append(1) or len(calls))
+        self.assertEqual([fetch(), fetch(), fetch()], [1, 1, 1])
+        self.assertEqual(len(calls), 1)
+
+
+class StreamFullReportTests(SimpleTestCase):
+    def test_sections_stream_in_the_order_they_finish_then_the_result(self):
+        fast_done = threading.Event()
+
+        def fast():
+            fast_done.set()
+            return {'market_size_result': "fast"}
+
+        def slow():
+            fast_done.wait(5)
+            return {'swot_result': "slow"}
+
+        events = [json.loads(line) for line in views._stream_full_report({
+            'swot_analysis': slow,
+            'news_overview': fail("DDGS rate limited"),
+            'market_size_estimation': fast,
+        })]
+        sections = [event['section'] for event in events if event['event'] == 'section']
+        self.assertEqual(sections, ['market_size_estimation', 'swot_analysis'])
+        self.assertIn({'event': 'error', 'field': 'news_overview', 'error': "DDGS rate limited"}, events)
+        self.assertEqual(events[-1]['event'], 'result')
+        self.assertEqual(set(events[-1]['data']['sections']), {'market_size_estimation', 'swot_analysis'})
+
+
+class RunFullReportTests(SimpleTestCase):
+    def setUp(self):
+        self.providers = FakeProviders(self)
+
+    def test_combines_every_section_into_one_document(self):
+        report = views.run_full_report(**REPORT_INPUTS)
+        self.assertEqual(set(report), {'sections', 'errors', 'elapsed_seconds'})
+        self.assertEqual(set(report['sections']), {
+            'swot_analysis', 'market_size_estimation', 'business_model_recommendation',
+            'competitor_analysis', 'news_overview',
+        })
+        self.assertEqual(report['errors'], {})
+        self.assertEqual(report['sections']['swot_analysis'], {'swot_result': "SWOT for food and beverage"})
+        self.assertIsInstance(report['elapsed_seconds'], float)
+
+    def test_shared_inputs_are_fetched_once_and_passed_to_their_sections(self):
+        report = views.run_full_report(**REPORT_INPUTS)
+        self.assertEqual(self.providers.news_calls, ["food and beverage"])
+        self.assertEqual(self.providers.search_calls, [["Blue Bottle", '', '']])
+        self.assertEqual(report['sections']['competitor_analysis']['competitor_analysis_result'],
+                         ["results for Blue Bottle", None, None])
+
+    def test_failed_sections_are_reported_under_errors(self):
+        with mock.patch.object(views, 'run_business_model', fail("Gemini unavailable")):
+            report = views.run_full_report(**REPORT_INPUTS)
+        self.assertEqual(report['errors'], {'business_model_recommendation': "Gemini unavailable"})
+        self.assertNotIn('business_model_recommendation', report['sections'])
+
+    def test_competitor_analysis_is_skipped_without_competitors(self):
+        report = views.run_full_report(**{**REPORT_INPUTS, 'competitor_2': ''})
+        self.assertNotIn('competitor_analysis', report['sections'])
+        self.assertEqual(self.providers.search_calls, [])
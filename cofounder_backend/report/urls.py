@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('full/', views.full_report_view, name='full_report'),
+]
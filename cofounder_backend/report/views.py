@@ -0,0 +1,139 @@
+"""Full report: every analysis for one set of inputs, run concurrently.
+
+Each section is one of the existing pipelines (the same run_* functions the
+per-tool endpoints use), so the report takes about as long as the slowest
+section instead of the sum of all five. The searches and embedded news a
+report needs are fetched once per report, by whichever section asks first,
+and handed to every section that uses them. Across requests, sections share
+the process-wide search service, news cache and prompt cache, so a report
+and a per-tool request for the same inputs search and generate only once.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .forms import ReportInputForm
+from business_model.views import run_business_model
+from competitor_analysis.search import get_search_service
+from competitor_analysis.views import run_competitor_analysis
+from market_size.views import run_market_size
+from news_overview.views import gather_news_inputs, run_news_overview
+from swot_analysis.views import run_swot_analysis
+from core.resilience import propagate
+from core.streaming import ndjson_event, streaming_response, wants_stream
+from django.http import JsonResponse
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def shared(fetch):
+    """Wraps a zero-argument fetch so that every section calling it shares one call and its result.
+
+    A failed fetch is not remembered, so the next section to ask tries again.
+    """
+    lock = threading.Lock()
+    result = []
+
+    def get():
+        with lock:
+            if not result:
+                result.append(fetch())
+        return result[0]
+    return get
+
+
+def build_sections(cleaned_data):
+    """Maps each section name (the analysis type) to a zero-argument callable that produces it."""
+    industry = cleaned_data['industry']
+    business_description = cleaned_data['business_description']
+    target_market = cleaned_data['target_market']
+    sector = cleaned_data.get('sector') or industry
+    news = shared(lambda: gather_news_inputs(sector))
+    sections = {
+        'swot_analysis': lambda: run_swot_analysis(business_description, industry),
+        'market_size_estimation': lambda: run_market_size(
+            industry,
+            cleaned_data['region'],
+            target_market,
+            cleaned_data.get('customer_segment') or '',
+            cleaned_data.get('average_selling_price') or 0.0,
+        ),
+        'business_model_recommendation': lambda: run_business_model(industry, target_market, business_description),
+        'news_overview': lambda: run_news_overview(sector, news_inputs=news()),
+    }
+    competitors = [cleaned_data.get(f'competitor_{i}') or '' for i in (1, 2, 3)]
+    if any(competitors):
+        # The competitor form requires competitor_1, so shift the given names to the front.
+        named = [competitor for competitor in competitors if competitor]
+        named += [''] * (3 - len(named))
+        search = shared(lambda: get_search_service().search_many(named))
+        sections['competitor_analysis'] = lambda: run_competitor_analysis(*named, results=search())
+    return sections
+
+
+def _run_sections(sections):
+    """Yields (name, data, error) for each section as soon as it finishes."""
+    with ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix="report") as executor:
+        futures = {executor.submit(propagate(run)): name for name, run in sections.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, future.result(), None
+            except Exception as e:
+                logger.exception(f"Report section {name} failed: {e}")
+                yield name, None, str(e)
+
+
+def run_full_report(**cleaned_data):
+    """Runs every section concurrently and returns the combined report."""
+    started = time.perf_counter()
+    report = {'sections': {}, 'errors': {}}
+    for name, data, error in _run_sections(build_sections(cleaned_data)):
+        if error is None:
+            report['sections'][name] = data
+        else:
+            report['errors'][name] = error
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return report
+
+
+def _stream_full_report(sections):
+    started = time.perf_counter()
+    report = {'sections': {}, 'errors': {}}
+    for name, data, error in _run_sections(sections):
+        if error is None:
+            report['sections'][name] = data
+            yield ndjson_event('section', section=name, data=data)
+        else:
+            report['errors'][name] = error
+            yield ndjson_event('error', field=name, error=error)
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    yield ndjson_event('result', data=report)
+
+
+def full_report_view(request):
+    """Runs all analyses for the union of the tool inputs.
+
+    Streamed responses send a ``section`` event as each analysis finishes,
+    then the combined report as the final ``result`` event.
+    """
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        form = ReportInputForm(data)
+        if not form.is_valid():
+            return JsonResponse({'error': form.errors}, status=400)
+
+        if wants_stream(request, data):
+            return streaming_response(_stream_full_report(build_sections(form.cleaned_data)))
+
+        return JsonResponse(run_full_report(**form.cleaned_data))
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except Exception as e:
+        logger.exception("full_report_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
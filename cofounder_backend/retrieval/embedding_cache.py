@@ -0,0 +1,69 @@
+"""Persistent cache in front of a Chroma embedding function.
+
+Vectors are stored in a local SQLite file keyed by a hash of the embedding
+model and the text, so repeated queries and re-stored documents skip the
+embeddings API entirely. Misses from one call are embedded in one batch.
+"""
+from array import array
+import hashlib
+import sqlite3
+import threading
+
+
+class CachingEmbeddingFunction:
+    def __init__(self, embedding_function, model_name, path="embedding_cache.sqlite3"):
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self, keys):
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+        return {key: array("f", vector).tolist() for key, vector in rows}
+
+    def _store(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items],
+            )
+            self._conn.commit()
+
+    def __call__(self, input):
+        keys = [self._key(text) for text in input]
+        cached = self._load(list(set(keys))) if keys else {}
+
+        missing = {}
+        for key, text in zip(keys, input):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.embedding_function(list(missing.values()))
+            fresh = [(key, [float(x) for x in vector]) for key, vector in zip(missing, vectors)]
+            self._store(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hit_ratio}
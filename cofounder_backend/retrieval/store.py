@@ -0,0 +1,349 @@
+"""Analysis storage behind the retrieval API.
+
+Analyses are rows of core.models.Analysis; history, exact-input dedup and
+context text are all served from the database. Chroma holds only each
+analysis ID and its input embedding, in one collection per tool, for the
+nearest-neighbour queries.
+
+Each worker process holds one Chroma client and opens the collections on
+first use. Query and document embeddings go through a local cache so
+repeated inputs never reach the embeddings API twice.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from core import metrics
+from core.models import Analysis
+from core.tokens import count_tokens
+from .embedding_cache import CachingEmbeddingFunction
+import hashlib
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAMES = {
+    "swot_analysis": "swot_analysis_collection",
+    "market_size_estimation": "market_size_collection",
+    "business_model_recommendation": "business_model_collection",
+    "competitor_analysis": "competitor_analysis_collection",
+    "news_overview": "news_analysis_collection",
+}
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+CONTEXT_CANDIDATES = 5
+REUSE_CANDIDATES = 3
+WRITE_BATCH_SIZE = 100
+DEFAULT_CONTEXT_TOKEN_BUDGET = 3000
+NO_CONTEXT = "No prior context found."
+
+_lock = threading.Lock()
+_client = None
+_embedding_function = None
+_collections = {}
+# A single writer drains the pending analyses in batches, in submission order.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis-writer")
+_pending = []
+_pending_lock = threading.Lock()
+# Held for each batch write, so clear_history never runs alongside one.
+_write_lock = threading.Lock()
+
+
+def get_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        with _lock:
+            if _embedding_function is None:
+                from chromadb.utils import embedding_functions
+                _embedding_function = CachingEmbeddingFunction(
+                    embedding_functions.OpenAIEmbeddingFunction(
+                        api_key=settings.OPENAI_API_KEY,
+                        model_name=EMBEDDING_MODEL,
+                    ),
+                    model_name=EMBEDDING_MODEL,
+                    path=settings.EMBEDDING_CACHE_PATH,
+                )
+    return _embedding_function
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import chromadb
+                _client = chromadb.PersistentClient(
+                    path=settings.CHROMA_PATH,
+                    settings=chromadb.Settings(anonymized_telemetry=False),
+                )
+    return _client
+
+
+def get_collection(analysis_type):
+    """Returns the collection for an analysis type, opening or creating it on first use."""
+    collection = _collections.get(analysis_type)
+    if collection is None:
+        try:
+            name = COLLECTION_NAMES[analysis_type]
+        except KeyError:
+            raise ValueError(f"Unknown analysis type: {analysis_type}")
+        embedding_function = get_embedding_function()
+        client = get_client()
+        with _lock:
+            collection = _collections.get(analysis_type)
+            if collection is None:
+                try:
+                    collection = client.get_collection(name=name, embedding_function=embedding_function)
+                except Exception:
+                    collection = client.create_collection(
+                        name=name,
+                        embedding_function=embedding_function,
+                        metadata={"hnsw:space": "cosine"},
+                    )
+                _collections[analysis_type] = collection
+    return collection
+
+
+IGNORED_INPUT_KEYS = {'context', 'stream'}
+
+
+def clean_inputs(data):
+    return {key: value for key, value in data.items() if key not in IGNORED_INPUT_KEYS}
+
+
+def input_text(data):
+    """Canonical text of the form inputs; stored analyses are embedded on this, not on the response."""
+    return "\n".join(
+        f"{key}: {value}"
+        for key, value in sorted(clean_inputs(data).items())
+        if value not in (None, '')
+    )
+
+
+def input_hash(data):
+    """Hash of the canonical input text, so exact repeats are found with an index lookup."""
+    return hashlib.sha256(input_text(data).encode('utf-8')).hexdigest()
+
+
+def cosine_distance(collection, distance):
+    """Converts a Chroma distance to cosine distance; OpenAI embeddings are unit length."""
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space == "l2":
+        # Chroma reports squared L2, which is 2 * cosine distance for unit vectors.
+        return distance / 2
+    return distance
+
+
+def context_token_budget(analysis_type):
+    return settings.CONTEXT_TOKEN_BUDGETS.get(analysis_type, DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+def assemble_context(documents, distances, budget):
+    """Packs whole retrieved documents, nearest first, until the next one would exceed the token budget."""
+    selected, used = [], 0
+    for _, document in sorted(zip(distances, documents), key=lambda pair: pair[0]):
+        tokens = count_tokens(document)
+        if used + tokens > budget:
+            break
+        selected.append(document)
+        used += tokens
+    return "\n".join(selected) if selected else NO_CONTEXT
+
+
+def _reuse_settings(analysis_type):
+    config = settings.SEMANTIC_REUSE
+    max_age = config['MAX_AGE_SECONDS']
+    return config['MAX_COSINE_DISTANCE'], max_age.get(analysis_type, max_age['default'])
+
+
+def _reuse_payload(analysis, distance):
+    return {
+        'id': analysis.id,
+        'distance': distance,
+        'created_at': int(analysis.created_at.timestamp()),
+        'response': analysis.response,
+    }
+
+
+def find_exact(analysis_type, data):
+    """Returns the newest fresh analysis with exactly these inputs, or None; needs no embedding."""
+    _, max_age = _reuse_settings(analysis_type)
+    analysis = Analysis.objects.filter(
+        analysis_type=analysis_type,
+        input_hash=input_hash(data),
+        created_at__gte=timezone.now() - timedelta(seconds=max_age),
+    ).order_by('-created_at').first()
+    return _reuse_payload(analysis, 0.0) if analysis else None
+
+
+def find_reusable(collection, analysis_type, query_embedding):
+    """Returns the closest fresh stored analysis within the reuse threshold, or None."""
+    max_distance, max_age = _reuse_settings(analysis_type)
+    with metrics.stage('chroma_query'):
+        results = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=REUSE_CANDIDATES,
+            include=["distances"],
+        )
+    ids = results['ids'][0] if results['ids'] else []
+    distances = [cosine_distance(collection, distance) for distance in results['distances'][0]] if ids else []
+    close = {id: distance for id, distance in zip(ids, distances) if distance <= max_distance}
+    if not close:
+        return None
+    fresh = Analysis.objects.filter(
+        pk__in=close,
+        created_at__gte=timezone.now() - timedelta(seconds=max_age),
+    )
+    nearest = min(fresh, key=lambda analysis: close[analysis.pk], default=None)
+    return _reuse_payload(nearest, close[nearest.pk]) if nearest else None
+
+
+def retrieve(analysis_type, data, allow_reuse=True):
+    """Returns prior context for the inputs and, when allowed, a near-duplicate past analysis to reuse."""
+    collection = get_collection(analysis_type)
+    reuse_enabled = allow_reuse and settings.SEMANTIC_REUSE['ENABLED']
+
+    if reuse_enabled:
+        exact = find_exact(analysis_type, data)
+        if exact:
+            return {'context': None, 'reuse': exact}
+
+    with metrics.stage('query_embedding'):
+        query_embedding = get_embedding_function()([input_text(data)])[0]
+
+    if reuse_enabled:
+        reusable = find_reusable(collection, analysis_type, query_embedding)
+        if reusable:
+            return {'context': None, 'reuse': reusable}
+
+    with metrics.stage('chroma_query'):
+        results = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=CONTEXT_CANDIDATES,
+            include=["documents", "distances"],
+        )
+    ids = results['ids'][0] if results['ids'] else []
+    distances = results['distances'][0] if results.get('distances') else [0.0] * len(ids)
+    # Entries written before analyses moved to the database still carry their document.
+    legacy_documents = results['documents'][0] if results.get('documents') else [None] * len(ids)
+    analyses = Analysis.objects.in_bulk(ids)
+    documents, document_distances = [], []
+    for id, distance, legacy_document in zip(ids, distances, legacy_documents):
+        document = analyses[id].as_context() if id in analyses else legacy_document
+        if document:
+            documents.append(document)
+            document_distances.append(distance)
+    return {'context': assemble_context(documents, document_distances, context_token_budget(analysis_type)), 'reuse': None}
+
+
+def make_analysis_id(analysis_type, data, response_data):
+    """Content-addressed ID: the same input and response always map to the same document."""
+    payload = json.dumps({'input': clean_inputs(data), 'response': response_data}, sort_keys=True, default=str)
+    return f"{analysis_type}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+def write_analyses(analyses):
+    """Saves analyses with one bulk insert, then indexes their input embeddings with one upsert per tool."""
+    Analysis.objects.bulk_create(analyses, ignore_conflicts=True)
+    embeddings = get_embedding_function()([input_text(analysis.inputs) for analysis in analyses])
+    by_type = {}
+    for analysis, embedding in zip(analyses, embeddings):
+        ids, type_embeddings = by_type.setdefault(analysis.analysis_type, ([], []))
+        ids.append(analysis.id)
+        type_embeddings.append(embedding)
+    for analysis_type, (ids, type_embeddings) in by_type.items():
+        with metrics.stage('chroma_upsert'):
+            get_collection(analysis_type).upsert(ids=ids, embeddings=type_embeddings)
+
+
+def _flush():
+    with _pending_lock:
+        batch = _pending[:WRITE_BATCH_SIZE]
+        del _pending[:WRITE_BATCH_SIZE]
+        more = bool(_pending)
+    if more:
+        _writer.submit(_flush)
+    close_old_connections()
+    try:
+        with _write_lock:
+            write_analyses(batch)
+    except Exception as e:
+        logger.exception(f"Error storing {len(batch)} analyses: {e}")
+
+
+def store_analysis(analysis_type, data, response_data):
+    """Queues the analysis for storage and returns its ID without waiting for the write.
+
+    Analyses queued while a write is in progress are saved together in the
+    next batch.
+    """
+    if analysis_type not in COLLECTION_NAMES:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+    inputs = clean_inputs(data)
+    analysis = Analysis(
+        id=make_analysis_id(analysis_type, inputs, response_data),
+        analysis_type=analysis_type,
+        input_hash=input_hash(inputs),
+        inputs=inputs,
+        response=response_data,
+        created_at=timezone.now(),
+    )
+    with _pending_lock:
+        _pending.append(analysis)
+        schedule = len(_pending) == 1
+    if schedule:
+        _writer.submit(_flush)
+    return analysis.id
+
+
+def encode_cursor(analysis):
+    return f"{analysis.created_at.isoformat()}|{analysis.id}"
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, id = cursor.split('|', 1)
+        return datetime.fromisoformat(created_at), id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def get_history(analysis_type, cursor=None, limit=10):
+    """Returns one page of analyses of a type, newest first, and the cursor of the next page.
+
+    Pages are keyset-paginated on (created_at, id), so every page is an
+    index range scan however deep the history goes.
+    """
+    analyses = Analysis.objects.filter(analysis_type=analysis_type)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        analyses = analyses.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=id)
+        )
+    page = list(analyses.order_by('-created_at', '-id')[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return [analysis.to_dict() for analysis in page[:limit]], next_cursor
+
+
+def clear_history(analysis_type):
+    """Deletes every analysis of the type, including ones still queued for the writer.
+
+    Runs under the write lock: an in-flight batch finishes first, and queued
+    analyses of this type are dropped, so no upsert can recreate the
+    collection with IDs of deleted rows.
+    """
+    with _write_lock:
+        with _pending_lock:
+            _pending[:] = [analysis for analysis in _pending if analysis.analysis_type != analysis_type]
+        Analysis.objects.filter(analysis_type=analysis_type).delete()
+        client = get_client()
+        with _lock:
+            _collections.pop(analysis_type, None)
+            try:
+                client.delete_collection(name=COLLECTION_NAMES[analysis_type])
+            except Exception as e:
+                logger.warning(f"Could not delete the {analysis_type} collection: {e}")
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('retrieve/', views.retrieve_view, name='retrieve'),
+    path('store/', views.store_view, name='store'),
+    path('history/<str:analysis_type>/', views.history_view, name='history'),
+    path('stats/', views.stats_view, name='retrieval_stats'),
+]
@@ -0,0 +1,76 @@
+from django.http import JsonResponse
+from . import store
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_request(request):
+    data = json.loads(request.body)
+    analysis_type = data.get('analysis_type')
+    if analysis_type not in store.COLLECTION_NAMES:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+    return data, analysis_type
+
+
+def retrieve_view(request):
+    """Enriches raw form inputs with context from past analyses, or returns a near-duplicate one to reuse."""
+    if request.method != 'POST':
+        return JsonResponse({'message': 'This endpoint accepts POST requests only'}, status=405)
+    try:
+        data, analysis_type = _parse_request(request)
+        inputs = data.get('data') or {}
+        retrieved = store.retrieve(analysis_type, inputs, allow_reuse=not data.get('force_regenerate'))
+        if retrieved['reuse']:
+            return JsonResponse({'data': inputs, 'reuse': retrieved['reuse']})
+        return JsonResponse({'data': {**inputs, 'context': retrieved['context']}, 'reuse': None})
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception("retrieve_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def store_view(request):
+    """Queues an analysis for storage; the write happens after the response is sent."""
+    if request.method != 'POST':
+        return JsonResponse({'message': 'This endpoint accepts POST requests only'}, status=405)
+    try:
+        data, analysis_type = _parse_request(request)
+        analysis_id = store.store_analysis(analysis_type, data.get('data') or {}, data.get('response'))
+        return JsonResponse({'id': analysis_id}, status=202)
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception("store_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def history_view(request, analysis_type):
+    """GET returns one page of history, newest first (?cursor=&limit=); DELETE clears it."""
+    if analysis_type not in store.COLLECTION_NAMES:
+        return JsonResponse({'error': f"Unknown analysis type: {analysis_type}"}, status=404)
+    try:
+        if request.method == 'DELETE':
+            store.clear_history(analysis_type)
+            return JsonResponse({'cleared': True})
+        if request.method != 'GET':
+            return JsonResponse({'message': 'This endpoint accepts GET and DELETE requests only'}, status=405)
+
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+        items, next_cursor = store.get_history(analysis_type, request.GET.get('cursor'), limit)
+        return JsonResponse({'items': items, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception("history_view: An exception occurred: %s", e)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def stats_view(request):
+    return JsonResponse({'embedding_cache': store.get_embedding_function().stats()})
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.swot_analysis_view, name='swot_analysis'),
+    path('analyze-async/', views.swot_analysis_async_view, name='swot_analysis_async'),
 ]
\ No newline at end of file
@@ -1,8 +1,71 @@
 from django.shortcuts import render
 from .forms import SWOTInputForm
-from core.utils import initialize_gemini, generate_text
+from core.utils import initialize_gemini, generate_text, generate_text_async
+from core.streaming import ndjson_event, stream_field, streaming_response, wants_stream
 import json
-from django.http import JsonResponse    
+from django.http import JsonResponse
+
+
+def build_assumption_prompt(industry):
+    return f"""
+    As an expert business analyst, identify key market conditions, resource availability factors, 
+    and potential competitive landscape elements relevant to the {industry} industry. 
+    Provide these as a series of concise bullet points. Focus on assumptions a startup in this industry should consider.
+    """
+
+
+def build_swot_prompt(business_description, industry, generated_assumptions):
+    return f"""
+    Analyze the following business idea and provide a detailed SWOT analysis, taking into account the following industry assumptions:
+
+    Business Description: {business_description}
+
+    Industry: {industry}
+
+    **Assumptions:**
+    {generated_assumptions}
+
+    Include:
+    *   Strengths (internal advantages, considering the stated assumptions)
+    *   Weaknesses (internal disadvantages, considering the stated assumptions)
+    *   Opportunities (external factors that can be exploited, given the market assumptions)
+    *   Threats (external factors that can cause problems, given the market assumptions)
+
+    Provide a risk and opportunity assessment, considering potential regulatory, financial, and market risks, and how these risks are affected by the stated assumptions.
+
+    Format the output clearly with headings for each SWOT element.
+    """
+
+
+def run_swot_analysis(business_description, industry):
+    """Runs the assumptions and SWOT prompts and returns the JSON response payload."""
+    model = initialize_gemini()
+    generated_assumptions = generate_text(model, build_assumption_prompt(industry), cache_namespace='swot_assumptions')
+
+    swot_prompt = build_swot_prompt(business_description, industry, generated_assumptions)
+    swot_result = generate_text(model, swot_prompt, cache_namespace='swot_analysis')
+
+    return {
+        'business_description': business_description,
+        'industry': industry,
+        'generated_assumptions': generated_assumptions,
+        'swot_result': swot_result,
+    }
+
+
+def _stream_swot(model, business_description, industry):
+    result = {}
+    yield from stream_field(model, build_assumption_prompt(industry), 'generated_assumptions', result, 'swot_assumptions')
+    swot_prompt = build_swot_prompt(business_description, industry, result['generated_assumptions'])
+    yield from stream_field(model, swot_prompt, 'swot_result', result, 'swot_analysis')
+    yield ndjson_event('result', data={
+        'business_description': business_description,
+        'industry': industry,
+        'generated_assumptions': result['generated_assumptions'],
+        'swot_result': result['swot_result'],
+    })
+
+
 def swot_analysis_view(request):
     if request.method == 'POST':
         try:
@@ -17,46 +80,10 @@ def swot_analysis_view(request):
                 }, status=400)
 
             
-            assumption_prompt = f"""
-            As an expert business analyst, identify key market conditions, resource availability factors, 
-            and potential competitive landscape elements relevant to the {industry} industry. 
-            Provide these as a series of concise bullet points. Focus on assumptions a startup in this industry should consider.
-            """
+            if wants_stream(request, data):
+                return streaming_response(_stream_swot(initialize_gemini(), business_description, industry))
 
-            model = initialize_gemini()
-            generated_assumptions = generate_text(model, assumption_prompt)
-
-            
-            swot_prompt = f"""
-            Analyze the following business idea and provide a detailed SWOT analysis, taking into account the following industry assumptions:
-
-            Business Description: {business_description}
-
-            Industry: {industry}
-
-            **Assumptions:**
-            {generated_assumptions}
-
-            Include:
-            *   Strengths (internal advantages, considering the stated assumptions)
-            *   Weaknesses (internal disadvantages, considering the stated assumptions)
-            *   Opportunities (external factors that can be exploited, given the market assumptions)
-            *   Threats (external factors that can cause problems, given the market assumptions)
-
-            Provide a risk and opportunity assessment, considering potential regulatory, financial, and market risks, and how these risks are affected by the stated assumptions.
-
-            Format the output clearly with headings for each SWOT element.
-            """
-
-            swot_result = generate_text(model, swot_prompt)
-
-            
-            return JsonResponse({
-                'business_description': business_description,
-                'industry': industry,
-                'generated_assumptions': generated_assumptions,
-                'swot_result': swot_result,
-            })
+            return JsonResponse(run_swot_analysis(business_description, industry))
 
         except json.JSONDecodeError:
             return JsonResponse({
@@ -71,3 +98,48 @@ def swot_analysis_view(request):
     return JsonResponse({
         'message': 'This endpoint accepts POST requests only'
     }, status=405)
+
+
+async def swot_analysis_async_view(request):
+    """Async variant of swot_analysis_view for ASGI deployments.
+
+    Both prompts are awaited on the event loop, so the worker serves other
+    requests while Gemini answers. The assumptions depend only on the
+    industry, so after the first request for an industry they are a
+    swot_assumptions prompt cache hit, read in a worker thread rather than
+    on the loop, and only the SWOT prompt itself waits on Gemini.
+    """
+    if request.method != 'POST':
+        return JsonResponse({
+            'message': 'This endpoint accepts POST requests only'
+        }, status=405)
+    try:
+        data = json.loads(request.body)
+        business_description = data.get('business_description')
+        industry = data.get('industry')
+
+        if not business_description or not industry:
+            return JsonResponse({
+                'error': 'Missing required fields'
+            }, status=400)
+
+        model = initialize_gemini()
+        generated_assumptions = await generate_text_async(model, build_assumption_prompt(industry), cache_namespace='swot_assumptions')
+        swot_prompt = build_swot_prompt(business_description, industry, generated_assumptions)
+        swot_result = await generate_text_async(model, swot_prompt, cache_namespace='swot_analysis')
+
+        return JsonResponse({
+            'business_description': business_description,
+            'industry': industry,
+            'generated_assumptions': generated_assumptions,
+            'swot_result': swot_result,
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'error': 'Invalid JSON data'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=500)